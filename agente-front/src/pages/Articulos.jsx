@@ -1,8 +1,14 @@
 import { useEffect, useState } from "react";
 import api from "../api/api";
 
+// La lista no necesita el resumen completo; se pide al abrir un artículo
+const CAMPOS_LISTA = "id,titulo,fecha_guardado,etiquetas,url";
+const POR_PAGINA = 20;
+
 export default function Articulos() {
   const [data, setData] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [siguiente, setSiguiente] = useState(null);
   const [cargando, setCargando] = useState(true);
   const [seleccionado, setSeleccionado] = useState(null);
 
@@ -10,10 +16,14 @@ export default function Articulos() {
     cargarArticulos();
   }, []);
 
-  const cargarArticulos = async () => {
+  const cargarArticulos = async (cursor = null) => {
     try {
-      const res = await api.get("/articulos");
-      setData(res.data);
+      const res = await api.get("/articulos", {
+        params: { limite: POR_PAGINA, orden: "desc", campos: CAMPOS_LISTA, cursor }
+      });
+      setData((previos) => (cursor === null ? res.data.articulos : [...previos, ...res.data.articulos]));
+      setSiguiente(res.data.siguiente);
+      setTotal(res.data.total_articulos);
     } catch (error) {
       console.error("Error al cargar artículos:", error);
     } finally {
@@ -21,6 +31,15 @@ export default function Articulos() {
     }
   };
 
+  const abrirArticulo = async (id) => {
+    try {
+      const res = await api.get(`/articulos/${id}`);
+      setSeleccionado(res.data);
+    } catch (error) {
+      alert("Error al cargar el artículo: " + error.message);
+    }
+  };
+
   if (cargando) return <div style={{ padding: "20px" }}>Cargando artículos...</div>;
 
   const eliminarArticulo = async (id) => {
@@ -141,7 +160,7 @@ export default function Articulos() {
 
   return (
     <div style={{ maxWidth: "1000px", margin: "0 auto" }}>
-      <h1 style={{ fontSize: "24px", marginBottom: "20px", fontWeight: "bold" }}>Artículos guardados ({data.length})</h1>
+      <h1 style={{ fontSize: "24px", marginBottom: "20px", fontWeight: "bold" }}>Artículos guardados ({total})</h1>
 
       {data.length === 0 ? (
         <p style={{ color: "#999" }}>No hay artículos guardados aún</p>
@@ -171,21 +190,18 @@ export default function Articulos() {
             >
               <h2 
                 style={{ fontWeight: "bold", fontSize: "18px", marginBottom: "8px", color: "#2563eb" }}
-                onClick={() => setSeleccionado(a)}
+                onClick={() => abrirArticulo(a.id)}
               >
                 {a.titulo}
               </h2>
               <p style={{ fontSize: "12px", color: "#999", marginBottom: "10px" }}>{a.fecha_guardado}</p>
-              <p style={{ marginTop: "10px", lineHeight: "1.5", color: "#666", maxHeight: "80px", overflow: "hidden" }}>
-                {a.resumen}
-              </p>
 
               <p style={{ marginTop: "10px", color: "#2563eb", fontSize: "14px" }}>
                 Etiquetas: {a.etiquetas.join(", ")}
               </p>
 
               <button
-                onClick={() => setSeleccionado(a)}
+                onClick={() => abrirArticulo(a.id)}
                 style={{
                   backgroundColor: "#2563eb",
                   color: "white",
@@ -220,6 +236,24 @@ export default function Articulos() {
           ))}
         </div>
       )}
+
+      {siguiente !== null && (
+        <button
+          onClick={() => cargarArticulos(siguiente)}
+          style={{
+            backgroundColor: "#6b7280",
+            color: "white",
+            padding: "10px 20px",
+            border: "none",
+            cursor: "pointer",
+            borderRadius: "4px",
+            fontSize: "14px",
+            marginTop: "20px"
+          }}
+        >
+          Cargar más
+        </button>
+      )}
     </div>
   );
 }
\ No newline at end of file
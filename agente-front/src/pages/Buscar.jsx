@@ -6,21 +6,54 @@ export default function Buscar() {
   const [resultado, setResultado] = useState("");
   const [cargando, setCargando] = useState(false);
   const [articulos, setArticulos] = useState([]);
+  const [temaBuscado, setTemaBuscado] = useState("");
 
   const buscar = async () => {
+    if (cargando) return; // Evita reenviar con Enter mientras hay una búsqueda en curso
     if (!tema.trim()) {
       alert("Por favor ingresa un tema");
       return;
     }
     
     setCargando(true);
+    setResultado("");
+    setArticulos([]);
+    setTemaBuscado(tema);
     try {
-      const res = await api.post("/buscar", { tema });
-      setResultado(res.data.resultados);
-      
-      // Parsear artículos del resultado
-      const arts = parsearArticulos(res.data.resultados);
-      setArticulos(arts);
+      // Streaming SSE: cada artículo se muestra en cuanto su sección está completa
+      const res = await fetch(`${api.defaults.baseURL}/buscar/stream`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ tema }),
+      });
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+
+      const lector = res.body.getReader();
+      const decodificador = new TextDecoder();
+      let pendiente = "";
+      while (true) {
+        const { value, done } = await lector.read();
+        if (done) break;
+        pendiente += decodificador.decode(value, { stream: true });
+        const eventos = pendiente.split("\n\n");
+        pendiente = eventos.pop();
+        for (const bloque of eventos) {
+          const tipo = bloque.match(/^event: (.+)$/m)?.[1];
+          const datos = JSON.parse(bloque.match(/^data: (.+)$/m)?.[1] || "{}");
+          if (tipo === "token") {
+            setResultado((previo) => previo + datos.texto);
+          } else if (tipo === "articulo") {
+            if (datos.articulo) {
+              setArticulos((previos) => [...previos, aTarjeta(datos.articulo, datos.texto)]);
+            }
+          } else if (tipo === "fin") {
+            setResultado(datos.texto);
+            setArticulos((previos) => ordenarPorNivel(previos));
+          } else if (tipo === "error") {
+            throw new Error(datos.detalle);
+          }
+        }
+      }
     } catch (error) {
       alert("Error en la búsqueda: " + error.message);
     } finally {
@@ -28,35 +61,21 @@ export default function Buscar() {
     }
   };
 
-  const parsearArticulos = (texto) => {
-    const articulos = [];
-    const matches = texto.split("ARTÍCULO").slice(1);
-    
+  // El backend ya entrega cada artículo parseado (título, descripción, conceptos, nivel, etiquetas)
+  const aTarjeta = (art, texto) => ({
+    id: art.numero,
+    numero: art.numero,
+    titulo: art.titulo,
+    resumen: art.descripcion || "Sin descripción",
+    conceptos: art.conceptos.join(", "),
+    nivel: art.nivel || "Intermedio",
+    etiquetas: art.etiquetas,
+    textoCompleto: texto
+  });
+
+  const ordenarPorNivel = (lista) => {
     const nivelOrden = { "Principiante": 1, "Intermedio": 2, "Avanzado": 3 };
-    
-    const articulosParsados = matches.map((match, index) => {
-      const titulo = match.match(/Título:\s*(.+)/)?.[1] || "Sin título";
-      const descripcionMatch = match.match(/Descripción:\s*([\s\S]+?)(?=Conceptos:|Nivel:|$)/);
-      const descripcion = descripcionMatch?.[1] || "Sin descripción";
-      const conceptos = match.match(/Conceptos:\s*(.+)/)?.[1] || "";
-      const nivel = match.match(/Nivel:\s*(.+)/)?.[1]?.trim() || "Intermedio";
-      const etiquetas = match.match(/Etiquetas:\s*(.+)/)?.[1]?.split(",").map(e => e.trim()) || [];
-      
-      return {
-        id: index,
-        titulo: titulo.trim(),
-        resumen: descripcion.trim(),
-        conceptos: conceptos.trim(),
-        nivel: nivel,
-        etiquetas: etiquetas,
-        textoCompleto: match
-      };
-    });
-    
-    // Ordenar por nivel de dificultad
-    return articulosParsados.sort((a, b) => {
-      return (nivelOrden[a.nivel] || 2) - (nivelOrden[b.nivel] || 2);
-    });
+    return [...lista].sort((a, b) => (nivelOrden[a.nivel] || 2) - (nivelOrden[b.nivel] || 2));
   };
 
   const guardarArticulo = async (art) => {
@@ -66,19 +85,15 @@ export default function Buscar() {
     
     if (etiquetasAdicionales === null) return; // Cancelar
     
-    const etiquetasFinales = [
-      ...art.etiquetas,
-      ...etiquetasAdicionales
-        .split(",")
-        .map(e => e.trim())
-        .filter(e => e.length > 0)
-    ];
-
     try {
-      await api.post("/articulos", {
-        titulo: art.titulo,
-        resumen: art.resumen,
-        etiquetas: etiquetasFinales.length > 0 ? etiquetasFinales : art.etiquetas
+      // El servidor guarda la sugerencia N de la búsqueda sin reenviar su contenido
+      await api.post("/buscar/guardar", {
+        tema: temaBuscado,
+        numero: art.numero,
+        etiquetas_adicionales: etiquetasAdicionales
+          .split(",")
+          .map(e => e.trim())
+          .filter(e => e.length > 0)
       });
       alert("Artículo guardado correctamente");
     } catch (error) {
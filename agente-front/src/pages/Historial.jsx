@@ -3,16 +3,22 @@ import api from "../api/api";
 
 export default function Historial() {
   const [hist, setHist] = useState([]);
+  const [siguiente, setSiguiente] = useState(null);
   const [cargando, setCargando] = useState(true);
 
-  useEffect(() => {
-    api.get("/historial").then((res) => {
-      setHist(res.data.historial);
+  const cargarPagina = (desplazamiento = 0) => {
+    api.get("/historial", { params: { limite: 20, desplazamiento } }).then((res) => {
+      setHist((previos) => (desplazamiento === 0 ? res.data.historial : [...previos, ...res.data.historial]));
+      setSiguiente(res.data.siguiente);
       setCargando(false);
     }).catch(error => {
       console.error("Error:", error);
       setCargando(false);
     });
+  };
+
+  useEffect(() => {
+    cargarPagina();
   }, []);
 
   if (cargando) return <div style={{ padding: "20px" }}>Cargando historial...</div>;
@@ -24,8 +30,8 @@ export default function Historial() {
       {hist.length === 0 ? (
         <p style={{ color: "#999" }}>No hay búsquedas en el historial</p>
       ) : (
-        hist.map((h, i) => (
-          <div key={i} style={{
+        hist.map((h) => (
+          <div key={h.indice} style={{
             border: "1px solid #ddd",
             padding: "15px",
             marginBottom: "15px",
@@ -38,6 +44,23 @@ export default function Historial() {
           </div>
         ))
       )}
+
+      {siguiente !== null && (
+        <button
+          onClick={() => cargarPagina(siguiente)}
+          style={{
+            backgroundColor: "#6b7280",
+            color: "white",
+            padding: "10px 20px",
+            border: "none",
+            cursor: "pointer",
+            borderRadius: "4px",
+            fontSize: "14px"
+          }}
+        >
+          Cargar más
+        </button>
+      )}
     </div>
   );
 }
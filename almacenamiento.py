@@ -0,0 +1,679 @@
+# almacenamiento.py - Motores de almacenamiento para MemoriaPersistente
+import atexit
+import glob
+import json
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+
+import config
+import metricas
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos, solo entre hilos
+    fcntl = None
+
+
+class BloqueoArchivo:
+    """Exclusión entre escritores: reentrante entre hilos y con flock entre procesos.
+
+    Los hilos del mismo proceso se serializan con un RLock; el primero que
+    entra toma además un flock exclusivo sobre `ruta`, así que dos workers
+    de uvicorn nunca escriben a la vez.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._hilos = threading.RLock()
+        self._profundidad = 0
+        self._archivo = None
+        self._pid = None
+        self._retenido = False
+        self._proceso = None
+
+    def _descriptor(self):
+        # Tras un fork el descriptor heredado comparte el flock con el padre: se abre uno propio
+        if self._archivo is None or self._pid != os.getpid():
+            self._archivo = open(self.ruta, 'a')
+            self._pid = os.getpid()
+        return self._archivo.fileno()
+
+    def __enter__(self):
+        self._hilos.acquire()
+        if self._profundidad == 0 and fcntl is not None:
+            fcntl.flock(self._descriptor(), fcntl.LOCK_EX)
+        self._profundidad += 1
+        return self
+
+    def __exit__(self, *excepcion):
+        self._profundidad -= 1
+        if self._profundidad == 0 and not self._retenido and fcntl is not None:
+            fcntl.flock(self._archivo.fileno(), fcntl.LOCK_UN)
+        self._hilos.release()
+
+    def retener(self):
+        """Mantiene el flock al salir hasta `soltar()` (datos pendientes de escribir)"""
+        with self._hilos:
+            self._retenido = True
+
+    def soltar(self):
+        with self._hilos:
+            if self._retenido:
+                self._retenido = False
+                if self._profundidad == 0 and fcntl is not None:
+                    fcntl.flock(self._archivo.fileno(), fcntl.LOCK_UN)
+
+    def intentar(self):
+        """Toma el bloqueo sin esperar; retorna False si otro proceso lo tiene"""
+        self._hilos.acquire()
+        if self._profundidad == 0 and fcntl is not None:
+            try:
+                fcntl.flock(self._descriptor(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._hilos.release()
+                return False
+        self._profundidad += 1
+        return True
+
+    def tomar_proceso(self):
+        """Flock exclusivo para todo el proceso, sin esperar; retorna False si otro proceso lo tiene.
+
+        Va en un descriptor propio y no retiene el RLock: cualquier hilo puede
+        soltarlo y los demás hilos siguen pudiendo usar el bloqueo normal.
+        """
+        if fcntl is None:
+            return True
+        archivo = open(self.ruta, 'a')
+        try:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            archivo.close()
+            return False
+        self._proceso = archivo
+        return True
+
+    def soltar_proceso(self):
+        if self._proceso is not None:
+            fcntl.flock(self._proceso.fileno(), fcntl.LOCK_UN)
+            self._proceso.close()
+            self._proceso = None
+
+
+# ==================== ESCRITURA ATÓMICA Y RESPALDOS ====================
+def _sincronizar_directorio(ruta):
+    """fsync del directorio para que el rename sobreviva a un corte de luz"""
+    try:
+        descriptor = os.open(os.path.dirname(os.path.abspath(ruta)), os.O_RDONLY)
+    except OSError:  # Windows no abre directorios
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def _respaldo(ruta, generacion):
+    return f"{ruta}.respaldo.{generacion}"
+
+
+def _rotar_respaldos(ruta, respaldos, intervalo):
+    """Conserva la versión actual como respaldo.1 (y desplaza las anteriores), como mucho una vez por intervalo"""
+    primero = _respaldo(ruta, 1)
+    if not os.path.exists(ruta):
+        return
+    if os.path.exists(primero) and time.time() - os.path.getmtime(primero) < intervalo:
+        return
+    for generacion in range(respaldos - 1, 0, -1):
+        if os.path.exists(_respaldo(ruta, generacion)):
+            os.replace(_respaldo(ruta, generacion), _respaldo(ruta, generacion + 1))
+    try:
+        # Enlace duro: no copia nada y el archivo principal nunca deja de existir
+        os.link(ruta, primero)
+    except OSError:
+        shutil.copy2(ruta, primero)
+
+
+# Se lee una vez al importar (os.umask solo se puede leer cambiándola)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def temporal_junto(ruta):
+    """Ruta de un temporal nuevo y de nombre único en el directorio de `ruta` (para renombrarlo encima)"""
+    descriptor, temporal = tempfile.mkstemp(prefix=os.path.basename(ruta) + ".", suffix=".tmp",
+                                            dir=os.path.dirname(os.path.abspath(ruta)))
+    os.close(descriptor)
+    # mkstemp lo crea con 0600: se dejan los permisos del archivo que reemplaza, o los de la umask
+    try:
+        modo = stat.S_IMODE(os.stat(ruta).st_mode)
+    except FileNotFoundError:
+        modo = 0o666 & ~_UMASK
+    os.chmod(temporal, modo)
+    return temporal
+
+
+def escribir_atomico(ruta, texto, respaldos=0, intervalo_respaldo=0):
+    """Escribe en un temporal, hace fsync y lo renombra encima: queda la versión vieja o la nueva, nunca media.
+
+    `texto` puede ser un str o un iterable de trozos (ver `fragmentos_json`).
+    """
+    temporal = temporal_junto(ruta)
+    with metricas.VOLCADO_SEGUNDOS.cronometro():
+        with open(temporal, 'w', encoding='utf-8') as f:
+            if isinstance(texto, str):
+                f.write(texto)
+            else:
+                f.writelines(texto)
+            f.flush()
+            os.fsync(f.fileno())
+            metricas.VOLCADO_BYTES.observar(f.tell())
+        if respaldos:
+            _rotar_respaldos(ruta, respaldos, intervalo_respaldo)
+        os.replace(temporal, ruta)
+        _sincronizar_directorio(ruta)
+
+
+def fragmentos_json(datos, indent=None):
+    """El mismo texto que json.dumps(datos, indent=indent), por trozos.
+
+    Los valores que son secuencias pero no listas (la ColeccionArticulos de
+    la memoria) se recorren elemento a elemento en vez de convertirse antes
+    en una lista entera; si saben escribirse (`textos_json`), sin
+    materializar cada elemento.
+    """
+    sangria = " " * indent if indent else ""
+    # Uno para todos los elementos: json.dumps crearía un codificador por artículo
+    codificador = json.JSONEncoder(indent=indent, ensure_ascii=False)
+
+    def codificar(valor, nivel):
+        texto = codificador.encode(valor)
+        return texto.replace("\n", "\n" + sangria * nivel) if indent else texto
+
+    yield "{\n" + sangria if indent else "{"
+    for posicion, (clave, valor) in enumerate(datos.items()):
+        if posicion:
+            yield ",\n" + sangria if indent else ", "
+        yield json.dumps(clave, ensure_ascii=False) + ": "
+        if not isinstance(valor, Sequence) or isinstance(valor, (str, list, tuple)):
+            yield codificar(valor, 1)
+        elif not len(valor):
+            yield "[]"
+        else:
+            textos = (valor.textos_json(indent, 2) if hasattr(valor, "textos_json")
+                      else (codificar(elemento, 2) for elemento in valor))
+            for indice, texto in enumerate(textos):
+                separador = ("[" if not indice else ",") + ("\n" + sangria * 2 if indent else " " if indice else "")
+                yield separador + texto
+            yield "\n" + sangria + "]" if indent else "]"
+    yield "\n}" if indent else "}"
+
+
+def leer_json(ruta, respaldos=0):
+    """Lee un JSON guardado o None si no existe.
+
+    Si está dañado se usa el respaldo legible más reciente; si no hay
+    ninguno, el archivo dañado se aparta (no se pisa con una memoria vacía).
+    """
+    if not os.path.exists(ruta):
+        return None
+    for candidato in [ruta] + [_respaldo(ruta, g) for g in range(1, respaldos + 1)]:
+        if not os.path.exists(candidato):
+            continue
+        try:
+            with open(candidato, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            print(f"Memoria dañada en {candidato}: {e}")
+            continue
+        if candidato != ruta:
+            print(f"Memoria recuperada desde {candidato}")
+        return datos
+    apartado = f"{ruta}.corrupto-{int(time.time())}"
+    os.replace(ruta, apartado)
+    print(f"No hay respaldo legible: la memoria dañada se movió a {apartado}")
+    return None
+
+
+def _firma(ruta):
+    """(inodo, tamaño, mtime) del archivo o None si no existe"""
+    try:
+        estado = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return estado.st_ino, estado.st_size, estado.st_mtime_ns
+
+
+class AlmacenamientoJSON:
+    """Guarda el archivo JSON completo con escritura atómica.
+
+    Con escritura diferida (`intervalo_escritura` > 0) cada mutación solo
+    marca los datos como pendientes; un hilo los vuelca cada intervalo o al
+    acumular `lote_escritura` mutaciones. Mientras haya algo pendiente el
+    proceso retiene el flock, así ningún otro worker escribe sobre datos
+    que todavía no puede ver.
+    """
+
+    def __init__(self, archivo,
+                 intervalo_escritura=config.JSON_INTERVALO_ESCRITURA,
+                 lote_escritura=config.JSON_LOTE_ESCRITURA,
+                 respaldos=config.MEMORIA_RESPALDOS,
+                 intervalo_respaldo=config.MEMORIA_INTERVALO_RESPALDO):
+        self.archivo = archivo
+        self.intervalo_escritura = intervalo_escritura
+        self.lote_escritura = lote_escritura
+        self.respaldos = respaldos
+        self.intervalo_respaldo = intervalo_respaldo
+        self.bloqueo = threading.RLock()
+        self.bloqueo_escritura = BloqueoArchivo(archivo + ".lock")
+        self._firma = None
+        self._datos = None
+        self._pendientes = 0
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def cargar(self):
+        """Retorna (datos, operaciones pendientes); datos es None si no hay archivo"""
+        with self.bloqueo_escritura:
+            datos = leer_json(self.archivo, self.respaldos)
+            self._firma = _firma(self.archivo)
+            return datos, []
+
+    def guardar(self, datos):
+        """Guarda la memoria completa en archivo JSON"""
+        try:
+            with self.bloqueo_escritura:
+                escribir_atomico(self.archivo, fragmentos_json(datos, indent=2),
+                                 self.respaldos, self.intervalo_respaldo)
+                self._firma = _firma(self.archivo)
+                self._pendientes = 0
+                self.bloqueo_escritura.soltar()
+            return True
+        except Exception as e:
+            print(f"Error al guardar memoria: {e}")
+            return False
+
+    def registrar(self, operacion, datos):
+        """Persiste una mutación ya aplicada sobre los datos (requiere bloqueo_escritura)"""
+        if not self.intervalo_escritura:
+            return self.guardar(datos)
+        with self.bloqueo_escritura:
+            self._datos = datos
+            self._pendientes += 1
+            self.bloqueo_escritura.retener()
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="escritura-memoria", daemon=True)
+                self._hilo.start()
+                atexit.register(self.cerrar)
+            if self._pendientes >= self.lote_escritura:
+                return self.vaciar()
+        return True
+
+    def vaciar(self):
+        """Escribe ya las mutaciones pendientes"""
+        # Las mutaciones también toman bloqueo_escritura: los datos no cambian mientras se serializan
+        with self.bloqueo_escritura:
+            if not self._pendientes:
+                return True
+            return self.guardar(self._datos)
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo_escritura):
+            self.vaciar()
+
+    # ---------- otros procesos ----------
+    def hay_cambios_externos(self):
+        return _firma(self.archivo) != self._firma
+
+    def cambios_externos(self):
+        """(datos, operaciones) si otro proceso reescribió el archivo; None si no (requiere bloqueo_escritura)"""
+        if not self.hay_cambios_externos():
+            return None
+        cambios = self.cargar()
+        return cambios if cambios[0] is not None else None
+
+    def cerrar(self):
+        """Detiene el hilo de escritura y vuelca lo pendiente"""
+        self._detener.set()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(timeout=5)
+        self.vaciar()
+
+
+class AlmacenamientoDiario:
+    """Diario append-only de operaciones con compactación en segundo plano.
+
+    Cada mutación añade una línea JSON compacta al diario; el fsync se hace
+    por lotes. Periódicamente el diario se compacta en una instantánea del
+    archivo de memoria, que guarda la última secuencia incluida para que el
+    arranque reproduzca solo la cola del diario.
+
+    Varios procesos pueden compartir el diario: escriben bajo flock, con
+    la secuencia global, y leen la cola que añadieron los demás.
+    """
+
+    CLAVE_SECUENCIA = "_secuencia_diario"
+
+    def __init__(self, archivo,
+                 intervalo_fsync=config.DIARIO_INTERVALO_FSYNC,
+                 lote_fsync=config.DIARIO_LOTE_FSYNC,
+                 umbral_compactacion=config.DIARIO_UMBRAL_COMPACTACION,
+                 intervalo_compactacion=config.DIARIO_INTERVALO_COMPACTACION,
+                 respaldos=config.MEMORIA_RESPALDOS,
+                 intervalo_respaldo=config.MEMORIA_INTERVALO_RESPALDO):
+        self.archivo = archivo
+        self.archivo_diario = archivo + ".diario"
+        self.intervalo_fsync = intervalo_fsync
+        self.lote_fsync = lote_fsync
+        self.umbral_compactacion = umbral_compactacion
+        self.intervalo_compactacion = intervalo_compactacion
+        self.respaldos = respaldos
+        self.intervalo_respaldo = intervalo_respaldo
+        self.bloqueo = threading.RLock()
+        self.bloqueo_escritura = BloqueoArchivo(archivo + ".lock")
+        self._bloqueo_compactacion = BloqueoArchivo(archivo + ".compactacion.lock")
+        self.secuencia = 0
+        self._datos = None
+        self._diario = None
+        self._lector = None
+        self._resto = b""
+        self._externas = []
+        self._hueco = False
+        self._pendientes_fsync = 0
+        self._operaciones_diario = 0
+        self._ultima_compactacion = time.monotonic()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    # ---------- arranque ----------
+    def _segmentos(self):
+        """Segmentos rotados pendientes de compactar, en orden de secuencia"""
+        segmentos = []
+        for ruta in glob.glob(glob.escape(self.archivo_diario) + ".*"):
+            sufijo = ruta.rsplit(".", 1)[1]
+            if sufijo.isdigit():
+                segmentos.append((int(sufijo), ruta))
+        return [ruta for _, ruta in sorted(segmentos)]
+
+    @staticmethod
+    def _decodificar(lineas):
+        registros = []
+        for linea in lineas:
+            try:
+                registros.append(json.loads(linea))
+            except json.JSONDecodeError:
+                # Línea truncada por un cierre abrupto: se descarta
+                continue
+        return registros
+
+    def _leer_registros(self, ruta):
+        with open(ruta, 'rb') as f:
+            return self._decodificar(f.read().splitlines())
+
+    def cargar(self):
+        """Lee la instantánea y retorna las operaciones posteriores a ella"""
+        with self.bloqueo_escritura:
+            secuencia_instantanea = 0
+            datos = leer_json(self.archivo, self.respaldos)
+            if datos is not None:
+                secuencia_instantanea = datos.pop(self.CLAVE_SECUENCIA, 0)
+
+            self.secuencia = secuencia_instantanea
+            registros = []
+            for ruta in self._segmentos():
+                registros.extend(self._leer_registros(ruta))
+            # El diario vivo se deja abierto para seguir leyendo lo que añadan otros procesos
+            self._abrir_lector()
+            registros.extend(self._leer_nuevos())
+
+            operaciones = self._posteriores(registros)
+            self._operaciones_diario = len(operaciones)
+            # Quien llama se queda con datos nuevos: hasta el próximo registrar no hay qué compactar
+            self._datos = None
+            self._externas = []
+            self._hueco = False
+            if self._diario is not None:
+                self._sincronizar()
+                self._diario.close()
+            self._abrir()
+            return datos, operaciones
+
+    def _posteriores(self, registros, continuas=False):
+        """Operaciones con secuencia mayor que la ya aplicada, sin repetir.
+
+        Con `continuas` un salto en la secuencia marca `_hueco`: otro proceso
+        rotó el diario más de una vez desde la última lectura y los registros
+        intermedios solo están ya en la instantánea. La cabecera que abre cada
+        diario rotado ({"rotado": secuencia}) delata el salto aunque el diario
+        nuevo aún no tenga operaciones.
+        """
+        operaciones = []
+        for registro in registros:
+            if "rotado" in registro:
+                if continuas and registro["rotado"] > self.secuencia:
+                    self._hueco = True
+                    return []
+                continue
+            secuencia = registro.pop("seq", 0)
+            if secuencia <= self.secuencia:
+                continue
+            if continuas and secuencia != self.secuencia + 1:
+                self._hueco = True
+                return []
+            operaciones.append(registro)
+            self.secuencia = secuencia
+        return operaciones
+
+    def _abrir(self):
+        nuevo = not os.path.exists(self.archivo_diario)
+        self._diario = open(self.archivo_diario, 'a', encoding='utf-8')
+        if not nuevo and self._diario.tell() > 0:
+            with open(self.archivo_diario, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Cola truncada: se cierra la línea para no pegarle la siguiente
+                    self._diario.write("\n")
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name="diario-memoria", daemon=True)
+            self._hilo.start()
+            atexit.register(self.cerrar)
+
+    # ---------- otros procesos ----------
+    def _abrir_lector(self):
+        if self._lector is not None:
+            self._lector.close()
+        self._resto = b""
+        try:
+            self._lector = open(self.archivo_diario, 'rb')
+        except FileNotFoundError:
+            self._lector = None
+
+    def _leer_nuevos(self):
+        """Registros completos añadidos al diario desde la última lectura.
+
+        Si otro proceso rotó el diario, termina el segmento viejo (sigue
+        abierto) y continúa desde el principio del nuevo.
+        """
+        registros = []
+        while True:
+            if self._lector is None:
+                self._abrir_lector()
+                if self._lector is None:
+                    return registros
+            datos = self._resto + self._lector.read()
+            lineas = datos.split(b"\n")
+            self._resto = lineas.pop()
+            registros.extend(self._decodificar(lineas))
+            firma = _firma(self.archivo_diario)
+            if firma is not None and firma[0] == os.fstat(self._lector.fileno()).st_ino:
+                return registros
+            self._abrir_lector()
+
+    def hay_cambios_externos(self):
+        if self._externas or self._hueco:
+            return True
+        if self._lector is None:
+            return os.path.exists(self.archivo_diario)
+        firma = _firma(self.archivo_diario)
+        return (firma is None or firma[0] != os.fstat(self._lector.fileno()).st_ino
+                or firma[1] > self._lector.tell())
+
+    def cambios_externos(self):
+        """Operaciones que escribieron otros procesos, o (datos, operaciones) si hay que recargar todo.
+
+        Requiere bloqueo_escritura.
+        """
+        operaciones = self._posteriores(self._leer_nuevos(), continuas=True)
+        if self._hueco:
+            return self.cargar()
+        operaciones = self._externas + operaciones
+        self._externas = []
+        # También cuentan para la compactación: están en el diario igual que las propias
+        self._operaciones_diario += len(operaciones)
+        return operaciones
+
+    def _reabrir_si_rotado(self):
+        """Otro proceso compactó: el manejador de escritura apunta al segmento rotado"""
+        firma = _firma(self.archivo_diario)
+        if self._diario is None or firma is None or firma[0] != os.fstat(self._diario.fileno()).st_ino:
+            if self._diario is not None:
+                self._sincronizar()
+                self._diario.close()
+            self._abrir()
+
+    # ---------- escritura ----------
+    def registrar(self, operacion, datos):
+        """Añade la operación al diario; el fsync se agrupa por lotes (requiere bloqueo_escritura)"""
+        try:
+            with self.bloqueo_escritura, self.bloqueo:
+                self._reabrir_si_rotado()
+                self.secuencia += 1
+                registro = {"seq": self.secuencia, **operacion}
+                self._diario.write(json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n")
+                self._diario.flush()
+                # Los datos ya estaban al día: lo propio no hace falta volver a leerlo
+                if self._lector is not None and not self._externas:
+                    self._lector.seek(0, os.SEEK_END)
+                    self._resto = b""
+                self._datos = datos
+                self._pendientes_fsync += 1
+                self._operaciones_diario += 1
+                if self._pendientes_fsync >= self.lote_fsync:
+                    self._sincronizar()
+            return True
+        except Exception as e:
+            print(f"Error al guardar memoria: {e}")
+            return False
+
+    def _sincronizar(self):
+        if self._diario is not None and self._pendientes_fsync:
+            self._diario.flush()
+            os.fsync(self._diario.fileno())
+            self._pendientes_fsync = 0
+
+    def vaciar(self):
+        """fsync inmediato del diario"""
+        with self.bloqueo:
+            self._sincronizar()
+        return True
+
+    def guardar(self, datos):
+        """Fuerza una compactación con los datos actuales"""
+        with self.bloqueo:
+            self._datos = datos
+            self._operaciones_diario = max(self._operaciones_diario, 1)
+        return self.compactar()
+
+    # ---------- compactación ----------
+    def compactar(self):
+        """Vuelca los datos en una instantánea y descarta el diario cubierto"""
+        if not self._bloqueo_compactacion.intentar():
+            return True  # otro proceso está compactando
+        try:
+            with self.bloqueo_escritura, self.bloqueo:
+                if self._datos is None or self._operaciones_diario == 0:
+                    return True
+                # Solo se compacta con los datos al día; si otro proceso escribió,
+                # sus operaciones quedan para cambios_externos() y se reintenta luego
+                self._externas.extend(self._posteriores(self._leer_nuevos(), continuas=True))
+                if self._externas or self._hueco:
+                    return True
+                self._sincronizar()
+                secuencia = self.secuencia
+                self._reabrir_si_rotado()
+                self._diario.close()
+                if os.path.exists(self.archivo_diario):
+                    os.replace(self.archivo_diario, f"{self.archivo_diario}.{secuencia}")
+                self._abrir()
+                self._diario.write(json.dumps({"rotado": secuencia}) + "\n")
+                self._diario.flush()
+                self._abrir_lector()
+                self._operaciones_diario = 0
+                self._ultima_compactacion = time.monotonic()
+                # Copia superficial: los registros no se modifican una vez guardados,
+                # así que basta copiar los contenedores para serializar fuera del bloqueo
+                instantanea = {
+                    clave: valor.copy() if isinstance(valor, (list, dict))
+                    else valor.instantanea() if hasattr(valor, "instantanea") else valor
+                    for clave, valor in self._datos.items()
+                }
+                instantanea[self.CLAVE_SECUENCIA] = secuencia
+
+            # Sin sangría: json usa el codificador en C y libera antes el GIL
+            texto = "".join(fragmentos_json(instantanea))
+            # Instantánea y borrado de segmentos bajo flock: quien arranque ve
+            # la instantánea vieja con sus segmentos o la nueva, nunca un hueco
+            with self.bloqueo_escritura:
+                escribir_atomico(self.archivo, texto, self.respaldos, self.intervalo_respaldo)
+                for ruta in self._segmentos():
+                    if int(ruta.rsplit(".", 1)[1]) <= secuencia:
+                        os.remove(ruta)
+            return True
+        except Exception as e:
+            print(f"Error al compactar memoria: {e}")
+            return False
+        finally:
+            self._bloqueo_compactacion.__exit__()
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo_fsync):
+            with self.bloqueo:
+                self._sincronizar()
+                operaciones = self._operaciones_diario
+            vencido = time.monotonic() - self._ultima_compactacion >= self.intervalo_compactacion
+            if operaciones >= self.umbral_compactacion or (operaciones and vencido):
+                self.compactar()
+
+    def cerrar(self):
+        """Detiene el hilo de fondo y sincroniza el diario"""
+        self._detener.set()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(timeout=5)
+        with self.bloqueo:
+            if self._diario is not None:
+                self._sincronizar()
+                self._diario.close()
+                self._diario = None
+            if self._lector is not None:
+                self._lector.close()
+                self._lector = None
+
+
+MOTORES = {
+    "json": AlmacenamientoJSON,
+    "diario": AlmacenamientoDiario,
+}
+
+
+def crear_almacenamiento(archivo, motor=None):
+    """Crea el motor de almacenamiento configurado"""
+    motor = motor or config.ALMACENAMIENTO
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de almacenamiento desconocido: '{motor}'")
+    return MOTORES[motor](archivo)
@@ -1,16 +1,28 @@
 # backend.py - API REST para Agente Curador
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Union
+from contextlib import ExitStack, asynccontextmanager
+from datetime import date, datetime, timedelta
+import io
 import json
 import os
 import sys
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
+import tempfile
 from dotenv import load_dotenv
+from memoria import EscritorAsync, crear_memoria
+from buscador import HerramientaBuscador
+from cache_respuestas import crear_cache
+from cache_http import RespuestasVersionadas
+from indice_texto import IndiceTexto
+from indice_vectorial import IndiceVectorial
+from precalentador import Precalentador
+import exportador
+import importador
+import config
+import metricas
 
 load_dotenv()
 
@@ -29,9 +41,34 @@ class ArticuloRequest(BaseModel):
 class BusquedaRequest(BaseModel):
     tema: str
 
+class ArticuloSugerido(BaseModel):
+    numero: int
+    titulo: str
+    descripcion: str
+    conceptos: List[str]
+    nivel: Optional[str] = None
+    etiquetas: List[str]
+
+class BusquedaResponse(BaseModel):
+    exito: bool
+    tema: str
+    resultados: str
+    articulos: List[ArticuloSugerido]
+    fecha: str
+
+class GuardarSugerenciaRequest(BaseModel):
+    tema: str
+    numero: int
+    etiquetas_adicionales: List[str] = []
+    url: Optional[str] = None
+
 class ResumenRequest(BaseModel):
     contenido: str
 
+class ResumenLoteRequest(BaseModel):
+    contenidos: List[str] = Field(..., min_length=1)
+    concurrencia_max: Optional[int] = Field(None, ge=1, le=config.LOTE_CONCURRENCIA_MAX)
+
 class Articulo(BaseModel):
     id: int
     fecha_guardado: str
@@ -40,191 +77,137 @@ class Articulo(BaseModel):
     etiquetas: List[str]
     url: Optional[str] = None
 
+class ErrorImportacion(BaseModel):
+    linea: int
+    motivo: str
+
+class ImportacionResponse(BaseModel):
+    insertados: int
+    duplicados: int
+    rechazados: int
+    errores: List[ErrorImportacion]
+
+class ArticuloParcial(BaseModel):
+    """Artículo con solo los campos pedidos en `campos`"""
+    id: int
+    fecha_guardado: Optional[str] = None
+    titulo: Optional[str] = None
+    resumen: Optional[str] = None
+    etiquetas: Optional[List[str]] = None
+    url: Optional[str] = None
+
+class PaginaArticulos(BaseModel):
+    articulos: List[ArticuloParcial]
+    siguiente: Optional[int] = None
+    total_articulos: int
+
+class ArticuloEncontrado(Articulo):
+    puntuacion: float
+
+class BusquedaTextoResponse(BaseModel):
+    consulta: str
+    total: int
+    limite: int
+    desplazamiento: int
+    resultados: List[ArticuloEncontrado]
+
+class ArticuloSimilar(Articulo):
+    similitud: float
+
+class BusquedaSemanticaResponse(BaseModel):
+    consulta: str
+    resultados: List[ArticuloSimilar]
+    pendientes: int
+
+class SimilaresResponse(BaseModel):
+    id: int
+    resultados: List[ArticuloSimilar]
+    pendientes: int
+
+class EstadisticasCache(BaseModel):
+    entradas: int
+    aciertos_exactos: int
+    aciertos_similares: int
+    fallos: int
+    tasa_aciertos: float
+
+class EstadisticasCoalescencia(BaseModel):
+    llamadas: int
+    coalescidas: int
+    en_vuelo: int
+
+class EstadisticasResiliencia(BaseModel):
+    llamadas: int
+    reintentos: int
+    plazos_agotados: int
+    fallos: int
+    respaldos_modelo: int
+    respaldos_cache: int
+    circuito: str
+    aperturas: int
+    rechazadas: int
+
+class EstadisticasPrecalentador(BaseModel):
+    activo: bool
+    pasadas: int
+    llamadas: int
+    errores: int
+    omitidas_presupuesto: int
+    omitidas_ocupado: int
+    presupuesto_restante: int
+    busquedas: int
+    busquedas_precalentadas: int
+    tasa_precalentadas: float
+    ultimo_error: Optional[str] = None
+
 class EstadisticasResponse(BaseModel):
     total_busquedas: int
     total_articulos_guardados: int
     etiquetas_unicas: int
+    cache: Optional[EstadisticasCache] = None
+    coalescencia: Optional[EstadisticasCoalescencia] = None
+    resiliencia: Optional[EstadisticasResiliencia] = None
+    precalentador: Optional[EstadisticasPrecalentador] = None
 
-# ==================== MEMORIA PERSISTENTE ====================
-class MemoriaPersistente:
-    def __init__(self, archivo="curator_memory.json"):
-        self.archivo = archivo
-        self.datos = self.cargar_memoria()
-    
-    def cargar_memoria(self):
-        if os.path.exists(self.archivo):
-            try:
-                with open(self.archivo, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error al cargar memoria: {e}")
-                return self.estructura_inicial()
-        return self.estructura_inicial()
-    
-    def estructura_inicial(self):
-        return {
-            "historial_busquedas": [],
-            "articulos_guardados": [],
-            "etiquetas": [],
-            "preferencias": {
-                "temas_favoritos": [],
-                "idioma_preferido": "español"
-            },
-            "estadisticas": {
-                "total_busquedas": 0,
-                "total_articulos_guardados": 0
-            }
-        }
-    
-    def guardar_memoria(self):
-        try:
-            with open(self.archivo, 'w', encoding='utf-8') as f:
-                json.dump(self.datos, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            print(f"Error al guardar memoria: {e}")
-            return False
-    
-    def agregar_busqueda(self, query, resultados):
-        busqueda = {
-            "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "query": query,
-            "num_resultados": resultados
-        }
-        self.datos["historial_busquedas"].append(busqueda)
-        self.datos["estadisticas"]["total_busquedas"] += 1
-        self.guardar_memoria()
-    
-    def guardar_articulo(self, titulo, resumen, etiquetas, url=None):
-        articulo = {
-            "id": len(self.datos["articulos_guardados"]) + 1,
-            "fecha_guardado": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "titulo": titulo,
-            "resumen": resumen,
-            "etiquetas": etiquetas,
-            "url": url
-        }
-        self.datos["articulos_guardados"].append(articulo)
-        self.datos["estadisticas"]["total_articulos_guardados"] += 1
-        
-        for etiqueta in etiquetas:
-            if etiqueta not in self.datos["etiquetas"]:
-                self.datos["etiquetas"].append(etiqueta)
-        
-        self.guardar_memoria()
-        return articulo["id"]
-    
-    def obtener_estadisticas(self):
-        return self.datos["estadisticas"]
-    
-    def buscar_por_etiqueta(self, etiqueta):
-        return [art for art in self.datos["articulos_guardados"] 
-                if etiqueta.lower() in [e.lower() for e in art["etiquetas"]]]
-    
-    def obtener_articulos(self):
-        return self.datos["articulos_guardados"]
-    
-    def obtener_historial(self, limite=10):
-        return self.datos["historial_busquedas"][-limite:]
-    
-    def obtener_etiquetas(self):
-        return self.datos["etiquetas"]
-    
-    def eliminar_articulo(self, id_articulo):
-        """Elimina un artículo por ID"""
-        self.datos["articulos_guardados"] = [
-            art for art in self.datos["articulos_guardados"] 
-            if art["id"] != id_articulo
-        ]
-        self.datos["estadisticas"]["total_articulos_guardados"] = len(self.datos["articulos_guardados"])
-        self.guardar_memoria()
-        return True
+class RespuestaJSON(JSONResponse):
+    """JSONResponse que mide la codificación del cuerpo (etapa serializacion)"""
     
-    def eliminar_busqueda(self, index):
-        """Elimina una búsqueda por índice"""
-        if 0 <= index < len(self.datos["historial_busquedas"]):
-            self.datos["historial_busquedas"].pop(index)
-            self.datos["estadisticas"]["total_busquedas"] = len(self.datos["historial_busquedas"])
-            self.guardar_memoria()
-            return True
-        return False
-    
-    def limpiar_historial(self):
-        """Limpia todo el historial"""
-        self.datos["historial_busquedas"] = []
-        self.datos["estadisticas"]["total_busquedas"] = 0
-        self.guardar_memoria()
-        return True
-
-# ==================== HERRAMIENTA BUSCADOR ====================
-class HerramientaBuscador:
-    def __init__(self, llm):
-        self.llm = llm
-        self.prompt_busqueda = PromptTemplate(
-            input_variables=["tema"],
-            template="""Eres un experto curador de contenido técnico. 
-            
-Genera una lista de 5 artículos técnicos recomendados sobre: {tema}
-
-Para cada artículo proporciona:
-- Título sugerido
-- Breve descripción (2-3 líneas)
-- Conceptos clave
-- Nivel de dificultad (Principiante/Intermedio/Avanzado)
-- 2-3 etiquetas relevantes
-
-Formato de respuesta:
-ARTÍCULO 1:
-Título: [título]
-Descripción: [descripción]
-Conceptos: [conceptos separados por comas]
-Nivel: [nivel]
-Etiquetas: [etiquetas separadas por comas]
-
-[Repite para los 5 artículos]"""
-        )
-        
-        self.prompt_resumen = PromptTemplate(
-            input_variables=["contenido"],
-            template="""Analiza el siguiente contenido técnico y genera un resumen estructurado:
+    def render(self, content):
+        with metricas.ETAPAS.cronometro(etapa="serializacion"):
+            return super().render(content)
 
-CONTENIDO:
-{contenido}
+# ==================== INICIALIZACIÓN FASTAPI ====================
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    if config.PERFILADOR_ACTIVO:
+        metricas.PERFILADOR.activar()
+    if config.PRECALENTADOR_ACTIVO and precalentador is not None:
+        precalentador.iniciar()
+    # Al apagar: terminar las escrituras en cola y volcar la escritura diferida.
+    # ExitStack los llama en orden inverso al registro y, aunque uno falle, llama a los demás
+    with ExitStack() as cierre:
+        if buscador.cache is not None:
+            cierre.callback(buscador.cache.cerrar)
+        cierre.callback(vectores.cerrar)
+        cierre.callback(memoria.cerrar)
+        cierre.callback(escritor.cerrar)
+        cierre.callback(metricas.PERFILADOR.desactivar)
+        if precalentador is not None:
+            cierre.callback(precalentador.detener)
+        yield
 
-Proporciona:
-1. Resumen ejecutivo (3-4 líneas)
-2. Puntos clave (máximo 5 puntos)
-3. Tecnologías mencionadas
-4. Público objetivo
-5. 3-5 etiquetas descriptivas
 
-Formato estructurado y claro."""
-        )
-        
-        self.chain_busqueda = LLMChain(llm=self.llm, prompt=self.prompt_busqueda)
-        self.chain_resumen = LLMChain(llm=self.llm, prompt=self.prompt_resumen)
-    
-    def buscar_articulos(self, tema):
-        try:
-            respuesta = self.chain_busqueda.invoke({"tema": tema})
-            return respuesta["text"]
-        except Exception as e:
-            raise Exception(f"Error en búsqueda: {str(e)}")
-    
-    def resumir_contenido(self, contenido):
-        try:
-            respuesta = self.chain_resumen.invoke({"contenido": contenido})
-            return respuesta["text"]
-        except Exception as e:
-            raise Exception(f"Error al resumir: {str(e)}")
-
-# ==================== INICIALIZACIÓN FASTAPI ====================
 app = FastAPI(
     title="API Agente Curador de Artículos",
     description="Backend para gestionar y curar artículos técnicos",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=ciclo_de_vida,
+    default_response_class=RespuestaJSON
 )
 
+# Duración por ruta y peticiones en curso para /metrics
+app.add_middleware(metricas.MiddlewareMetricas)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -232,12 +215,97 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Que un cliente en el navegador pueda leer la marca de /exportar
+    expose_headers=["X-Marca"],
 )
 
 # Inicializar componentes
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7)
-memoria = MemoriaPersistente()
-buscador = HerramientaBuscador(llm)
+memoria = crear_memoria()
+escritor = EscritorAsync(memoria)
+# El LLM y LangChain se cargan con la primera ruta que los usa, no al arrancar
+buscador = HerramientaBuscador(cache=crear_cache())
+respuestas = RespuestasVersionadas()
+
+# Índice de texto completo (se construye en segundo plano), mantenido con cada alta y baja de la memoria
+indice = IndiceTexto()
+indice.construir_en_segundo_plano(memoria.obtener_articulos())
+memoria.suscribir(indice.aplicar_operacion)
+
+# Índice vectorial: los artículos sin vector se calculan en segundo plano
+vectores = IndiceVectorial()
+vectores.sincronizar(memoria.obtener_articulos())
+memoria.suscribir(vectores.aplicar_operacion)
+
+# Con varios workers cada proceso incorpora lo que guardan los demás (y lo pasa a los índices)
+memoria.vigilar()
+
+# Búsquedas frecuentes precalculadas en los ratos ociosos (CURADOR_PRECALENTADOR=1); necesita la caché
+precalentador = Precalentador(buscador, memoria) if buscador.cache is not None else None
+
+# ==================== MÉTRICAS ====================
+# Se leen al exportar: no añaden trabajo a las peticiones
+
+def tamano_memoria():
+    """Bytes en disco de la memoria (y de su diario, si lo hay)"""
+    rutas = [memoria.archivo, memoria.archivo + ".diario"]
+    return sum(os.path.getsize(ruta) for ruta in rutas if os.path.exists(ruta))
+
+def consultas_cache():
+    if buscador.cache is None:
+        return None
+    stats = buscador.cache.estadisticas()
+    return {("exacto",): stats["aciertos_exactos"], ("similar",): stats["aciertos_similares"],
+            ("fallo",): stats["fallos"]}
+
+def contadores_precalentador(*claves):
+    def leer():
+        if precalentador is None:
+            return None
+        stats = precalentador.estadisticas()
+        return {(clave,): stats[clave] for clave in claves}
+    return leer
+
+def contadores_llm(*claves):
+    def leer():
+        stats = buscador.estadisticas_resiliencia()
+        return {(clave,): stats[clave] for clave in claves}
+    return leer
+
+metricas.Medidor("curador_memoria_bytes", "Tamaño en disco de la memoria", funcion=tamano_memoria)
+metricas.Medidor("curador_memoria_version", "Versión de la memoria (sube con cada mutación)",
+                 funcion=lambda: memoria.version)
+metricas.Medidor("curador_articulos", "Artículos guardados",
+                 funcion=lambda: memoria.obtener_estadisticas()["total_articulos_guardados"])
+metricas.Contador("curador_cache_consultas_total", "Consultas a la caché de respuestas por resultado",
+                  etiquetas=("resultado",), funcion=consultas_cache)
+metricas.Medidor("curador_cache_tasa_aciertos", "Fracción de consultas a la caché resueltas sin el LLM",
+                 funcion=lambda: buscador.cache.estadisticas()["tasa_aciertos"] if buscador.cache else None)
+metricas.Medidor("curador_cache_entradas", "Entradas en la caché de respuestas",
+                 funcion=lambda: buscador.cache.estadisticas()["entradas"] if buscador.cache else None)
+metricas.Contador("curador_llm_eventos_total", "Llamadas, reintentos, plazos agotados, fallos y respaldos del LLM",
+                  etiquetas=("evento",),
+                  funcion=contadores_llm("llamadas", "reintentos", "plazos_agotados", "fallos",
+                                         "respaldos_modelo", "respaldos_cache"))
+metricas.Medidor("curador_llm_circuito_abierto", "1 si el circuito del LLM está abierto o en prueba",
+                 funcion=lambda: int(buscador.estadisticas_resiliencia()["circuito"] != "cerrado"))
+metricas.Contador("curador_coalescencia_total", "Llamadas al LLM y peticiones que se unieron a una en curso",
+                  etiquetas=("tipo",),
+                  funcion=lambda: {(clave,): valor for clave, valor in buscador.estadisticas_coalescencia().items()
+                                   if clave != "en_vuelo"})
+metricas.Contador("curador_busquedas_cache_total",
+                  "Búsquedas de usuarios por resultado en la caché (precalentada: la sirvió el precalentador)",
+                  etiquetas=("resultado",),
+                  funcion=lambda: ({(clave,): valor for clave, valor in
+                                    buscador.cache.estadisticas_espacio("busqueda").items()}
+                                   if buscador.cache else None))
+metricas.Medidor("curador_precalentador_tasa", "Fracción de las búsquedas de usuarios servidas precalentadas",
+                 funcion=lambda: precalentador.estadisticas()["tasa_precalentadas"] if precalentador else None)
+metricas.Contador("curador_precalentador_total", "Pasadas, llamadas al LLM, errores y temas omitidos del precalentador",
+                  etiquetas=("evento",),
+                  funcion=contadores_precalentador("pasadas", "llamadas", "errores",
+                                                   "omitidas_presupuesto", "omitidas_ocupado"))
+metricas.Medidor("curador_precalentador_presupuesto", "Llamadas al LLM que le quedan al precalentador en la última hora",
+                 funcion=lambda: precalentador.disponibles() if precalentador else None)
 
 # ==================== RUTAS ====================
 
@@ -249,27 +317,58 @@ def root():
         "documentacion": "/docs"
     }
 
-@app.post("/buscar", tags=["Búsqueda"])
-def buscar_articulos(request: BusquedaRequest):
+@app.post("/buscar", tags=["Búsqueda"], response_model=BusquedaResponse)
+async def buscar_articulos(request: BusquedaRequest):
     """Busca artículos recomendados sobre un tema"""
     try:
-        resultados = buscador.buscar_articulos(request.tema)
-        memoria.agregar_busqueda(request.tema, 5)
+        resultados, articulos = await buscador.abuscar_sugerencias(request.tema)
+        await escritor.ejecutar(memoria.agregar_busqueda, request.tema, len(articulos))
         
         return {
             "exito": True,
             "tema": request.tema,
             "resultados": resultados,
+            "articulos": articulos,
+            "fecha": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/buscar/guardar", tags=["Búsqueda"])
+async def guardar_sugerencia(request: GuardarSugerenciaRequest):
+    """Guarda el artículo sugerido número N de una búsqueda reciente"""
+    sugerido = buscador.sugerencias.obtener(request.tema, request.numero)
+    if sugerido is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No hay un artículo {request.numero} en las búsquedas recientes de '{request.tema}'"
+        )
+    
+    # Etiquetas sugeridas + adicionales, sin repetir
+    etiquetas = list(dict.fromkeys(sugerido["etiquetas"] + [e.strip() for e in request.etiquetas_adicionales if e.strip()]))
+    try:
+        id_articulo = await escritor.ejecutar(
+            memoria.guardar_articulo,
+            sugerido["titulo"],
+            sugerido["descripcion"],
+            etiquetas,
+            request.url
+        )
+        
+        return {
+            "exito": True,
+            "id": id_articulo,
+            "mensaje": "Artículo guardado exitosamente",
             "fecha": datetime.now().isoformat()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/resumir", tags=["Análisis"])
-def resumir_contenido(request: ResumenRequest):
+async def resumir_contenido(request: ResumenRequest):
     """Genera un resumen estructurado de contenido técnico"""
     try:
-        resumen = buscador.resumir_contenido(request.contenido)
+        resumen = await buscador.aresumir_contenido(request.contenido)
         
         return {
             "exito": True,
@@ -279,11 +378,78 @@ def resumir_contenido(request: ResumenRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def formato_sse(evento):
+    """Serializa un evento del buscador como Server-Sent Event"""
+    datos = {clave: valor for clave, valor in evento.items() if clave != "tipo"}
+    return f"event: {evento['tipo']}\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n"
+
+def respuesta_sse(eventos):
+    return StreamingResponse(
+        eventos,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/buscar/stream", tags=["Búsqueda"])
+async def buscar_articulos_stream(request: BusquedaRequest):
+    """Busca artículos enviando tokens y artículos completos como SSE"""
+    async def eventos():
+        try:
+            async for evento in buscador.astream_busqueda(request.tema):
+                if evento["tipo"] == "fin":
+                    await escritor.ejecutar(memoria.agregar_busqueda, request.tema, len(evento["articulos"]))
+                yield formato_sse(evento)
+        except Exception as e:
+            yield formato_sse({"tipo": "error", "detalle": f"Error en búsqueda: {str(e)}"})
+
+    return respuesta_sse(eventos())
+
+@app.post("/resumir/stream", tags=["Análisis"])
+async def resumir_contenido_stream(request: ResumenRequest):
+    """Genera un resumen enviando los tokens como SSE"""
+    async def eventos():
+        try:
+            async for evento in buscador.astream_resumen(request.contenido):
+                yield formato_sse(evento)
+        except Exception as e:
+            yield formato_sse({"tipo": "error", "detalle": f"Error al resumir: {str(e)}"})
+
+    return respuesta_sse(eventos())
+
+@app.post("/resumir/lote", tags=["Análisis"])
+async def resumir_lote(request: ResumenLoteRequest):
+    """Resume varios documentos en paralelo; los resultados respetan el orden de entrada"""
+    resultados = await buscador.aresumir_lote(request.contenidos, request.concurrencia_max)
+    correctos = sum(1 for r in resultados if r["exito"])
+    
+    return {
+        "exito": correctos == len(resultados),
+        "total": len(resultados),
+        "correctos": correctos,
+        "fallidos": len(resultados) - correctos,
+        "resultados": resultados,
+        "fecha": datetime.now().isoformat()
+    }
+
+@app.post("/resumir/lote/stream", tags=["Análisis"])
+async def resumir_lote_stream(request: ResumenLoteRequest):
+    """Resume varios documentos enviando un evento SSE por cada uno que termina"""
+    async def eventos():
+        total, completados, correctos = len(request.contenidos), 0, 0
+        async for resultado in buscador.aresumir_lote_stream(request.contenidos, request.concurrencia_max):
+            completados += 1
+            correctos += resultado["exito"]
+            yield formato_sse({"tipo": "progreso", "completados": completados, "total": total, **resultado})
+        yield formato_sse({"tipo": "fin", "total": total, "correctos": correctos, "fallidos": total - correctos})
+
+    return respuesta_sse(eventos())
+
 @app.post("/articulos", tags=["Artículos"])
-def crear_articulo(articulo: ArticuloRequest):
+async def crear_articulo(articulo: ArticuloRequest):
     """Guarda un nuevo artículo"""
     try:
-        id_articulo = memoria.guardar_articulo(
+        id_articulo = await escritor.ejecutar(
+            memoria.guardar_articulo,
             articulo.titulo,
             articulo.resumen,
             articulo.etiquetas,
@@ -299,10 +465,140 @@ def crear_articulo(articulo: ArticuloRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/articulos", tags=["Artículos"], response_model=List[Articulo])
-def obtener_articulos():
-    """Obtiene todos los artículos guardados"""
-    return memoria.obtener_articulos()
+@app.post("/articulos/lote", tags=["Artículos"], response_model=ImportacionResponse)
+async def importar_articulos(
+    request: Request,
+    formato: Optional[Literal["jsonl", "csv", "markdown"]] = Query(
+        None, description="Por defecto, según el Content-Type (los de GET /exportar)")
+):
+    """Importa artículos en JSONL, CSV o Markdown: deduplica por URL o título y guarda una vez por lote"""
+    formato = formato or importador.TIPOS.get(request.headers.get("content-type", "").split(";")[0].strip())
+    if formato is None:
+        raise HTTPException(status_code=415, detail="Indica el formato (jsonl, csv o markdown) o un Content-Type "
+                                                    f"de los admitidos: {', '.join(importador.TIPOS)}")
+    # El cuerpo pasa a disco si es grande: se valida línea a línea sin tenerlo entero en memoria
+    with tempfile.SpooledTemporaryFile(max_size=config.IMPORTAR_MEMORIA_CUERPO) as cuerpo:
+        async for trozo in request.stream():
+            cuerpo.write(trozo)
+        cuerpo.seek(0)
+        lineas = io.TextIOWrapper(cuerpo, encoding="utf-8", newline="")
+        try:
+            return await escritor.ejecutar(importador.importar, memoria, lineas, formato)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        finally:
+            lineas.detach()
+
+CAMPOS_ARTICULO = list(Articulo.model_fields)
+
+@app.get("/articulos", tags=["Artículos"], response_model=Union[List[ArticuloParcial], PaginaArticulos],
+         response_model_exclude_unset=True)
+def obtener_articulos(
+    request: Request,
+    limite: Optional[int] = Query(None, ge=1, le=100, description="Tamaño de página (20 si solo se pasa cursor)"),
+    cursor: Optional[int] = Query(None, description="Valor de `siguiente` de la página anterior"),
+    orden: Literal["asc", "desc"] = Query("asc", description="Por fecha de guardado (id)"),
+    etiqueta: Optional[str] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    campos: Optional[str] = Query(None, description="Lista separada por comas, p. ej. id,titulo,etiquetas")
+):
+    """Obtiene los artículos guardados.
+
+    Sin `limite` ni `cursor` responde la lista completa (la forma de siempre);
+    con alguno de los dos, una página {articulos, siguiente, total_articulos}.
+    """
+    paginado = limite is not None or cursor is not None
+    seleccion = None
+    if campos:
+        seleccion = {c.strip() for c in campos.split(",") if c.strip()} | {"id"}
+        desconocidos = seleccion - set(CAMPOS_ARTICULO)
+        if desconocidos:
+            raise HTTPException(status_code=422, detail=f"Campos desconocidos: {', '.join(sorted(desconocidos))}")
+    
+    def generar():
+        if paginado:
+            articulos, siguiente = memoria.pagina_articulos(limite or 20, cursor, orden == "desc",
+                                                           etiqueta, desde, hasta)
+        else:
+            articulos = list(exportador.iterar_articulos(memoria, etiqueta, desde, hasta))
+            if orden == "desc":
+                articulos.reverse()
+        if seleccion is not None:
+            articulos = [{c: a[c] for c in CAMPOS_ARTICULO if c in seleccion} for a in articulos]
+        if not paginado:
+            return articulos
+        return {
+            "articulos": articulos,
+            "siguiente": siguiente,
+            "total_articulos": memoria.obtener_estadisticas()["total_articulos_guardados"]
+        }
+    
+    return respuestas.responder(request, f"/articulos?{request.url.query}", memoria.version, generar)
+
+@app.get("/articulos/buscar", tags=["Artículos"], response_model=BusquedaTextoResponse)
+def buscar_texto(
+    q: str = Query(..., min_length=1, description="Texto a buscar en título, resumen y etiquetas"),
+    limite: int = Query(10, ge=1, le=100),
+    desplazamiento: int = Query(0, ge=0),
+    prefijo: bool = Query(True, description="El último término también coincide como prefijo")
+):
+    """Busca en los artículos guardados con ranking BM25"""
+    total, pagina = indice.buscar(q, limite, desplazamiento, prefijo)
+    
+    return {
+        "consulta": q,
+        "total": total,
+        "limite": limite,
+        "desplazamiento": desplazamiento,
+        "resultados": completar_articulos(pagina, "puntuacion")
+    }
+
+def completar_articulos(resultados, campo):
+    """Completa los pares (id, valor) de un índice con los artículos de la memoria"""
+    completados = []
+    for id_articulo, valor in resultados:
+        # Puede haberse borrado entre la consulta al índice y la lectura
+        articulo = memoria.obtener_articulo(id_articulo)
+        if articulo is not None:
+            completados.append({**articulo, campo: valor})
+    return completados
+
+@app.get("/articulos/semantica", tags=["Artículos"], response_model=BusquedaSemanticaResponse)
+def buscar_semantica(
+    q: str = Query(..., min_length=1, description="Texto libre; se compara por significado"),
+    limite: int = Query(10, ge=1, le=100)
+):
+    """Busca artículos guardados por cercanía de embeddings"""
+    return {
+        "consulta": q,
+        "resultados": completar_articulos(vectores.buscar(q, limite), "similitud"),
+        "pendientes": vectores.estadisticas()["pendientes"]
+    }
+
+@app.get("/articulos/similares/{articulo_id}", tags=["Artículos"], response_model=SimilaresResponse)
+def obtener_similares(articulo_id: int, limite: int = Query(5, ge=1, le=100)):
+    """Artículos relacionados con uno guardado, aunque no compartan etiquetas"""
+    resultados = vectores.similares(articulo_id, limite)
+    if resultados is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"El artículo {articulo_id} no existe o aún no está en el índice vectorial"
+        )
+    
+    return {
+        "id": articulo_id,
+        "resultados": completar_articulos(resultados, "similitud"),
+        "pendientes": vectores.estadisticas()["pendientes"]
+    }
+
+@app.get("/articulos/{articulo_id}", tags=["Artículos"], response_model=Articulo)
+def obtener_articulo(articulo_id: int):
+    """Obtiene un artículo completo por ID"""
+    articulo = memoria.obtener_articulo(articulo_id)
+    if articulo is None:
+        raise HTTPException(status_code=404, detail="Artículo no encontrado")
+    return articulo
 
 @app.get("/articulos/etiqueta/{etiqueta}", tags=["Artículos"], response_model=List[Articulo])
 def buscar_por_etiqueta(etiqueta: str):
@@ -317,50 +613,172 @@ def buscar_por_etiqueta(etiqueta: str):
     
     return resultados
 
+@app.get("/exportar", tags=["Artículos"])
+def exportar_coleccion(
+    formato: Literal["markdown", "jsonl", "csv"] = "markdown",
+    etiqueta: Optional[str] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    despues_de: Optional[int] = Query(None, ge=0, description="Cabecera X-Marca de una exportación anterior: "
+                                                               "solo los artículos guardados después")
+):
+    """Descarga la colección por trozos, en memoria constante aunque tenga millones de artículos"""
+    # La marca es el último id al empezar: lo que se guarde durante la descarga entra en la siguiente
+    marca = exportador.ultimo_id(memoria)
+    _, tipo, extension = exportador.FORMATOS[formato]
+    return StreamingResponse(
+        exportador.generar(memoria, formato, etiqueta, desde, hasta, despues_de, marca,
+                           encabezado=despues_de is None),
+        media_type=tipo,
+        headers={"Content-Disposition": f'attachment; filename="coleccion_articulos{extension}"',
+                 "X-Marca": str(marca)}
+    )
+
 @app.get("/etiquetas", tags=["Etiquetas"])
-def obtener_etiquetas():
+def obtener_etiquetas(
+    request: Request,
+    top: Optional[int] = Query(None, ge=1, le=1000, description="Solo las N etiquetas con más artículos"),
+    conteos: bool = Query(False, description="Incluir cuántos artículos tiene cada etiqueta")
+):
     """Obtiene todas las etiquetas disponibles"""
-    return {
-        "etiquetas": memoria.obtener_etiquetas(),
-        "total": len(memoria.obtener_etiquetas())
-    }
+    def generar():
+        total = len(memoria.etiquetas)
+        if top is not None:
+            pares = memoria.etiquetas.top(top)
+        elif conteos:
+            pares = memoria.etiquetas.conteos()
+        else:
+            return {
+                "etiquetas": memoria.obtener_etiquetas(),
+                "total": total
+            }
+        return {
+            "etiquetas": [{"nombre": nombre, "articulos": articulos} for nombre, articulos in pares],
+            "total": total
+        }
+    
+    return respuestas.responder(request, f"/etiquetas?{request.url.query}", memoria.version, generar)
+
+@app.get("/etiquetas/{etiqueta}", tags=["Etiquetas"])
+def obtener_etiqueta(request: Request, etiqueta: str, limite: int = Query(10, ge=1, le=100)):
+    """Artículos de una etiqueta y las etiquetas que más aparecen junto a ella"""
+    if etiqueta not in memoria.etiquetas:
+        raise HTTPException(status_code=404, detail=f"No existe la etiqueta '{etiqueta}'")
+    
+    def generar():
+        return {
+            "etiqueta": etiqueta,
+            "articulos": memoria.etiquetas.conteo(etiqueta),
+            "relacionadas": [
+                {"nombre": nombre, "articulos_en_comun": cuenta}
+                for nombre, cuenta in memoria.etiquetas.relacionadas(etiqueta, limite)
+            ]
+        }
+    
+    return respuestas.responder(request, f"/etiquetas/{etiqueta}?{request.url.query}", memoria.version, generar)
 
 @app.get("/estadisticas", tags=["Estadísticas"], response_model=EstadisticasResponse)
-def obtener_estadisticas():
+def obtener_estadisticas(request: Request):
     """Obtiene estadísticas de uso"""
-    stats = memoria.obtener_estadisticas()
-    etiquetas = memoria.obtener_etiquetas()
+    cache = buscador.cache.estadisticas() if buscador.cache is not None else None
+    coalescencia = buscador.estadisticas_coalescencia()
+    resiliencia = buscador.estadisticas_resiliencia()
+    calentamiento = precalentador.estadisticas() if precalentador is not None else None
     
-    return EstadisticasResponse(
-        total_busquedas=stats["total_busquedas"],
-        total_articulos_guardados=stats["total_articulos_guardados"],
-        etiquetas_unicas=len(etiquetas)
-    )
+    def generar():
+        stats = memoria.obtener_estadisticas()
+        
+        return EstadisticasResponse(
+            total_busquedas=stats["total_busquedas"],
+            total_articulos_guardados=stats["total_articulos_guardados"],
+            etiquetas_unicas=len(memoria.etiquetas),
+            cache=cache,
+            coalescencia=coalescencia,
+            resiliencia=resiliencia,
+            precalentador=calentamiento
+        ).model_dump()
+    
+    # Los contadores de caché, coalescencia, resiliencia y precalentador cambian sin mutar la memoria
+    version = (memoria.version, json.dumps([cache, coalescencia, resiliencia, calentamiento], sort_keys=True))
+    return respuestas.responder(request, "/estadisticas", version, generar)
 
 @app.get("/historial", tags=["Historial"])
-def obtener_historial(limite: int = 10):
-    """Obtiene el historial de búsquedas"""
-    historial = memoria.obtener_historial(limite)
+def obtener_historial(limite: int = Query(10, ge=1, le=100), desplazamiento: int = Query(0, ge=0)):
+    """Obtiene una página del historial, de la búsqueda más reciente a la más antigua"""
+    historial, total = memoria.pagina_historial(limite, desplazamiento)
+    siguiente = desplazamiento + len(historial)
     
     return {
         "historial": historial,
-        "total": len(historial)
+        "total": total,
+        "desplazamiento": desplazamiento,
+        "siguiente": siguiente if siguiente < total else None
     }
 
+@app.get("/historial/tendencias", tags=["Historial"])
+def obtener_tendencias(
+    request: Request,
+    dias: List[int] = Query([1, 7, 30], description="Ventanas en días que terminan hoy; se puede repetir"),
+    limite: int = Query(10, ge=1, le=100)
+):
+    """Consultas más buscadas en cada ventana, desde el resumen por día (incluye las búsquedas ya podadas)"""
+    if any(d < 1 or d > 3660 for d in dias):
+        raise HTTPException(status_code=422, detail="Cada ventana debe tener entre 1 y 3660 días")
+
+    def generar():
+        hoy = date.today()
+        return {
+            "ventanas": [
+                {
+                    "dias": d,
+                    "desde": (hoy - timedelta(days=d - 1)).isoformat(),
+                    "hasta": hoy.isoformat(),
+                    "consultas": memoria.tendencias_historial(d, limite)
+                }
+                for d in dias
+            ]
+        }
+
+    # Las ventanas se mueven al cambiar el día aunque la memoria no cambie
+    version = (memoria.version, date.today().isoformat())
+    return respuestas.responder(request, f"/historial/tendencias?{request.url.query}", version, generar)
+
+@app.get("/metrics", tags=["Sistema"], response_class=PlainTextResponse)
+def exportar_metricas():
+    """Métricas en el formato de texto de Prometheus"""
+    return PlainTextResponse(metricas.REGISTRO.exportar(), media_type=metricas.TIPO_CONTENIDO)
+
+@app.get("/metrics/perfil", tags=["Sistema"], response_class=PlainTextResponse)
+def obtener_perfil(limite: Optional[int] = Query(None, ge=1)):
+    """Pilas muestreadas en formato colapsado (flamegraph.pl, speedscope)"""
+    return PlainTextResponse(metricas.PERFILADOR.exportar(limite))
+
+@app.post("/metrics/perfil", tags=["Sistema"])
+def conmutar_perfil(activo: bool, intervalo: Optional[float] = Query(None, gt=0, le=1),
+                    reiniciar: bool = False):
+    """Enciende o apaga el perfilador por muestreo sin reiniciar el servidor"""
+    if reiniciar:
+        metricas.PERFILADOR.reiniciar()
+    if activo:
+        metricas.PERFILADOR.activar(intervalo)
+    else:
+        metricas.PERFILADOR.desactivar()
+    return metricas.PERFILADOR.estado()
+
 @app.get("/health", tags=["Sistema"])
 def health_check():
     """Verifica el estado de la API"""
     return {
         "estado": "operativo",
         "timestamp": datetime.now().isoformat(),
-        "articulos_guardados": len(memoria.obtener_articulos())
+        "articulos_guardados": memoria.obtener_estadisticas()["total_articulos_guardados"]
     }
 
 @app.delete("/articulos/{articulo_id}", tags=["Artículos"])
-def eliminar_articulo(articulo_id: int):
+async def eliminar_articulo(articulo_id: int):
     """Elimina un artículo por ID"""
     try:
-        exito = memoria.eliminar_articulo(articulo_id)
+        exito = await escritor.ejecutar(memoria.eliminar_articulo, articulo_id)
         if exito:
             return {
                 "exito": True,
@@ -372,10 +790,10 @@ def eliminar_articulo(articulo_id: int):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/historial/{index}", tags=["Historial"])
-def eliminar_busqueda(index: int):
+async def eliminar_busqueda(index: int):
     """Elimina una búsqueda del historial por índice"""
     try:
-        exito = memoria.eliminar_busqueda(index)
+        exito = await escritor.ejecutar(memoria.eliminar_busqueda, index)
         if exito:
             return {
                 "exito": True,
@@ -387,10 +805,10 @@ def eliminar_busqueda(index: int):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/historial", tags=["Historial"])
-def limpiar_historial():
+async def limpiar_historial():
     """Limpia todo el historial de búsquedas"""
     try:
-        memoria.limpiar_historial()
+        await escritor.ejecutar(memoria.limpiar_historial)
         return {
             "exito": True,
             "mensaje": "Historial limpiado correctamente"
@@ -0,0 +1,108 @@
+# bench_almacenamiento.py - Latencia de escritura de MemoriaPersistente por motor
+#
+# "json" reescribe el archivo entero en cada mutación (intervalo de escritura 0);
+# "json diferido" es el mismo motor con la escritura diferida por defecto, que
+# vuelca cada JSON_INTERVALO_ESCRITURA segundos o cada JSON_LOTE_ESCRITURA mutaciones.
+#
+# Uso: python benchmarks/bench_almacenamiento.py [--registros 100000]
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from almacenamiento import AlmacenamientoJSON, crear_almacenamiento  # noqa: E402
+from memoria import MemoriaPersistente  # noqa: E402
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def crear_instantanea(archivo, registros):
+    """Escribe una memoria con `registros` artículos ya guardados"""
+    memoria = MemoriaPersistente.estructura_inicial(None)
+    for i in range(1, registros + 1):
+        memoria["articulos_guardados"].append({
+            "id": i,
+            "fecha_guardado": "2025-01-01 00:00:00",
+            "titulo": f"Artículo {i}",
+            "resumen": "Resumen de prueba " * 10,
+            "etiquetas": [f"etiqueta{i % 50}", "benchmark"],
+            "url": None
+        })
+    memoria["etiquetas"] = [f"etiqueta{i}" for i in range(50)] + ["benchmark"]
+    memoria["estadisticas"]["total_articulos_guardados"] = registros
+    with open(archivo, 'w', encoding='utf-8') as f:
+        json.dump(memoria, f, ensure_ascii=False)
+
+
+MOTORES = {
+    "json": lambda archivo: AlmacenamientoJSON(archivo, intervalo_escritura=0),
+    "json diferido": AlmacenamientoJSON,
+    "diario": lambda archivo: crear_almacenamiento(archivo, "diario"),
+}
+
+
+def medir_escrituras(motor, registros, escrituras):
+    """Latencias (ms) de `escrituras` llamadas a guardar_articulo sobre `registros` previos"""
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "memoria.json")
+        crear_instantanea(archivo, registros)
+        memoria = MemoriaPersistente(archivo, MOTORES[motor](archivo))
+        latencias = []
+        for i in range(escrituras):
+            inicio = time.perf_counter()
+            memoria.guardar_articulo(f"Nuevo {i}", "Resumen", ["benchmark"])
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        # Vuelca lo pendiente antes de que se borre el directorio
+        memoria.cerrar()
+        return latencias
+
+
+def medir_crecimiento(total, ventana):
+    """Latencias (µs) por ventana mientras el diario crece hasta `total` registros"""
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "memoria.json")
+        memoria = MemoriaPersistente(archivo, crear_almacenamiento(archivo, "diario"))
+        filas = []
+        for desde in range(0, total, ventana):
+            latencias = []
+            for i in range(desde, desde + ventana):
+                inicio = time.perf_counter()
+                memoria.agregar_busqueda(f"tema {i}", 5)
+                latencias.append((time.perf_counter() - inicio) * 1e6)
+            filas.append((desde + ventana, statistics.median(latencias), percentil(latencias, 0.99)))
+        memoria.cerrar()
+        return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--registros", type=int, default=100_000)
+    parser.add_argument("--escrituras-json", type=int, default=20)
+    parser.add_argument("--escrituras-diferida", type=int, default=1000)
+    parser.add_argument("--escrituras-diario", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'motor':<14} {'registros':>10} {'escrituras':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for registros in (1_000, 10_000, args.registros):
+        for motor, escrituras in (("json", args.escrituras_json), ("json diferido", args.escrituras_diferida),
+                                  ("diario", args.escrituras_diario)):
+            latencias = medir_escrituras(motor, registros, escrituras)
+            print(f"{motor:<14} {registros:>10} {escrituras:>10} "
+                  f"{statistics.median(latencias):>10.3f} {percentil(latencias, 0.99):>10.3f}")
+
+    print(f"\nDiario creciendo hasta {args.registros} registros (µs por escritura):")
+    print(f"  {'registros':>10} {'p50':>10} {'p99':>10}")
+    for acumulado, p50, p99 in medir_crecimiento(args.registros, max(1, args.registros // 10)):
+        print(f"  {acumulado:>10} {p50:>10.2f} {p99:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
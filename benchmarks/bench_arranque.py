@@ -0,0 +1,131 @@
+# bench_arranque.py - Arranque en frío: importaciones, primer /health de la API y menú del CLI
+#
+# Mide procesos nuevos (intérprete incluido), como un reinicio real:
+#   - python -X importtime: qué módulos pesan al importar backend y curador
+#   - tiempo hasta que uvicorn responde el primer GET /health
+#   - tiempo hasta que el CLI muestra el menú
+#
+# Uso: python benchmarks/bench_arranque.py [--repeticiones 5] [--articulos 0]
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# Módulos que no deben cargarse hasta la primera llamada al LLM
+PEREZOSOS = ("langchain", "langchain_core", "langchain_google_genai")
+
+
+def entorno(directorio):
+    return {**os.environ, "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark"),
+            "PYTHONPATH": RAIZ, "CURADOR_CACHE": "0",
+            "CURADOR_ARCHIVO_MEMORIA": os.path.join(directorio, "memoria.json"),
+            "CURADOR_VECTORES_ARCHIVO": os.path.join(directorio, "vectores.npy")}
+
+
+def tiempos_importacion(modulo, variables, top=8):
+    """(total en ms, [(ms acumulados, módulo)] más pesados, módulos perezosos cargados)"""
+    codigo = f"import sys, {modulo}; print(sorted(m for m in sys.modules if m.split('.')[0] in {PEREZOSOS!r}))"
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], env=variables,
+                            capture_output=True, text=True, check=True)
+    filas = []
+    for linea in salida.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        # La sangría del nombre marca la profundidad; los de primer nivel llevan un espacio
+        filas.append((int(acumulado) / 1000, len(nombre) - len(nombre.lstrip()), nombre.strip()))
+    total = sum(ms for ms, nivel, _ in filas if nivel == 1)
+    pesados = sorted(((ms, nombre) for ms, _, nombre in filas), reverse=True)[:top]
+    return total, pesados, json.loads(salida.stdout.strip().replace("'", '"'))
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def primer_health(variables):
+    """Segundos desde lanzar uvicorn hasta el primer 200 de /health"""
+    puerto = puerto_libre()
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen([sys.executable, "-m", "uvicorn", "backend:app", "--port", str(puerto),
+                                "--log-level", "warning"], env=variables, cwd=RAIZ,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{puerto}/health", timeout=1).status_code == 200:
+                    return time.perf_counter() - inicio
+            except httpx.TransportError:
+                pass
+            if proceso.poll() is not None:
+                raise RuntimeError("uvicorn terminó antes de responder /health")
+            time.sleep(0.005)
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+
+def hasta_menu(variables):
+    """Segundos desde lanzar el CLI hasta que pide una opción del menú"""
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen([sys.executable, "-u", os.path.join(RAIZ, "curador.py")], env=variables,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    leido = b""
+    while b"Selecciona una opci" not in leido:
+        caracter = proceso.stdout.read(1)
+        if not caracter:
+            raise RuntimeError("el CLI terminó antes de mostrar el menú")
+        leido += caracter
+    duracion = time.perf_counter() - inicio
+    proceso.communicate(b"9\n", timeout=30)
+    return duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--articulos", type=int, default=0,
+                        help="Artículos sintéticos en la memoria (0 = copia de curator_memory.json)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        memoria = os.path.join(directorio, "memoria.json")
+        if args.articulos:
+            from benchmarks.datos_sinteticos import generar_datos
+            with open(memoria, 'w', encoding='utf-8') as f:
+                json.dump(generar_datos(args.articulos), f, ensure_ascii=False)
+        elif os.path.exists(os.path.join(RAIZ, "curator_memory.json")):
+            shutil.copy(os.path.join(RAIZ, "curator_memory.json"), memoria)
+        variables = entorno(directorio)
+
+        for modulo in ("backend", "curador"):
+            total, pesados, perezosos = tiempos_importacion(modulo, variables)
+            print(f"\nimport {modulo}: {total:.0f} ms")
+            for ms, nombre in pesados:
+                print(f"  {ms:>9.1f} ms  {nombre}")
+            assert not perezosos, f"{modulo} carga LangChain al importarse: {perezosos[:5]}"
+
+        health = [primer_health(variables) for _ in range(args.repeticiones)]
+        menu = [hasta_menu(variables) for _ in range(args.repeticiones)]
+        print(f"\n{'medida':<28}{'mediana ms':>12}{'mín ms':>10}{'máx ms':>10}")
+        for nombre, valores in (("primer /health (uvicorn)", health), ("menú del CLI", menu)):
+            print(f"{nombre:<28}{statistics.median(valores) * 1000:>12.0f}"
+                  f"{min(valores) * 1000:>10.0f}{max(valores) * 1000:>10.0f}")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# bench_exportar.py - Tiempo y pico de memoria de exportar la colección, antes y con streaming
+#
+# "antes" es lo que hacía la opción 6 del CLI: cargar la lista entera y
+# escribirla con exportar_markdown. Con streaming (exportador.py) el pico no
+# debe crecer con la colección: solo una página de artículos y un trozo de texto.
+#
+# Uso: python benchmarks/bench_exportar.py [--articulos 100000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("GOOGLE_API_KEY", "falso")
+
+import exportador  # noqa: E402
+from benchmarks.datos_sinteticos import escribir_memoria, generar_datos  # noqa: E402
+from curador import HerramientaExportador  # noqa: E402
+from memoria import MemoriaPersistente  # noqa: E402
+from memoria_sqlite import MemoriaSQLite  # noqa: E402
+
+# Pico tolerado con streaming: una página de EXPORTAR_LOTE artículos y sus trozos
+PICO_MAXIMO_MB = 16
+
+
+def medir(funcion):
+    """(segundos, pico de memoria en MB): el tiempo se toma sin tracemalloc, que lo distorsiona"""
+    inicio = time.perf_counter()
+    funcion()
+    segundos = time.perf_counter() - inicio
+    tracemalloc.start()
+    funcion()
+    pico = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return segundos, pico
+
+
+def consumir(trozos):
+    """Lo que hace StreamingResponse con GET /exportar, sin la red"""
+    return sum(len(trozo) for trozo in trozos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articulos", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        escribir_memoria(os.path.join(directorio, "m.json"), args.articulos)
+        sqlite = MemoriaSQLite(os.path.join(directorio, "m.db"))
+        sqlite.importar(generar_datos(args.articulos))
+        memorias = {"json": MemoriaPersistente(os.path.join(directorio, "m.json")), "sqlite": sqlite}
+
+        print(f"{args.articulos} artículos")
+        print(f"{'motor':<8}{'escenario':<30}{'segundos':>10}{'pico MB':>10}")
+        for motor, memoria in memorias.items():
+            ruta = os.path.join(directorio, f"coleccion-{motor}")
+            escenarios = {
+                "antes (lista + markdown)": lambda: HerramientaExportador.exportar_markdown(
+                    memoria.obtener_articulos(), ruta + ".md"),
+                **{f"streaming {formato}": (lambda formato=formato: exportador.exportar_archivo(
+                    memoria, f"{ruta}.{formato}", formato)) for formato in exportador.FORMATOS},
+                "GET /exportar (jsonl)": lambda: consumir(exportador.generar(memoria, "jsonl")),
+                "incremental sin cambios": lambda: exportador.exportar_archivo(
+                    memoria, f"{ruta}.jsonl", "jsonl", incremental=True),
+            }
+            picos = {}
+            for nombre, escenario in escenarios.items():
+                segundos, picos[nombre] = medir(escenario)
+                print(f"{motor:<8}{nombre:<30}{segundos:>10.3f}{picos[nombre]:>10.1f}")
+            for nombre, pico in picos.items():
+                if nombre != "antes (lista + markdown)":
+                    assert pico < PICO_MAXIMO_MB, f"{motor} {nombre}: pico de {pico:.1f} MB"
+        sqlite.cerrar()
+        memorias["json"].cerrar()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
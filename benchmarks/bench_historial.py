@@ -0,0 +1,104 @@
+# bench_historial.py - Historial de búsquedas sin límite frente a podado con resumen por día
+#
+# "sin poda" es el historial que crecía con cada búsqueda; "podado" deja
+# HISTORIAL_MAX_ENTRADAS búsquedas sueltas y el resto solo en el resumen.
+# Se mide el tamaño del archivo, cargarlo y guardarlo entero, y las
+# tendencias de 30 días: del resumen frente a contar el historial suelto
+# (que además tienen que coincidir).
+#
+# Uso: python benchmarks/bench_historial.py [--articulos 10000] [--busquedas 200000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import resumen_historial  # noqa: E402
+from almacenamiento import AlmacenamientoJSON  # noqa: E402
+from benchmarks.datos_sinteticos import escribir_memoria  # noqa: E402
+from memoria import MemoriaPersistente  # noqa: E402
+
+# Las búsquedas sintéticas son de 2025: la ventana termina en su último día
+HOY = date(2025, 12, 31)
+DIAS = 30
+
+
+def abrir(ruta):
+    # Sin escritura diferida: guardar_memoria escribe ya
+    return MemoriaPersistente(ruta, AlmacenamientoJSON(ruta, intervalo_escritura=0))
+
+
+def medir(funcion, repeticiones=3):
+    """(resultado, mejor tiempo en ms)"""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempo = (time.perf_counter() - inicio) * 1000
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return resultado, mejor
+
+
+def contar_sueltas(historial):
+    """Tendencias contando el historial suelto, como habría que hacerlo sin resumen"""
+    dias = set(resumen_historial.ventana(DIAS, HOY))
+    cuentas = Counter(resumen_historial.clave_consulta(b["query"]) for b in historial if b["fecha"][:10] in dias)
+    return [(clave, cuenta) for clave, cuenta in cuentas.most_common() if clave]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articulos", type=int, default=10000)
+    parser.add_argument("--busquedas", type=int, default=200000)
+    args = parser.parse_args()
+
+    # La poda solo por número: las fechas sintéticas ya pasarían de HISTORIAL_MAX_DIAS
+    config.HISTORIAL_MAX_DIAS = 0
+    maximo = config.HISTORIAL_MAX_ENTRADAS or 1000
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "memoria.json")
+        escribir_memoria(ruta, args.articulos, busquedas=args.busquedas)
+        # La primera carga calcula el resumen; se guarda para medir las cargas siguientes
+        memoria = abrir(ruta)
+        memoria.guardar_memoria()
+        memoria.cerrar()
+
+        filas = []
+        for nombre in ("sin poda", "podado"):
+            memoria, carga = medir(lambda: abrir(ruta), 1)
+            if nombre == "podado":
+                config.HISTORIAL_MAX_ENTRADAS = maximo
+                memoria.podar_historial()
+                memoria.cerrar()
+                memoria, carga = medir(lambda: abrir(ruta), 1)
+            else:
+                esperadas = contar_sueltas(memoria.datos["historial_busquedas"])
+                _, escaneo = medir(lambda: contar_sueltas(memoria.datos["historial_busquedas"]))
+            _, guardado = medir(memoria.guardar_memoria)
+            tendencias, resumen = medir(lambda: resumen_historial.tendencias(
+                memoria.datos["resumen_historial"], DIAS, len(esperadas), HOY))
+            # El resumen da lo mismo que contar todas las búsquedas, también con el historial podado
+            assert sorted((t["query"], t["busquedas"]) for t in tendencias) == sorted(esperadas), nombre
+            filas.append((nombre, len(memoria.datos["historial_busquedas"]), os.path.getsize(ruta) / 1e6,
+                          carga, guardado, resumen))
+            memoria.cerrar()
+
+    print(f"{args.articulos} artículos, {args.busquedas} búsquedas; tendencias de {DIAS} días "
+          f"contando el historial suelto: {escaneo:.1f} ms")
+    print(f"{'historial':<12}{'sueltas':>10}{'MB':>8}{'cargar ms':>12}{'guardar ms':>12}{'tendencias ms':>15}")
+    for nombre, sueltas, mb, carga, guardado, resumen in filas:
+        print(f"{nombre:<12}{sueltas:>10}{mb:>8.1f}{carga:>12.1f}{guardado:>12.1f}{resumen:>15.2f}")
+    (_, _, mb_antes, _, guardado_antes, _), (_, sueltas, mb, _, guardado, resumen) = filas
+    assert sueltas <= maximo and mb < mb_antes and guardado < guardado_antes
+    assert resumen < escaneo, "las tendencias del resumen no son más rápidas que contar el historial"
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# bench_http.py - Bytes y latencia del sondeo repetido de rutas de lectura (ETag, 304, gzip)
+#
+# Uso: python benchmarks/bench_http.py [--articulos 10000] [--peticiones 500]
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+async def sondear(cliente, ruta, cabeceras, peticiones, antes=None):
+    latencias, bytes_totales, estados = [], 0, set()
+    for _ in range(peticiones):
+        if antes:
+            antes()
+        inicio = time.perf_counter()
+        respuesta = await cliente.get(ruta, headers=cabeceras)
+        latencias.append(time.perf_counter() - inicio)
+        bytes_totales += respuesta.num_bytes_downloaded
+        estados.add(respuesta.status_code)
+    return latencias, bytes_totales / peticiones, estados
+
+
+async def main(args, backend):
+    transporte = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        rutas = ["/articulos?limite=100", "/articulos?limite=100&campos=id,titulo,etiquetas",
+                 "/etiquetas", "/estadisticas"]
+        print(f"{'ruta':<50}{'modo':<22}{'bytes/pet':>10}{'p50 ms':>9}{'p99 ms':>9}")
+        for ruta in rutas:
+            etag = (await cliente.get(ruta, headers={"Accept-Encoding": "gzip"})).headers["etag"]
+            modos = [
+                # Sin reutilizar el cuerpo: serializa en cada petición, como antes
+                ("sin caché, sin gzip", {"Accept-Encoding": "identity"}, backend.respuestas.entradas.clear),
+                ("cacheado, sin gzip", {"Accept-Encoding": "identity"}, None),
+                ("cacheado, gzip", {"Accept-Encoding": "gzip"}, None),
+                ("If-None-Match (304)", {"Accept-Encoding": "gzip", "If-None-Match": etag}, None),
+            ]
+            for nombre, cabeceras, antes in modos:
+                latencias, bytes_medios, estados = await sondear(cliente, ruta, cabeceras, args.peticiones, antes)
+                print(f"{ruta:<50}{nombre:<22}{bytes_medios:>10.0f}"
+                      f"{percentil(latencias, 0.5) * 1000:>9.3f}{percentil(latencias, 0.99) * 1000:>9.3f}"
+                      f"  {sorted(estados)}")
+
+        # Una mutación cambia la versión: el ETag anterior deja de valer
+        ruta = "/articulos?limite=100"
+        etag = (await cliente.get(ruta)).headers["etag"]
+        assert (await cliente.get(ruta, headers={"If-None-Match": etag})).status_code == 304
+        await cliente.post("/articulos", json={"titulo": "Nuevo", "resumen": "r", "etiquetas": ["x"]})
+        assert (await cliente.get(ruta, headers={"If-None-Match": etag})).status_code == 200
+        print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articulos", type=int, default=10000)
+    parser.add_argument("--peticiones", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # config lee el entorno al importarse: va antes que memoria y backend
+        archivo = os.path.join(directorio, "memoria.json")
+        os.environ.update({
+            "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark"),
+            "CURADOR_ARCHIVO_MEMORIA": archivo,
+            "CURADOR_VECTORES_ARCHIVO": os.path.join(directorio, "vectores.npy"),
+            "CURADOR_CACHE": "0",
+        })
+        from benchmarks.datos_sinteticos import generar_datos
+        with open(archivo, 'w', encoding='utf-8') as f:
+            json.dump(generar_datos(args.articulos), f, ensure_ascii=False)
+        import backend
+        backend.vectores.esperar()
+        asyncio.run(main(args, backend))
+        # Vuelca la escritura diferida antes de que se borre el directorio (atexit llegaría tarde)
+        backend.escritor.cerrar()
+        backend.memoria.cerrar()
+        backend.vectores.cerrar()
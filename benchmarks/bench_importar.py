@@ -0,0 +1,102 @@
+# bench_importar.py - Alta de muchos artículos: uno a uno (POST /articulos, opción 3) frente a importador.py
+#
+# "uno a uno" llama a guardar_articulo por artículo; "importación" pasa el
+# mismo JSONL por importador.importar_archivo (lotes de IMPORTAR_LOTE). Se
+# cuentan las reescrituras completas de la memoria: con el JSON sin escritura
+# diferida, uno a uno reescribe el archivo entero por cada artículo.
+#
+# Uso: python benchmarks/bench_importar.py [--articulos 1000] [--existentes 5000]
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("GOOGLE_API_KEY", "falso")
+
+import config  # noqa: E402
+import importador  # noqa: E402
+import metricas  # noqa: E402
+from almacenamiento import AlmacenamientoDiario, AlmacenamientoJSON  # noqa: E402
+from benchmarks.datos_sinteticos import escribir_memoria, generar_articulos, generar_datos  # noqa: E402
+from memoria import MemoriaPersistente  # noqa: E402
+from memoria_sqlite import MemoriaSQLite  # noqa: E402
+
+
+def reescrituras():
+    return sum(serie[2] for serie in metricas.VOLCADO_SEGUNDOS.valores.values())
+
+
+def abrir(motor, directorio, existentes):
+    """Memoria nueva con `existentes` artículos, copiada de una plantilla por motor"""
+    if motor == "sqlite":
+        plantilla = os.path.join(directorio, "plantilla.db")
+        if not os.path.exists(plantilla):
+            semilla = MemoriaSQLite(plantilla)
+            semilla.importar(generar_datos(existentes))
+            semilla.cerrar()
+        ruta = os.path.join(directorio, f"m{time.perf_counter_ns()}.db")
+        shutil.copy(plantilla, ruta)
+        return MemoriaSQLite(ruta)
+    ruta = os.path.join(directorio, f"m{time.perf_counter_ns()}.json")
+    shutil.copy(os.path.join(directorio, "plantilla.json"), ruta)
+    if motor == "diario":
+        return MemoriaPersistente(ruta, AlmacenamientoDiario(ruta))
+    # "json-inmediato": sin escritura diferida, cada mutación reescribe el archivo
+    return MemoriaPersistente(ruta, AlmacenamientoJSON(ruta, intervalo_escritura=0 if motor == "json-inmediato" else 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articulos", type=int, default=1000, help="Artículos a dar de alta")
+    parser.add_argument("--existentes", type=int, default=5000, help="Artículos que ya tiene la memoria")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        escribir_memoria(os.path.join(directorio, "plantilla.json"), args.existentes)
+        archivo = os.path.join(directorio, "lista.jsonl")
+        nuevos = []
+        for articulo in generar_articulos(args.articulos, semilla=1):
+            # Títulos y URLs que no están en la memoria de la semilla 0
+            articulo.update(titulo=f"Lista {articulo['id']}: {articulo['titulo']}", url=None)
+            nuevos.append(articulo)
+        with open(archivo, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(articulo, ensure_ascii=False) + "\n" for articulo in nuevos)
+
+        print(f"{args.articulos} artículos nuevos sobre {args.existentes} existentes")
+        print(f"{'motor':<16}{'modo':<14}{'segundos':>10}{'altas/s':>10}{'reescrituras':>14}")
+        for motor in ("json-inmediato", "json", "diario", "sqlite"):
+            for modo in ("uno a uno", "importación"):
+                memoria = abrir(motor, directorio, args.existentes)
+                antes = reescrituras()
+                inicio = time.perf_counter()
+                if modo == "uno a uno":
+                    for articulo in nuevos:
+                        memoria.guardar_articulo(articulo["titulo"], articulo["resumen"],
+                                                 articulo["etiquetas"], articulo["url"])
+                    memoria.vaciar()
+                else:
+                    resultado = importador.importar_archivo(memoria, archivo)
+                    assert resultado["insertados"] == args.articulos, resultado
+                segundos = time.perf_counter() - inicio
+                assert len(memoria.obtener_articulos()) == args.existentes + args.articulos
+                memoria.cerrar()
+                escrituras = reescrituras() - antes
+                print(f"{motor:<16}{modo:<14}{segundos:>10.2f}{args.articulos / segundos:>10.0f}{escrituras:>14}")
+                if modo == "importación":
+                    # Como mucho una reescritura por lote
+                    assert escrituras <= math.ceil(args.articulos / config.IMPORTAR_LOTE), escrituras
+                    if motor == "json-inmediato":
+                        assert segundos < uno_a_uno, f"{motor}: la importación no es más rápida"
+                else:
+                    uno_a_uno = segundos
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# bench_indice.py - Latencia de /articulos/buscar sobre el índice invertido
+#
+# Uso: python benchmarks/bench_indice.py [--articulos 100000] [--consultas 2000]
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indice_texto import IndiceTexto  # noqa: E402
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def generar_vocabulario(tamano, semilla=7):
+    """Palabras sintéticas pronunciables (sin stopwords) con frecuencia de Zipf"""
+    azar = random.Random(semilla)
+    silabas = [c + v for c in "bcdfgjklmnprstvz" for v in "aeiou"]
+    palabras = set()
+    while len(palabras) < tamano:
+        palabras.add("".join(azar.choice(silabas) for _ in range(azar.randint(2, 4))))
+    palabras = sorted(palabras)
+    azar.shuffle(palabras)
+    acumulados = list(itertools.accumulate(1 / (rango + 1) ** 1.07 for rango in range(tamano)))
+    return palabras, acumulados
+
+
+def generar_articulos(n, palabras, acumulados, semilla=11):
+    azar = random.Random(semilla)
+    etiquetas = palabras[:200]
+    for i in range(1, n + 1):
+        texto = azar.choices(palabras, cum_weights=acumulados, k=48)
+        yield {
+            "id": i,
+            "fecha_guardado": "2025-01-01 00:00:00",
+            "titulo": " ".join(texto[:6]).capitalize(),
+            "resumen": " ".join(texto[6:]) + ".",
+            "etiquetas": azar.sample(etiquetas, 3),
+            "url": None
+        }
+
+
+def medir(indice, consultas):
+    latencias, resultados = [], 0
+    for consulta in consultas:
+        inicio = time.perf_counter()
+        total, _ = indice.buscar(consulta, limite=10)
+        latencias.append(time.perf_counter() - inicio)
+        resultados += total
+    return latencias, resultados / len(consultas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articulos", type=int, default=100000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--vocabulario", type=int, default=50000)
+    args = parser.parse_args()
+
+    palabras, acumulados = generar_vocabulario(args.vocabulario)
+    indice = IndiceTexto()
+    inicio = time.perf_counter()
+    indice.construir(generar_articulos(args.articulos, palabras, acumulados))
+    print(f"Índice de {args.articulos} artículos construido en {time.perf_counter() - inicio:.1f} s "
+          f"({indice.estadisticas()['terminos']} términos)")
+
+    # Las consultas se sacan de la cola del vocabulario (lo que distingue a un
+    # artículo); las palabras más frecuentes se miden aparte como peor caso
+    azar = random.Random(3)
+    cola = palabras[1000:]
+    escenarios = {
+        "1 término": [azar.choice(cola) for _ in range(args.consultas)],
+        "2 términos": [f"{azar.choice(cola)} {azar.choice(cola)}" for _ in range(args.consultas)],
+        "prefijo": [azar.choice(cola)[:5] for _ in range(args.consultas)],
+        "con acentos y stopwords": [f"el {azar.choice(cola).replace('a', 'á', 1)} de la"
+                                    for _ in range(args.consultas)],
+        "término frecuente (peor caso)": [azar.choice(palabras[:20]) for _ in range(200)],
+    }
+    print(f"{'escenario':<32}{'p50 ms':>9}{'p99 ms':>9}{'aciertos medios':>17}")
+    for nombre, consultas in escenarios.items():
+        latencias, aciertos = medir(indice, consultas)
+        print(f"{nombre:<32}{percentil(latencias, 0.5) * 1000:>9.3f}"
+              f"{percentil(latencias, 0.99) * 1000:>9.3f}{aciertos:>17.0f}")
+
+    # Mantenimiento incremental: altas y bajas sin reconstruir
+    nuevos = list(generar_articulos(1000, palabras, acumulados, semilla=99))
+    for articulo in nuevos:
+        articulo["id"] += args.articulos
+    inicio = time.perf_counter()
+    for articulo in nuevos:
+        indice.aplicar_operacion({"op": "articulo", "articulo": articulo})
+    alta = (time.perf_counter() - inicio) / len(nuevos)
+    inicio = time.perf_counter()
+    for articulo in nuevos:
+        indice.aplicar_operacion({"op": "eliminar_articulo", "id": articulo["id"]})
+    baja = (time.perf_counter() - inicio) / len(nuevos)
+    print(f"Alta incremental: {alta * 1e6:.0f} µs/artículo; baja: {baja * 1e6:.0f} µs/artículo")
+    assert indice.estadisticas()["articulos"] == args.articulos
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# bench_memoria_compacta.py - Memoria residente de la colección: lista de dicts frente a ColeccionArticulos
+#
+# "lista" es como se tenían los artículos antes (lo que deja json.load);
+# "columnas" es la ColeccionArticulos de memoria.py. Los artículos se generan
+# antes en un JSONL y se mide con tracemalloc solo la carga: lo que queda
+# asignado después de construir cada una. También cuánto cuesta leer un
+# artículo, que ahora se materializa en un dict, y lo que ocupa encima el
+# índice de texto, que solo guarda ids y postings (hasta --max-indice
+# artículos: con un millón los postings ocupan varios GB).
+#
+# Uso: python benchmarks/bench_memoria_compacta.py [--tamanos 100000 1000000] [--max-indice 100000]
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datos_sinteticos import generar_articulos  # noqa: E402
+from coleccion import ColeccionArticulos  # noqa: E402
+from indice_texto import IndiceTexto  # noqa: E402
+
+# Las columnas tienen que ocupar como mucho esta fracción de la lista de dicts
+FRACCION_MAXIMA = 0.5
+
+
+def residente(construir):
+    """(objeto, MB que siguen asignados al terminar de construirlo)"""
+    gc.collect()
+    tracemalloc.start()
+    objeto = construir()
+    gc.collect()
+    actual = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    return objeto, actual
+
+
+def leer_jsonl(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        for linea in f:
+            yield json.loads(linea)
+
+
+def construir_indice(articulos):
+    indice = IndiceTexto()
+    indice.construir(articulos)
+    return indice
+
+
+def lectura_us(leer, n, repeticiones=20000):
+    azar = random.Random(0)
+    tiempos = []
+    for _ in range(repeticiones):
+        posicion = azar.randrange(n)
+        inicio = time.perf_counter()
+        leer(posicion)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--max-indice", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'artículos':>10}{'lista MB':>12}{'columnas MB':>14}{'fracción':>10}"
+          f"{'B/artículo':>12}{'leer lista µs':>15}{'leer columnas µs':>18}{'índice MB':>11}")
+    for n in args.tamanos:
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".jsonl") as f:
+            f.writelines(json.dumps(articulo, ensure_ascii=False) + "\n" for articulo in generar_articulos(n))
+            f.flush()
+            lista, mb_lista = residente(lambda: list(leer_jsonl(f.name)))
+            leer_lista = lectura_us(lista.__getitem__, n)
+            del lista
+            coleccion, mb_columnas = residente(lambda: ColeccionArticulos(leer_jsonl(f.name)))
+            leer_columnas = lectura_us(coleccion.__getitem__, n)
+            # Los artículos se materializan al recorrer la colección: si el índice se quedara
+            # con ellos, lo medido incluiría otra vez la lista de dicts entera
+            mb_indice = None
+            if n <= args.max_indice:
+                indice, mb_indice = residente(lambda: construir_indice(coleccion))
+                del indice
+            del coleccion
+        fraccion = mb_columnas / mb_lista
+        print(f"{n:>10}{mb_lista:>12.1f}{mb_columnas:>14.1f}{fraccion:>10.2f}"
+              f"{mb_columnas * 1e6 / n:>12.0f}{leer_lista:>15.2f}{leer_columnas:>18.2f}"
+              f"{'-' if mb_indice is None else f'{mb_indice:.1f}':>11}")
+        assert fraccion <= FRACCION_MAXIMA, f"{n}: las columnas ocupan {fraccion:.0%} de la lista"
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# bench_paginacion.py - Latencia de una página de artículos según el tamaño de la colección
+#
+# Uso: python benchmarks/bench_paginacion.py [--tamanos 1000 10000 100000]
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datos_sinteticos import escribir_memoria, generar_datos  # noqa: E402
+from memoria import MemoriaPersistente  # noqa: E402
+from memoria_sqlite import MemoriaSQLite  # noqa: E402
+
+
+def medir(funcion, repeticiones=200):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    escenarios = {
+        "primera página": lambda m, n: m.pagina_articulos(20),
+        "página intermedia (cursor)": lambda m, n: m.pagina_articulos(20, n // 2),
+        "recientes primero": lambda m, n: m.pagina_articulos(20, None, True),
+        "rango de fechas": lambda m, n: m.pagina_articulos(20, None, False, None, "2025-06-01", "2025-06-30"),
+        "historial (desplazamiento 100)": lambda m, n: m.pagina_historial(20, 100),
+    }
+    print(f"{'motor':<8}{'escenario':<34}" + "".join(f"{n:>12}" for n in args.tamanos) + "   (ms, mediana)")
+    with tempfile.TemporaryDirectory() as directorio:
+        memorias = {"json": [], "sqlite": []}
+        for n in args.tamanos:
+            ruta = os.path.join(directorio, f"m{n}.json")
+            escribir_memoria(ruta, n, busquedas=n)
+            memorias["json"].append(MemoriaPersistente(ruta))
+            sqlite = MemoriaSQLite(os.path.join(directorio, f"m{n}.db"))
+            sqlite.importar(generar_datos(n, busquedas=n))
+            memorias["sqlite"].append(sqlite)
+
+        for motor, instancias in memorias.items():
+            for nombre, consulta in escenarios.items():
+                fila = [medir(lambda: consulta(m, n)) for m, n in zip(instancias, args.tamanos)]
+                print(f"{motor:<8}{nombre:<34}" + "".join(f"{t:>12.3f}" for t in fila))
+            # Referencia: lo que hacía GET /articulos antes (leer y serializar toda la colección)
+            fila = [medir(lambda: json.dumps(list(m.obtener_articulos()), ensure_ascii=False), 5)
+                    for m in instancias]
+            print(f"{motor:<8}{'colección completa (antes)':<34}" + "".join(f"{t:>12.3f}" for t in fila))
+        for memoria in memorias["json"] + memorias["sqlite"]:
+            memoria.cerrar()
+
+
+if __name__ == "__main__":
+    main()
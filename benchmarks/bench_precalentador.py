@@ -0,0 +1,113 @@
+# bench_precalentador.py - Búsquedas de usuarios con y sin el precalentador de la caché
+#
+# El historial y las búsquedas siguientes salen de la misma distribución tipo
+# Zipf sobre --temas temas; LLMFalso tarda --latencia segundos por llamada.
+# "sin" parte de la caché vacía; "con" deja antes que el precalentador haga
+# una pasada con --presupuesto llamadas. Se cuentan las búsquedas que
+# esperaron al LLM y las servidas precalentadas. Después se comprueba que
+# una segunda pasada no gasta nada, que renueva lo que está por expirar y
+# que no pasa del presupuesto.
+#
+# Uso: python benchmarks/bench_precalentador.py [--temas 100] [--busquedas 500] [--presupuesto 20]
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("GOOGLE_API_KEY", "falso")
+
+from almacenamiento import AlmacenamientoJSON  # noqa: E402
+from benchmarks.datos_sinteticos import PALABRAS, TEMAS  # noqa: E402
+from benchmarks.llm_falso import LLMFalso  # noqa: E402
+from buscador import HerramientaBuscador  # noqa: E402
+from cache_respuestas import CacheRespuestas  # noqa: E402
+from memoria import MemoriaPersistente  # noqa: E402
+from precalentador import Precalentador  # noqa: E402
+
+
+def temas_zipf(n, k, semilla):
+    """k temas de entre n con frecuencias tipo Zipf (el primero, el más buscado)"""
+    temas = [f"{TEMAS[i % len(TEMAS)]} {PALABRAS[i % len(PALABRAS)]}" for i in range(n)]
+    acumulados = list(accumulate(1 / (i + 1) for i in range(n)))
+    return random.Random(semilla).choices(temas, cum_weights=acumulados, k=k)
+
+
+def usuarios(buscador, temas):
+    """Latencias (ms) de las búsquedas"""
+    latencias = []
+    for tema in temas:
+        inicio = time.perf_counter()
+        buscador.buscar_articulos(tema)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--temas", type=int, default=100)
+    parser.add_argument("--historial", type=int, default=2000)
+    parser.add_argument("--busquedas", type=int, default=500)
+    parser.add_argument("--presupuesto", type=int, default=20)
+    parser.add_argument("--latencia", type=float, default=0.02)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "memoria.json")
+        memoria = MemoriaPersistente(ruta, AlmacenamientoJSON(ruta))
+        for tema in temas_zipf(args.temas, args.historial, 0):
+            memoria.agregar_busqueda(tema, 5)
+        siguientes = temas_zipf(args.temas, args.busquedas, 1)
+
+        filas = []
+        for modo in ("sin", "con"):
+            llm = LLMFalso(latencia=args.latencia)
+            buscador = HerramientaBuscador(llm, cache=CacheRespuestas())
+            precalentador = Precalentador(buscador, memoria, temas=args.presupuesto,
+                                          llamadas_hora=args.presupuesto, ocioso=lambda: True)
+            if modo == "con":
+                precalentador.pasada()
+            llamadas_previas = llm.llamadas
+            latencias = usuarios(buscador, siguientes)
+            stats = precalentador.estadisticas()
+            filas.append((modo, llamadas_previas, llm.llamadas - llamadas_previas, stats["busquedas_precalentadas"],
+                          stats["tasa_precalentadas"], statistics.mean(latencias)))
+        memoria.cerrar()
+
+        # Segunda pasada sin nada que hacer, renovación antes de expirar y presupuesto agotado
+        antelacion = 60
+        llm = LLMFalso()
+        buscador = HerramientaBuscador(llm, cache=CacheRespuestas(ttl=3600))
+        memoria = MemoriaPersistente(ruta, AlmacenamientoJSON(ruta))
+        precalentador = Precalentador(buscador, memoria, temas=10, llamadas_hora=15,
+                                      antelacion=antelacion, ocioso=lambda: True)
+        assert precalentador.pasada() == 10 and precalentador.pasada() == 0
+        for entrada in list(buscador.cache.entradas.values())[:3]:
+            entrada["expira"] = time.time() + antelacion / 2
+        assert precalentador.pasada() == 3, "no renovó las entradas a punto de expirar"
+        for entrada in buscador.cache.entradas.values():
+            entrada["expira"] = time.time() + antelacion / 2
+        assert precalentador.pasada() == 2 and precalentador.disponibles() == 0, "no respetó el presupuesto"
+        assert precalentador.estadisticas()["omitidas_presupuesto"] == 8 and llm.llamadas == 15
+        ocupado = Precalentador(buscador, memoria, temas=10, ocioso=lambda: False, antelacion=antelacion)
+        assert ocupado.pasada() == 0 and llm.llamadas == 15, "llamó al LLM con el servidor ocupado"
+        memoria.cerrar()
+
+    print(f"{args.busquedas} búsquedas sobre {args.temas} temas, presupuesto {args.presupuesto} llamadas/hora, "
+          f"LLM de {args.latencia * 1000:.0f} ms")
+    print(f"{'precalentador':<15}{'llamadas antes':>16}{'esperaron al LLM':>18}{'precalentadas':>15}"
+          f"{'tasa':>8}{'media ms':>10}")
+    for modo, previas, frias, calientes, tasa, media in filas:
+        print(f"{modo:<15}{previas:>16}{frias:>18}{calientes:>15}{tasa:>8.2f}{media:>10.2f}")
+    (_, _, frias_sin, _, _, media_sin), (_, previas, frias_con, _, tasa, media_con) = filas
+    assert previas <= args.presupuesto and frias_con < frias_sin and media_con < media_sin and tasa > 0
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
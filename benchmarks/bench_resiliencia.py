@@ -0,0 +1,192 @@
+# bench_resiliencia.py - Plazos, reintentos, cortocircuito y respaldos del LLM con fallos inyectados
+#
+# Usa LLMFalso en local (sin red) para provocar cuelgues, errores 503 y
+# caídas completas, y comprueba que el buscador:
+#   - corta una llamada colgada al vencer el plazo
+#   - se recupera de errores transitorios reintentando
+#   - abre el circuito y falla al instante mientras el proveedor está caído
+#   - no se queda en semiabierto si la llamada de prueba se cancela
+#   - recurre al modelo de respaldo y, sin él, a la respuesta cacheada expirada
+# Al final compara la tasa de éxito con y sin reintentos ante una tasa de error dada.
+#
+# Uso: python benchmarks/bench_resiliencia.py [--llamadas 200] [--tasa-error 0.3] [--latencia 0.01]
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("GOOGLE_API_KEY", "falso")
+
+from benchmarks.llm_falso import LLMFalso  # noqa: E402
+from buscador import HerramientaBuscador  # noqa: E402
+from cache_respuestas import CacheRespuestas  # noqa: E402
+from resiliencia import Circuito, Resiliencia  # noqa: E402
+
+
+def resiliencia(plazo=5, intentos=3, minimo=1000, espera=60):
+    # Esperas mínimas para que la prueba no dependa del backoff real
+    return Resiliencia(plazo=plazo, intentos=intentos, espera_base=0.01, espera_maxima=0.05,
+                       circuito=Circuito(ventana=20, minimo=minimo, umbral=0.5, espera=espera))
+
+
+def falla(funcion):
+    try:
+        funcion()
+    except Exception as e:
+        return e
+    raise AssertionError("se esperaba un error")
+
+
+def escenario_plazo():
+    buscador = HerramientaBuscador(LLMFalso(colgar=2), resiliencia=resiliencia(plazo=0.3))
+    inicio = time.perf_counter()
+    error = falla(lambda: buscador.buscar_articulos("colgado"))
+    duracion = time.perf_counter() - inicio
+    assert duracion < 1, f"el plazo no cortó la llamada ({duracion:.2f}s)"
+    assert buscador.estadisticas_resiliencia()["plazos_agotados"] >= 1
+    return f"cortada a los {duracion * 1000:.0f} ms: {error}"
+
+
+def escenario_reintentos():
+    llm = LLMFalso(fallos_iniciales=2)
+    buscador = HerramientaBuscador(llm, resiliencia=resiliencia())
+    texto = buscador.buscar_articulos("transitorio")
+    stats = buscador.estadisticas_resiliencia()
+    assert "ARTÍCULO 1" in texto and llm.llamadas == 3 and stats["reintentos"] == 2, stats
+    return f"éxito al intento {llm.llamadas} ({stats['reintentos']} reintentos)"
+
+
+def escenario_circuito():
+    llm = LLMFalso(tasa_error=1)
+    buscador = HerramientaBuscador(llm, resiliencia=resiliencia(intentos=1, minimo=5))
+    for n in range(5):
+        falla(lambda: buscador.buscar_articulos(f"caído {n}"))
+    llamadas = llm.llamadas
+    inicio = time.perf_counter()
+    falla(lambda: buscador.buscar_articulos("caído otra vez"))
+    duracion = time.perf_counter() - inicio
+    stats = buscador.estadisticas_resiliencia()
+    assert stats["circuito"] == "abierto" and llm.llamadas == llamadas and stats["rechazadas"] == 1, stats
+    return f"abierto tras {llamadas} fallos; la siguiente falla en {duracion * 1000:.2f} ms sin llamar al LLM"
+
+
+def escenario_semiabierto():
+    llm = LLMFalso(fallos_iniciales=5)
+    buscador = HerramientaBuscador(llm, resiliencia=resiliencia(intentos=1, minimo=5, espera=0.1))
+    for n in range(5):
+        falla(lambda: buscador.buscar_articulos(f"caída {n}"))
+    time.sleep(0.15)
+    buscador.buscar_articulos("recuperado")
+    assert buscador.estadisticas_resiliencia()["circuito"] == "cerrado"
+    return "la llamada de prueba tuvo éxito y el circuito volvió a cerrarse"
+
+
+def semiabierto(latencia):
+    """Buscador con el circuito en semiabierto y un LLM ya recuperado que tarda `latencia` segundos"""
+    llm = LLMFalso(fallos_iniciales=5)
+    buscador = HerramientaBuscador(llm, resiliencia=resiliencia(intentos=1, minimo=5, espera=0.05))
+    for n in range(5):
+        falla(lambda: buscador.buscar_articulos(f"caída {n}"))
+    llm.latencia = latencia
+    time.sleep(0.1)
+    return llm, buscador
+
+
+async def cancelar(corrutina):
+    tarea = asyncio.ensure_future(corrutina)
+    await asyncio.sleep(0.05)
+    tarea.cancel()
+    await asyncio.gather(tarea, return_exceptions=True)
+
+
+async def consumir(eventos):
+    async for _ in eventos:
+        pass
+
+
+def escenario_sonda_cancelada():
+    cortes = {
+        "stream cerrado": lambda buscador: next(buscador.stream_busqueda("cortado")),
+        "astream cancelado": lambda buscador: asyncio.run(cancelar(consumir(buscador.astream_busqueda("cortado")))),
+        "llamada async cancelada": lambda buscador: asyncio.run(cancelar(buscador.abuscar_articulos("cortado"))),
+    }
+    for nombre, cortar in cortes.items():
+        llm, buscador = semiabierto(latencia=0.5)
+        cortar(buscador)
+        llm.latencia = 0
+        buscador.buscar_articulos("tras el corte")
+        stats = buscador.estadisticas_resiliencia()
+        assert stats["circuito"] == "cerrado" and stats["rechazadas"] == 0, (nombre, stats)
+    return f"{len(cortes)} pruebas cortadas a medias; la siguiente llamada volvió a probar y cerró el circuito"
+
+
+def escenario_respaldo_modelo():
+    respaldo = LLMFalso(respuesta="ARTÍCULO 1:\nTítulo: Del modelo de respaldo")
+    buscador = HerramientaBuscador(LLMFalso(tasa_error=1), respaldo=respaldo, resiliencia=resiliencia())
+    texto = buscador.buscar_articulos("principal caído")
+    eventos = list(buscador.stream_busqueda("principal caído en streaming"))
+    async_texto = asyncio.run(buscador.abuscar_articulos("principal caído async"))
+    stats = buscador.estadisticas_resiliencia()
+    assert "respaldo" in texto and "respaldo" in eventos[-1]["texto"] and "respaldo" in async_texto
+    assert stats["respaldos_modelo"] == 3, stats
+    return f"{stats['respaldos_modelo']} respuestas del modelo de respaldo (invoke, stream y async)"
+
+
+def escenario_respaldo_cache():
+    cache = CacheRespuestas(ttl=0.05, gracia=60)
+    llm = LLMFalso(respuesta="ARTÍCULO 1:\nTítulo: Respuesta de ayer")
+    buscador = HerramientaBuscador(llm, cache=cache, resiliencia=resiliencia(intentos=1))
+    buscador.buscar_articulos("tema cacheado")
+    time.sleep(0.1)
+    llm.tasa_error = 1
+    texto = buscador.buscar_articulos("tema cacheado")
+    eventos = list(buscador.stream_busqueda("tema cacheado"))
+    stats = buscador.estadisticas_resiliencia()
+    assert "ayer" in texto and "ayer" in eventos[-1]["texto"] and stats["respaldos_cache"] == 2, stats
+    falla(lambda: buscador.buscar_articulos("tema nunca visto"))
+    return "con el LLM caído se sirvió la respuesta expirada (sin ella, el error se propaga)"
+
+
+async def carga(buscador, llamadas):
+    resultados = await asyncio.gather(*(buscador.abuscar_articulos(f"tema {n}") for n in range(llamadas)),
+                                      return_exceptions=True)
+    return sum(not isinstance(r, Exception) for r in resultados)
+
+
+def comparar(llamadas, tasa_error, latencia):
+    print(f"\n{'intentos':>9}{'éxitos':>9}{'tasa':>8}{'reintentos':>12}{'segundos':>10}")
+    tasas = {}
+    for intentos in (1, 3):
+        llm = LLMFalso(latencia=latencia, tasa_error=tasa_error, semilla=7)
+        buscador = HerramientaBuscador(llm, resiliencia=resiliencia(intentos=intentos))
+        inicio = time.perf_counter()
+        exitos = asyncio.run(carga(buscador, llamadas))
+        duracion = time.perf_counter() - inicio
+        tasas[intentos] = exitos / llamadas
+        print(f"{intentos:>9}{exitos:>9}{tasas[intentos]:>8.0%}"
+              f"{buscador.estadisticas_resiliencia()['reintentos']:>12}{duracion:>10.2f}")
+    assert tasas[3] > tasas[1], "los reintentos no mejoraron la tasa de éxito"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--llamadas", type=int, default=200)
+    parser.add_argument("--tasa-error", type=float, default=0.3)
+    parser.add_argument("--latencia", type=float, default=0.01)
+    args = parser.parse_args()
+
+    for nombre, escenario in (("plazo", escenario_plazo), ("reintentos", escenario_reintentos),
+                              ("circuito", escenario_circuito), ("semiabierto", escenario_semiabierto),
+                              ("sonda cancelada", escenario_sonda_cancelada),
+                              ("respaldo modelo", escenario_respaldo_modelo),
+                              ("respaldo caché", escenario_respaldo_cache)):
+        print(f"{nombre:<17}{escenario()}")
+    comparar(args.llamadas, args.tasa_error, args.latencia)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# bench_resumen.py - Tiempo de /resumir: una sola llamada vs map-reduce por fragmentos
+#
+# El LLM falso cobra una latencia fija más un coste por cada 1k caracteres de
+# entrada y rechaza entradas mayores que su contexto, como un modelo real.
+#
+# Uso: python benchmarks/bench_resumen.py [--tamanos 10000 50000 200000]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.llm_falso import LLMFalso  # noqa: E402
+from buscador import HerramientaBuscador  # noqa: E402
+
+
+def documento(caracteres):
+    """Documento técnico sintético con secciones y párrafos"""
+    parrafo = ("Kubernetes orquesta contenedores y expone servicios mediante balanceadores. "
+               "Los operadores automatizan tareas de día dos como copias de seguridad. ") * 4
+    partes, seccion = [], 1
+    while sum(len(p) for p in partes) < caracteres:
+        partes.append(f"## Sección {seccion}\n\n{parrafo}\n\n{parrafo}\n")
+        seccion += 1
+    return "\n".join(partes)[:caracteres]
+
+
+def medir(buscador, contenido):
+    llamadas = buscador.llm.principal.llamadas
+    inicio = time.perf_counter()
+    try:
+        buscador.resumir_contenido(contenido)
+        resultado = f"{time.perf_counter() - inicio:>10.2f}s"
+    except Exception:
+        resultado = f"{'excede ctx':>11}"
+    return resultado, buscador.llm.principal.llamadas - llamadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--latencia", type=float, default=0.5)
+    parser.add_argument("--latencia-por-1k", type=float, default=0.05)
+    parser.add_argument("--contexto", type=int, default=120_000, help="caracteres máximos de entrada")
+    args = parser.parse_args()
+
+    def crear(umbral_tokens):
+        llm = LLMFalso(respuesta="1. Resumen ejecutivo ...", latencia=args.latencia,
+                       latencia_por_1k_caracteres=args.latencia_por_1k,
+                       max_caracteres_entrada=args.contexto)
+        return HerramientaBuscador(llm, umbral_tokens=umbral_tokens)
+
+    # Umbral enorme = siempre una sola llamada; el umbral por defecto activa map-reduce
+    directo, fragmentado = crear(10**9), crear(None)
+    print(f"{'caracteres':>10} {'directo':>11} {'llamadas':>8} {'map-reduce':>11} {'llamadas':>8}")
+    for tamano in args.tamanos:
+        contenido = documento(tamano)
+        (t_directo, n_directo), (t_mr, n_mr) = medir(directo, contenido), medir(fragmentado, contenido)
+        print(f"{tamano:>10} {t_directo} {n_directo:>8} {t_mr} {n_mr:>8}")
+
+
+if __name__ == "__main__":
+    main()
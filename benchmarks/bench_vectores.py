@@ -0,0 +1,75 @@
+# bench_vectores.py - Vectorización y top-k del índice vectorial (memmap de NumPy)
+#
+# Uso: python benchmarks/bench_vectores.py [--articulos 100000] [--consultas 200]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_indice import generar_articulos, generar_vocabulario, percentil  # noqa: E402
+from indice_vectorial import IndiceVectorial  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articulos", type=int, default=100000)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--lote", type=int, default=32, help="Consultas por llamada en el modo por lotes")
+    args = parser.parse_args()
+
+    palabras, acumulados = generar_vocabulario(50000)
+    articulos = list(generar_articulos(args.articulos, palabras, acumulados))
+
+    with tempfile.TemporaryDirectory() as directorio:
+        indice = IndiceVectorial(os.path.join(directorio, "vectores.npy"))
+        inicio = time.perf_counter()
+        indice.sincronizar(articulos)
+        indice.esperar()
+        duracion = time.perf_counter() - inicio
+        print(f"{args.articulos} artículos vectorizados en segundo plano en {duracion:.1f} s "
+              f"({args.articulos / duracion:.0f}/s, {indice.embedding.nombre})")
+
+        # Reabrir desde disco (tras el volcado al cerrar) no recalcula nada
+        indice.cerrar()
+        inicio = time.perf_counter()
+        reabierto = IndiceVectorial(indice.archivo)
+        pendientes = reabierto.sincronizar(articulos)
+        print(f"Reapertura del memmap: {(time.perf_counter() - inicio) * 1000:.0f} ms, "
+              f"{pendientes} artículos por recalcular")
+        assert pendientes == 0
+
+        azar = random.Random(5)
+        textos = [" ".join(azar.sample(palabras[200:5000], 3)) for _ in range(args.consultas)]
+        ids = [azar.randint(1, args.articulos) for _ in range(args.consultas)]
+
+        for nombre, consulta in (
+            ("semántica (1 consulta)", lambda i: reabierto.buscar(textos[i], 10)),
+            ("similares (1 artículo)", lambda i: reabierto.similares(ids[i], 5)),
+        ):
+            latencias = []
+            for i in range(args.consultas):
+                inicio = time.perf_counter()
+                consulta(i)
+                latencias.append(time.perf_counter() - inicio)
+            print(f"{nombre:<26} p50 {percentil(latencias, 0.5) * 1000:7.2f} ms"
+                  f"  p99 {percentil(latencias, 0.99) * 1000:7.2f} ms")
+
+        inicio = time.perf_counter()
+        for i in range(0, args.consultas, args.lote):
+            reabierto.buscar_lote(textos[i:i + args.lote], 10)
+        por_consulta = (time.perf_counter() - inicio) / args.consultas
+        print(f"{'semántica (lotes de ' + str(args.lote) + ')':<26} {por_consulta * 1000:7.2f} ms/consulta")
+
+        # El artículo más cercano a sí mismo (sin excluir) debe ser él mismo
+        vector = reabierto.embedding.vectorizar([articulos[0]["titulo"] + " " + articulos[0]["resumen"]])
+        assert reabierto.buscar_vectores(vector, 1)[0][0][0] == articulos[0]["id"]
+        reabierto.cerrar()
+        print("OK")
+
+
+if __name__ == "__main__":
+    main()
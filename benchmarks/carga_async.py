@@ -0,0 +1,80 @@
+# carga_async.py - Peticiones/segundo de /buscar con manejador síncrono vs async
+#
+# Compara el camino anterior (def + invoke bloqueante en el pool de hilos de
+# Starlette) con el actual (async def + ainvoke limitado por semáforo) contra
+# un LLM falso local con latencia configurable.
+#
+# Uso: python benchmarks/carga_async.py [--latencia 0.2] [--clientes 10 100 1000]
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from itertools import count
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("GOOGLE_API_KEY", "falso")
+os.environ["CURADOR_CACHE"] = "0"
+os.environ["CURADOR_ALMACENAMIENTO"] = "diario"
+os.environ["CURADOR_ARCHIVO_MEMORIA"] = os.path.join(tempfile.mkdtemp(), "memoria.json")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+import backend  # noqa: E402
+from benchmarks.llm_falso import LLMFalso  # noqa: E402
+from buscador import HerramientaBuscador  # noqa: E402
+
+
+def crear_app_sincrona():
+    """Réplica del manejador /buscar anterior: def que bloquea un hilo del pool"""
+    app = FastAPI()
+
+    @app.post("/buscar")
+    def buscar_articulos(request: backend.BusquedaRequest):
+        resultados = backend.buscador.buscar_articulos(request.tema)
+        backend.memoria.agregar_busqueda(request.tema, 5)
+        return {"exito": True, "tema": request.tema, "resultados": resultados}
+
+    return app
+
+
+async def medir(app, clientes, peticiones):
+    """Lanza `clientes` clientes concurrentes con `peticiones` cada uno; retorna req/s"""
+    temas = count()
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=None) as cliente:
+        async def usuario():
+            for _ in range(peticiones):
+                # Temas distintos para que la coalescencia no oculte la concurrencia real
+                respuesta = await cliente.post("/buscar", json={"tema": f"tema {next(temas)}"})
+                respuesta.raise_for_status()
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(usuario() for _ in range(clientes)))
+        return clientes * peticiones / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latencia", type=float, default=0.2)
+    parser.add_argument("--peticiones", type=int, default=3)
+    parser.add_argument("--clientes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--concurrencia-max", type=int, default=1000)
+    args = parser.parse_args()
+
+    backend.buscador = HerramientaBuscador(LLMFalso(latencia=args.latencia),
+                                           concurrencia_max=args.concurrencia_max)
+    apps = (("antes (def)", crear_app_sincrona()), ("ahora (async)", backend.app))
+
+    print(f"LLM falso: {args.latencia}s por llamada, {args.peticiones} peticiones por cliente\n")
+    print(f"{'clientes':>8} " + " ".join(f"{nombre:>16}" for nombre, _ in apps) + " (req/s)")
+    for clientes in args.clientes:
+        resultados = [asyncio.run(medir(app, clientes, args.peticiones)) for _, app in apps]
+        print(f"{clientes:>8} " + " ".join(f"{r:>16.1f}" for r in resultados))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# carga_coalescencia.py - N peticiones idénticas concurrentes a /buscar => 1 llamada al LLM
+#
+# Uso: python benchmarks/carga_coalescencia.py [--clientes 50] [--latencia 0.5]
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("GOOGLE_API_KEY", "falso")
+os.environ["CURADOR_CACHE"] = "0"
+os.environ["CURADOR_ARCHIVO_MEMORIA"] = os.path.join(tempfile.mkdtemp(), "memoria.json")
+
+import httpx  # noqa: E402
+
+import backend  # noqa: E402
+from benchmarks.llm_falso import LLMFalso  # noqa: E402
+from buscador import HerramientaBuscador  # noqa: E402
+
+
+async def enviar(clientes):
+    transporte = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        return await asyncio.gather(*(
+            cliente.post("/buscar", json={"tema": "Guerra fría"}) for _ in range(clientes)
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--latencia", type=float, default=0.5)
+    args = parser.parse_args()
+
+    llm = LLMFalso(latencia=args.latencia)
+    backend.buscador = HerramientaBuscador(llm)
+    respuestas = asyncio.run(enviar(args.clientes))
+
+    estados = {r.status_code for r in respuestas}
+    textos = {r.json()["resultados"] for r in respuestas}
+    print(f"Clientes: {args.clientes} | Llamadas al LLM: {llm.llamadas} | "
+          f"Coalescencia: {backend.buscador.estadisticas_coalescencia()}")
+    assert estados == {200}, f"Respuestas con error: {estados}"
+    assert len(textos) == 1, "Los clientes recibieron resultados distintos"
+    assert llm.llamadas == 1, f"Se esperaba 1 llamada al LLM y hubo {llm.llamadas}"
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
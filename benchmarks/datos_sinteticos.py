@@ -0,0 +1,146 @@
+# datos_sinteticos.py - Memorias de curator_memory.json deterministas y de cualquier tamaño (1k, 100k, 1M)
+#
+# Misma semilla => mismos bytes, así dos commits se miden sobre los mismos datos.
+# Los artículos tienen títulos y resúmenes variados (para los índices de texto y
+# vectorial), de 1 a 4 etiquetas con frecuencias tipo Zipf (pocas muy usadas,
+# muchas raras) y fechas crecientes a lo largo de 2025, como el orden de los ids.
+#
+# Uso: python -m benchmarks.datos_sinteticos --articulos 100000 [--busquedas N] [--semilla 0] --salida memoria.json
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resumen_historial  # noqa: E402
+from memoria import MemoriaPersistente  # noqa: E402
+
+TEMAS = [
+    "python", "rust", "go", "java", "kotlin", "typescript", "react", "vue", "kubernetes", "docker",
+    "terraform", "aws", "gcp", "azure", "postgresql", "sqlite", "redis", "kafka", "spark", "pandas",
+    "numpy", "pytorch", "transformers", "llm", "rag", "fastapi", "django", "graphql", "grpc", "linux",
+    "git", "ci-cd", "observabilidad", "seguridad", "criptografia", "redes", "compiladores", "wasm",
+    "microservicios", "algoritmos",
+]
+ASPECTOS = [
+    "rendimiento", "arquitectura", "testing", "buenas-practicas", "produccion", "escalabilidad",
+    "depuracion", "patrones", "concurrencia", "memoria", "migracion", "tutorial",
+]
+# Etiquetas ordenadas por popularidad: primero los temas y luego tema-aspecto
+ETIQUETAS = TEMAS + [f"{tema}-{aspecto}" for aspecto in ASPECTOS for tema in TEMAS]
+PESOS = [1 / (posicion + 1) for posicion in range(len(ETIQUETAS))]
+# Acumulados una vez: con weights=, random.choices los recalcula en cada artículo
+PESOS_ACUMULADOS = list(accumulate(PESOS))
+
+PLANTILLAS = [
+    "Guía práctica de {tema}: {palabra} y {otra}",
+    "{tema} en producción: lecciones sobre {palabra}",
+    "Cómo optimizar {palabra} con {tema}",
+    "Introducción a {tema} para equipos de {palabra}",
+    "Patrones de {palabra} en {tema} moderno",
+    "{tema} avanzado: {palabra}, {otra} y más",
+]
+PALABRAS = (
+    "latencia rendimiento caché índice consulta escalado réplica partición despliegue contenedor "
+    "servicio cola mensaje evento flujo lote memoria hilo proceso bloqueo transacción esquema "
+    "migración prueba cobertura perfilado traza métrica alerta registro seguridad token cifrado "
+    "firma certificado red protocolo paquete compilador optimización vectorización paralelismo "
+    "asincronía corrutina tipo genérico interfaz módulo paquete dependencia versión api cliente "
+    "servidor balanceador proxy almacenamiento disco archivo formato serialización compresión "
+    "modelo entrenamiento inferencia embedding atención contexto prompt evaluación dato limpieza"
+).split()
+
+INICIO = datetime(2025, 1, 1)
+DURACION = timedelta(days=365) - timedelta(seconds=1)
+
+
+def _fecha(posicion, total):
+    return (INICIO + DURACION * (posicion / max(total, 1))).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def generar_articulos(n, semilla=0):
+    """Itera los artículos 1..n sin tenerlos todos en memoria"""
+    azar = random.Random(semilla)
+    for i in range(1, n + 1):
+        etiquetas = list(dict.fromkeys(azar.choices(ETIQUETAS, cum_weights=PESOS_ACUMULADOS, k=azar.randint(1, 4))))
+        tema = etiquetas[0].split("-")[0]
+        palabra, otra = azar.sample(PALABRAS, 2)
+        resumen = " ".join(azar.choices(PALABRAS, k=azar.randint(20, 60)))
+        yield {
+            "id": i,
+            "fecha_guardado": _fecha(i, n),
+            "titulo": azar.choice(PLANTILLAS).format(tema=tema, palabra=palabra, otra=otra),
+            "resumen": resumen[0].upper() + resumen[1:] + ".",
+            "etiquetas": etiquetas,
+            "url": f"https://ejemplo.dev/{tema}/{i}" if azar.random() < 0.7 else None
+        }
+
+
+def generar_busquedas(n, semilla=0):
+    """Itera n búsquedas del historial, de la más antigua a la más reciente"""
+    azar = random.Random(semilla + 1)
+    for i in range(n):
+        yield {
+            "fecha": _fecha(i, n),
+            "query": f"{azar.choice(TEMAS)} {azar.choice(PALABRAS)}",
+            "num_resultados": azar.randint(0, 5)
+        }
+
+
+def _completar(datos, etiquetas, articulos, busquedas):
+    datos["etiquetas"] = etiquetas
+    datos["ultimo_id"] = articulos
+    datos["estadisticas"] = {"total_busquedas": busquedas, "total_articulos_guardados": articulos}
+    return datos
+
+
+def generar_datos(n, semilla=0, busquedas=None):
+    """Memoria completa con n artículos (y n // 10 búsquedas si no se indica otra cifra)"""
+    busquedas = n // 10 if busquedas is None else busquedas
+    datos = MemoriaPersistente.estructura_inicial(None)
+    datos["articulos_guardados"] = list(generar_articulos(n, semilla))
+    datos["historial_busquedas"] = list(generar_busquedas(busquedas, semilla))
+    datos["resumen_historial"] = resumen_historial.construir(datos["historial_busquedas"])
+    etiquetas = dict.fromkeys(e for a in datos["articulos_guardados"] for e in a["etiquetas"])
+    return _completar(datos, list(etiquetas), n, busquedas)
+
+
+def escribir_memoria(ruta, n, semilla=0, busquedas=None):
+    """Escribe la memoria en `ruta` artículo a artículo (1M cabe sin cargarlo entero)"""
+    busquedas = n // 10 if busquedas is None else busquedas
+    etiquetas, resumen = {}, {}
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write('{"historial_busquedas": [')
+        for posicion, busqueda in enumerate(generar_busquedas(busquedas, semilla)):
+            resumen_historial.acumular(resumen, busqueda)
+            f.write(("," if posicion else "") + json.dumps(busqueda, ensure_ascii=False))
+        f.write('], "articulos_guardados": [')
+        for posicion, articulo in enumerate(generar_articulos(n, semilla)):
+            etiquetas.update(dict.fromkeys(articulo["etiquetas"]))
+            f.write((",\n" if posicion else "\n") + json.dumps(articulo, ensure_ascii=False))
+        resto = MemoriaPersistente.estructura_inicial(None)
+        del resto["historial_busquedas"], resto["articulos_guardados"]
+        resto["resumen_historial"] = resumen
+        resto = _completar(resto, list(etiquetas), n, busquedas)
+        f.write("], " + json.dumps(resto, ensure_ascii=False)[1:])
+    return os.path.getsize(ruta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articulos", type=int, required=True)
+    parser.add_argument("--busquedas", type=int, default=None, help="Por defecto, una por cada 10 artículos")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", required=True)
+    args = parser.parse_args()
+
+    tamano = escribir_memoria(args.salida, args.articulos, args.semilla, args.busquedas)
+    print(f"{args.articulos} artículos -> {args.salida} ({tamano / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
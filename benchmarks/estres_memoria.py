@@ -0,0 +1,111 @@
+# estres_memoria.py - Inserciones concurrentes desde varios procesos e hilos sobre la misma memoria
+#
+# Cada worker es un proceso aparte (como uvicorn --workers N) que inserta
+# desde varios hilos a la vez. Al final no puede faltar ni repetirse ningún
+# artículo, y cada worker debe ver los de los demás tras refrescar.
+#
+# Uso: python benchmarks/estres_memoria.py [--workers 8] [--inserciones 1000] [--motores diario sqlite json]
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from almacenamiento import AlmacenamientoDiario, AlmacenamientoJSON  # noqa: E402
+from memoria import MemoriaPersistente  # noqa: E402
+from memoria_sqlite import MemoriaSQLite  # noqa: E402
+
+
+def abrir(motor, ruta):
+    if motor == "sqlite":
+        return MemoriaSQLite(ruta)
+    if motor == "diario":
+        # Umbral bajo para que la compactación (y la rotación del diario) ocurra durante la prueba
+        return MemoriaPersistente(ruta, AlmacenamientoDiario(ruta, umbral_compactacion=500,
+                                                             intervalo_compactacion=1))
+    return MemoriaPersistente(ruta, AlmacenamientoJSON(ruta))
+
+
+def trabajador(motor, ruta, numero, inserciones, hilos, barrera, resultados):
+    memoria = abrir(motor, ruta)
+    errores = []
+
+    def insertar(inicio):
+        try:
+            for n in range(inicio, inserciones, hilos):
+                memoria.guardar_articulo(f"w{numero}-{n}", "resumen", [f"worker{numero}", "estres"])
+        except Exception as e:
+            errores.append(repr(e))
+
+    inicio = time.perf_counter()
+    lanzados = [threading.Thread(target=insertar, args=(i,)) for i in range(hilos)]
+    for hilo in lanzados:
+        hilo.start()
+    for hilo in lanzados:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    # Lo que quede en la escritura diferida tiene que estar en disco antes de que los demás lo busquen
+    memoria.vaciar()
+    barrera.wait()
+    memoria.refrescar()
+    resultados.put((numero, duracion, len(memoria.obtener_articulos()), errores))
+    memoria.cerrar()
+
+
+def ejecutar(motor, directorio, workers, inserciones, hilos):
+    ruta = os.path.join(directorio, f"memoria-{motor}.db" if motor == "sqlite" else f"memoria-{motor}.json")
+    contexto = multiprocessing.get_context("spawn")
+    barrera = contexto.Barrier(workers)
+    resultados = contexto.Queue()
+    procesos = [contexto.Process(target=trabajador,
+                                 args=(motor, ruta, i, inserciones, hilos, barrera, resultados))
+                for i in range(workers)]
+    inicio = time.perf_counter()
+    for proceso in procesos:
+        proceso.start()
+    vistos = [resultados.get() for _ in procesos]
+    for proceso in procesos:
+        proceso.join()
+    duracion = time.perf_counter() - inicio
+
+    esperado = workers * inserciones
+    memoria = abrir(motor, ruta)
+    articulos = memoria.obtener_articulos()
+    ids = [a["id"] for a in articulos]
+    titulos = {a["titulo"] for a in articulos}
+    memoria.cerrar()
+
+    print(f"{motor:<8}{len(articulos):>10}{len(set(ids)):>12}{esperado / duracion:>14.0f}"
+          f"{min(v[2] for v in vistos):>14}")
+    for numero, _, _, errores in vistos:
+        assert not errores, f"worker {numero}: {errores[:3]}"
+    assert len(articulos) == esperado, f"{motor}: {len(articulos)} artículos, se esperaban {esperado}"
+    assert len(set(ids)) == esperado, f"{motor}: ids repetidos"
+    assert ids == sorted(ids), f"{motor}: ids fuera de orden"
+    assert titulos == {f"w{w}-{n}" for w in range(workers) for n in range(inserciones)}, f"{motor}: faltan artículos"
+    assert all(v[2] == esperado for v in vistos), f"{motor}: algún worker no vio lo de los demás"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--inserciones", type=int, default=1000, help="Por worker")
+    parser.add_argument("--hilos", type=int, default=4, help="Hilos por worker")
+    parser.add_argument("--motores", nargs="+", default=["json", "diario", "sqlite"],
+                        choices=["json", "diario", "sqlite"])
+    args = parser.parse_args()
+
+    print(f"{'motor':<8}{'artículos':>10}{'ids únicos':>12}{'altas/s':>14}{'vistos (mín)':>14}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for motor in args.motores:
+            ejecutar(motor, directorio, args.workers, args.inserciones, args.hilos)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# llm_falso.py - Modelo de chat local y determinista para benchmarks sin Gemini
+import asyncio
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+def respuesta_busqueda(articulos=5):
+    """Texto con el formato que espera prompt_busqueda"""
+    bloques = []
+    for n in range(1, articulos + 1):
+        bloques.append(
+            f"ARTÍCULO {n}:\n"
+            f"Título: Artículo sintético {n}\n"
+            f"Descripción: Descripción de prueba del artículo {n}.\n"
+            f"Conceptos: concepto{n}, benchmark\n"
+            f"Nivel: Intermedio\n"
+            f"Etiquetas: sintetico, prueba{n}\n"
+        )
+    return "\n".join(bloques)
+
+
+class ErrorProveedor(Exception):
+    """Error simulado del proveedor; con código 429/503 es reintentable"""
+
+    def __init__(self, mensaje="Servicio no disponible (simulado)", code=503):
+        super().__init__(mensaje)
+        self.code = code
+
+
+class LLMFalso(BaseChatModel):
+    """Responde siempre el mismo texto tras una latencia configurable y cuenta las llamadas.
+
+    Para probar la resiliencia puede fallar (las primeras `fallos_iniciales`
+    llamadas y luego con probabilidad `tasa_error`, lanzando `error()`) o
+    quedarse `colgar` segundos sin responder.
+    """
+
+    respuesta: str = respuesta_busqueda()
+    # Tamaño de la salida en caracteres: la respuesta se repite o recorta (0 = tal cual)
+    caracteres: int = 0
+    latencia: float = 0.0
+    # Al hacer streaming la latencia se reparte entre fragmentos de este tamaño
+    tam_fragmento: int = 16
+    # Coste de procesar la entrada y límite de contexto (0 = sin límite)
+    latencia_por_1k_caracteres: float = 0.0
+    max_caracteres_entrada: int = 0
+    # Inyección de fallos
+    fallos_iniciales: int = 0
+    tasa_error: float = 0.0
+    error: Callable[[], Exception] = ErrorProveedor
+    colgar: float = 0.0
+    semilla: Optional[int] = None
+
+    _llamadas: int = PrivateAttr(default=0)
+    _bloqueo: Any = PrivateAttr(default_factory=threading.Lock)
+    _azar: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, contexto):
+        self._azar = random.Random(self.semilla)
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-falso"
+
+    @property
+    def llamadas(self):
+        return self._llamadas
+
+    def _contar(self):
+        """Cuenta la llamada y retorna el error que debe lanzar, o None"""
+        with self._bloqueo:
+            self._llamadas += 1
+            falla = self._llamadas <= self.fallos_iniciales or self._azar.random() < self.tasa_error
+        return self.error() if falla else None
+
+    def _salida(self):
+        if not self.caracteres or not self.respuesta:
+            return self.respuesta
+        return (self.respuesta * (self.caracteres // len(self.respuesta) + 1))[:self.caracteres]
+
+    def _latencia_total(self, messages):
+        """Valida el tamaño de la entrada y retorna la latencia de la llamada"""
+        if self.colgar:
+            return self.colgar
+        caracteres = sum(len(str(m.content)) for m in messages)
+        if self.max_caracteres_entrada and caracteres > self.max_caracteres_entrada:
+            raise ValueError(f"La entrada ({caracteres} caracteres) excede el contexto del modelo")
+        return self.latencia + caracteres / 1000 * self.latencia_por_1k_caracteres
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        error = self._contar()
+        latencia = self._latencia_total(messages)
+        if latencia:
+            time.sleep(latencia)
+        if error is not None:
+            raise error
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._salida()))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        error = self._contar()
+        latencia = self._latencia_total(messages)
+        if latencia:
+            await asyncio.sleep(latencia)
+        if error is not None:
+            raise error
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._salida()))])
+
+    def _fragmentos(self, messages):
+        texto = self._salida()
+        partes = [texto[i:i + self.tam_fragmento] for i in range(0, len(texto), self.tam_fragmento)]
+        return partes, (self._latencia_total(messages) / len(partes) if partes else 0)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        error = self._contar()
+        partes, pausa = self._fragmentos(messages)
+        if error is not None:
+            time.sleep(pausa)
+            raise error
+        for parte in partes:
+            if pausa:
+                time.sleep(pausa)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=parte))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        error = self._contar()
+        partes, pausa = self._fragmentos(messages)
+        if error is not None:
+            await asyncio.sleep(pausa)
+            raise error
+        for parte in partes:
+            if pausa:
+                await asyncio.sleep(pausa)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=parte))
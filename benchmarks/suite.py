@@ -0,0 +1,422 @@
+# suite.py - Suite reproducible: todas las rutas de la API, la memoria, el exportador, el importador y el precalentador con un LLM falso
+#
+# Por cada tamaño se genera (o se reutiliza de --datos) una memoria sintética
+# determinista y se lanza un proceso aparte que importa backend sobre una copia
+# de ella, sustituye Gemini por LLMFalso y mide cada escenario. El resultado es
+# un JSON con el commit, la máquina y los parámetros, para comparar commits:
+#
+#   python -m benchmarks.suite --tamanos 1000 100000 1000000 --salida base.json
+#   python -m benchmarks.suite --tamanos 1000 100000 --comparar base.json
+#
+# Ninguna ruta de backend.app queda sin medir: si se añade una sin escenario, la suite falla.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.datos_sinteticos import PALABRAS, TEMAS, escribir_memoria  # noqa: E402
+
+TEMA = "Optimización de consultas en PostgreSQL"
+CONTENIDO = ("## Índices\n\nUn índice B-tree acelera las búsquedas por igualdad y rango. "
+             "Los índices parciales reducen el tamaño cuando solo interesa un subconjunto.\n\n") * 20
+# Una regresión es más lenta que la base en esta fracción y en al menos este tiempo
+MINIMO_REGRESION_MS = 0.05
+
+
+# ==================== MEDICIÓN ====================
+def resumen(tiempos):
+    ordenados = sorted(tiempos)
+    return {
+        "mediana_ms": round(statistics.median(ordenados) * 1000, 4),
+        "p95_ms": round(ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))] * 1000, 4),
+        "min_ms": round(ordenados[0] * 1000, 4),
+        "max_ms": round(ordenados[-1] * 1000, 4),
+        "repeticiones": len(ordenados)
+    }
+
+
+def medir(funcion, repeticiones, calentamiento=1):
+    """`funcion(i)` recibe el número de llamada para variar ids y parámetros"""
+    for i in range(calentamiento):
+        funcion(i)
+    tiempos = []
+    for i in range(calentamiento, calentamiento + repeticiones):
+        inicio = time.perf_counter()
+        funcion(i)
+        tiempos.append(time.perf_counter() - inicio)
+    return resumen(tiempos)
+
+
+async def amedir(funcion, repeticiones, calentamiento=1):
+    for i in range(calentamiento):
+        await funcion(i)
+    tiempos = []
+    for i in range(calentamiento, calentamiento + repeticiones):
+        inicio = time.perf_counter()
+        await funcion(i)
+        tiempos.append(time.perf_counter() - inicio)
+    return resumen(tiempos)
+
+
+def una_vez(segundos):
+    return resumen([segundos])
+
+
+# ==================== ESCENARIOS ====================
+def escenarios_memoria(memoria, n, repeticiones):
+    """Operaciones de MemoriaPersistente (o MemoriaSQLite) sobre la colección cargada"""
+    pesadas = max(1, repeticiones // 10)
+    creados = []
+
+    def id_de(i):
+        return 1 + (i * 7919) % n
+
+    escenarios = [
+        ("obtener_articulo", lambda i: memoria.obtener_articulo(id_de(i)), repeticiones),
+        ("buscar_por_etiqueta", lambda i: memoria.buscar_por_etiqueta(TEMAS[i % len(TEMAS)]), pesadas),
+        ("pagina_articulos", lambda i: memoria.pagina_articulos(20), repeticiones),
+        ("pagina_articulos.cursor", lambda i: memoria.pagina_articulos(20, id_de(i)), repeticiones),
+        ("pagina_articulos.desc", lambda i: memoria.pagina_articulos(20, None, True), repeticiones),
+        ("pagina_articulos.etiqueta", lambda i: memoria.pagina_articulos(20, None, False, TEMAS[i % len(TEMAS)]),
+         repeticiones),
+        ("pagina_articulos.fechas", lambda i: memoria.pagina_articulos(20, None, False, None, "2025-06-01",
+                                                                        "2025-06-30"), repeticiones),
+        ("pagina_historial", lambda i: memoria.pagina_historial(20, i), repeticiones),
+        ("obtener_estadisticas", lambda i: memoria.obtener_estadisticas(), repeticiones),
+        ("obtener_etiquetas", lambda i: memoria.obtener_etiquetas(), repeticiones),
+        ("agregar_busqueda", lambda i: memoria.agregar_busqueda(f"bench {i}", 5), repeticiones),
+        ("guardar_articulo", lambda i: creados.append(memoria.guardar_articulo(f"Bench {i}", "Resumen", ["bench"])),
+         repeticiones),
+        # Borra los que acaba de crear: la colección queda como estaba para las rutas
+        ("eliminar_articulo", lambda i: memoria.eliminar_articulo(creados.pop()), repeticiones),
+        ("vaciar", lambda i: memoria.vaciar(), pesadas),
+        ("obtener_articulos", lambda i: memoria.obtener_articulos(), pesadas),
+        ("guardar_memoria", lambda i: memoria.guardar_memoria(), pesadas),
+    ]
+    return {f"memoria.{nombre}": medir(funcion, veces) for nombre, funcion, veces in escenarios}
+
+
+def rutas_app(app):
+    from fastapi.routing import APIRoute
+    return {(metodo, ruta.path) for ruta in app.routes if isinstance(ruta, APIRoute) for metodo in ruta.methods}
+
+
+async def escenarios_rutas(backend, n, repeticiones):
+    """Una petición por escenario y repetición contra la app ASGI, sin red"""
+    import httpx
+
+    pesadas = max(1, repeticiones // 10)
+    creados = []
+
+    def id_de(i):
+        return 1 + (i * 7919) % n
+
+    def crear(respuesta):
+        creados.append(respuesta.json()["id"])
+
+    lote = lambda i: {"json": {"contenidos": [f"{CONTENIDO} {i}-{k}" for k in range(8)]}}  # noqa: E731
+    # (método, plantilla, petición(i) -> (url, argumentos), repeticiones, después(respuesta))
+    escenarios = [
+        ("GET", "/", lambda i: ("/", {}), repeticiones, None),
+        ("POST", "/buscar", lambda i: ("/buscar", {"json": {"tema": f"{TEMA} {i}"}}), repeticiones, None),
+        # Guarda la sugerencia 1 de los temas que acaba de buscar /buscar
+        ("POST", "/buscar/guardar", lambda i: ("/buscar/guardar", {"json": {"tema": f"{TEMA} {i}", "numero": 1}}),
+         repeticiones, crear),
+        ("POST", "/resumir", lambda i: ("/resumir", {"json": {"contenido": f"{CONTENIDO} {i}"}}), repeticiones, None),
+        ("POST", "/buscar/stream", lambda i: ("/buscar/stream", {"json": {"tema": f"{TEMA} stream {i}"}}),
+         repeticiones, None),
+        ("POST", "/resumir/stream", lambda i: ("/resumir/stream", {"json": {"contenido": f"{CONTENIDO} s{i}"}}),
+         repeticiones, None),
+        ("POST", "/resumir/lote", lambda i: ("/resumir/lote", lote(i)), pesadas, None),
+        ("POST", "/resumir/lote/stream", lambda i: ("/resumir/lote/stream", lote(f"s{i}")), pesadas, None),
+        ("POST", "/articulos", lambda i: ("/articulos", {"json": {"titulo": f"Bench {i}", "resumen": "Resumen",
+                                                                  "etiquetas": ["bench"]}}), repeticiones, crear),
+        # 20 artículos nuevos por petición en JSONL: un solo lote y una escritura
+        ("POST", "/articulos/lote", lambda i: ("/articulos/lote", {
+            "content": "".join(json.dumps({"titulo": f"Lote {i}-{k}", "resumen": "Resumen", "etiquetas": ["bench"]})
+                               + "\n" for k in range(20)),
+            "headers": {"Content-Type": "application/x-ndjson"}}), pesadas, None),
+        ("GET", "/articulos", lambda i: ("/articulos", {"params": {"limite": 20, "cursor": id_de(i)}}),
+         repeticiones, None),
+        ("GET", "/articulos/buscar", lambda i: ("/articulos/buscar", {"params": {"q": PALABRAS[i % len(PALABRAS)]}}),
+         repeticiones, None),
+        ("GET", "/articulos/semantica",
+         lambda i: ("/articulos/semantica", {"params": {"q": f"{TEMAS[i % len(TEMAS)]} {PALABRAS[i % len(PALABRAS)]}"}}),
+         repeticiones, None),
+        ("GET", "/articulos/similares/{articulo_id}", lambda i: (f"/articulos/similares/{id_de(i)}", {}),
+         repeticiones, None),
+        ("GET", "/articulos/{articulo_id}", lambda i: (f"/articulos/{id_de(i)}", {}), repeticiones, None),
+        # Devuelve todos los artículos de la etiqueta: crece con la colección
+        ("GET", "/articulos/etiqueta/{etiqueta}", lambda i: (f"/articulos/etiqueta/{TEMAS[i % len(TEMAS)]}", {}),
+         pesadas, None),
+        # Exportación completa: crece con la colección
+        ("GET", "/exportar", lambda i: ("/exportar", {"params": {"formato": ("markdown", "jsonl", "csv")[i % 3]}}),
+         pesadas, None),
+        ("GET", "/etiquetas", lambda i: ("/etiquetas", {"params": {"top": 20 + i, "conteos": True}}),
+         repeticiones, None),
+        ("GET", "/etiquetas/{etiqueta}", lambda i: (f"/etiquetas/{TEMAS[i % len(TEMAS)]}", {}), repeticiones, None),
+        ("GET", "/estadisticas", lambda i: ("/estadisticas", {}), repeticiones, None),
+        ("GET", "/historial", lambda i: ("/historial", {"params": {"limite": 20, "desplazamiento": i}}),
+         repeticiones, None),
+        # Las búsquedas sintéticas son de 2025: ventanas largas para que lleguen a ellas
+        ("GET", "/historial/tendencias", lambda i: ("/historial/tendencias", {"params": {
+            "dias": [30, 365, 3650], "limite": 10 + i % 90}}), repeticiones, None),
+        ("GET", "/metrics", lambda i: ("/metrics", {}), repeticiones, None),
+        ("GET", "/metrics/perfil", lambda i: ("/metrics/perfil", {}), repeticiones, None),
+        ("POST", "/metrics/perfil", lambda i: ("/metrics/perfil", {"params": {"activo": False}}), repeticiones, None),
+        ("GET", "/health", lambda i: ("/health", {}), repeticiones, None),
+        ("DELETE", "/articulos/{articulo_id}", lambda i: (f"/articulos/{creados.pop()}", {}), repeticiones, None),
+        ("DELETE", "/historial/{index}", lambda i: ("/historial/0", {}), repeticiones, None),
+        # Vacía el historial: va la última y una sola vez
+        ("DELETE", "/historial", lambda i: ("/historial", {}), 1, None),
+    ]
+    faltan = rutas_app(backend.app) - {(metodo, ruta) for metodo, ruta, *_ in escenarios}
+    assert not faltan, f"Rutas sin escenario en la suite: {sorted(faltan)}"
+
+    resultados = {}
+    transporte = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://suite", timeout=None) as cliente:
+        for metodo, plantilla, peticion, veces, despues in escenarios:
+            async def llamar(i):
+                url, argumentos = peticion(i)
+                respuesta = await cliente.request(metodo, url, **argumentos)
+                assert respuesta.status_code < 400, f"{metodo} {url}: {respuesta.status_code} {respuesta.text[:200]}"
+                if despues is not None:
+                    despues(respuesta)
+            resultados[f"rutas.{metodo} {plantilla}"] = await amedir(llamar, veces, 0 if veces == 1 else 1)
+    return resultados
+
+
+def escenarios_exportador(memoria, directorio, repeticiones):
+    import exportador
+    from curador import HerramientaExportador
+
+    pesadas = max(1, repeticiones // 10)
+    resultados = {}
+    ruta = os.path.join(directorio, "coleccion.md")
+    resultados["exportador.exportar_markdown"] = medir(
+        lambda i: HerramientaExportador.exportar_markdown(memoria.obtener_articulos(), ruta), pesadas)
+    resultados["exportador.exportar_markdown"]["bytes"] = os.path.getsize(ruta)
+    for formato in exportador.FORMATOS:
+        ruta = os.path.join(directorio, f"coleccion.{formato}")
+        resultados[f"exportador.exportar_archivo.{formato}"] = medir(
+            lambda i: exportador.exportar_archivo(memoria, ruta, formato), pesadas)
+    # Con la marca al día: solo lo guardado desde la exportación anterior
+    resultados["exportador.exportar_archivo.incremental"] = medir(
+        lambda i: (memoria.guardar_articulo(f"Nuevo {i}", "Resumen", ["bench"]),
+                   exportador.exportar_archivo(memoria, ruta, "csv", incremental=True)), repeticiones)
+    return resultados
+
+
+def escenarios_importador(memoria, directorio, repeticiones):
+    import importador
+    from benchmarks.datos_sinteticos import generar_articulos
+
+    pesadas = max(1, repeticiones // 10)
+    ruta = os.path.join(directorio, "importar.jsonl")
+
+    def escribir(i):
+        # Títulos y URLs propios de cada repetición: todos nuevos para la colección
+        with open(ruta, 'w', encoding='utf-8') as f:
+            for articulo in generar_articulos(1000, semilla=i):
+                articulo.update(titulo=f"Importado {i}-{articulo['id']}", url=None)
+                f.write(json.dumps(articulo, ensure_ascii=False) + "\n")
+
+    def importar(i):
+        escribir(i)
+        resultado = importador.importar_archivo(memoria, ruta)
+        assert resultado["insertados"] == 1000, resultado
+
+    return {
+        "importador.importar_archivo.1000": medir(importar, pesadas),
+        # El mismo archivo otra vez: todo duplicado, solo se lee y se compara
+        "importador.importar_archivo.duplicados": medir(lambda i: importador.importar_archivo(memoria, ruta), pesadas),
+    }
+
+
+def escenarios_precalentador(memoria, repeticiones):
+    from benchmarks.llm_falso import LLMFalso
+    from buscador import HerramientaBuscador
+    from cache_respuestas import CacheRespuestas
+    from precalentador import Precalentador
+
+    precalentador = Precalentador(HerramientaBuscador(LLMFalso(), cache=CacheRespuestas()), memoria,
+                                  ocioso=lambda: True)
+    return {
+        "precalentador.candidatos": medir(lambda i: precalentador.candidatos(), repeticiones),
+        # La primera (calentamiento) llama al LLM; las medidas ya lo encuentran todo en la caché
+        "precalentador.pasada": medir(lambda i: precalentador.pasada(), repeticiones),
+    }
+
+
+# ==================== PROCESO POR TAMAÑO ====================
+def entorno(directorio, args):
+    """Variables del trabajador: config se lee al importarse, así que van desde el arranque"""
+    return {
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark"),
+        "CURADOR_ALMACENAMIENTO": args.motor,
+        "CURADOR_ARCHIVO_MEMORIA": os.path.join(directorio, "memoria.json"),
+        "CURADOR_ARCHIVO_SQLITE": os.path.join(directorio, "memoria.db"),
+        "CURADOR_VECTORES_ARCHIVO": os.path.join(directorio, "vectores.npy"),
+        # Sin caché de respuestas: cada escenario con LLM llega al modelo falso
+        "CURADOR_CACHE": "0",
+    }
+
+
+def trabajador(args):
+    """Mide un tamaño en este proceso; el entorno (ver `entorno`) ya apunta a args.directorio"""
+    import config
+    n = args.tamanos[0]
+    if args.motor == "sqlite":
+        from memoria_sqlite import migrar_desde_json
+        migrar_desde_json(config.ARCHIVO_MEMORIA, config.ARCHIVO_SQLITE)
+
+    resultados = {}
+    inicio = time.perf_counter()
+    import backend
+    resultados["arranque.import_backend"] = una_vez(time.perf_counter() - inicio)
+    from benchmarks.llm_falso import LLMFalso
+    from buscador import HerramientaBuscador
+    backend.buscador = HerramientaBuscador(LLMFalso(latencia=args.latencia, caracteres=args.caracteres))
+
+    # Índices completos antes de medir, para que las búsquedas no dependan de cuánto avanzaron
+    inicio = time.perf_counter()
+    backend.indice.esperar()
+    resultados["arranque.indice_texto"] = una_vez(time.perf_counter() - inicio)
+    inicio = time.perf_counter()
+    backend.vectores.esperar()
+    resultados["arranque.indice_vectorial"] = una_vez(time.perf_counter() - inicio)
+
+    resultados.update(escenarios_memoria(backend.memoria, n, args.repeticiones))
+    resultados.update(asyncio.run(escenarios_rutas(backend, n, args.repeticiones)))
+    resultados.update(escenarios_exportador(backend.memoria, args.directorio, args.repeticiones))
+    resultados.update(escenarios_importador(backend.memoria, args.directorio, args.repeticiones))
+    resultados.update(escenarios_precalentador(backend.memoria, args.repeticiones))
+
+    backend.escritor.cerrar()
+    backend.memoria.cerrar()
+    backend.vectores.cerrar()
+    with open(args.resultado, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f)
+
+
+def medir_tamano(n, args, datos):
+    ruta = os.path.join(datos, f"memoria-{n}-s{args.semilla}.json")
+    if not os.path.exists(ruta):
+        inicio = time.perf_counter()
+        tamano = escribir_memoria(ruta, n, args.semilla)
+        print(f"  memoria sintética de {n} artículos: {tamano / 1e6:.1f} MB en {time.perf_counter() - inicio:.1f}s")
+    with tempfile.TemporaryDirectory() as directorio:
+        shutil.copy(ruta, os.path.join(directorio, "memoria.json"))
+        resultado = os.path.join(directorio, "resultado.json")
+        subprocess.run([sys.executable, "-W", "ignore", "-m", "benchmarks.suite", "--trabajador",
+                        "--directorio", directorio, "--resultado", resultado, "--tamanos", str(n),
+                        "--motor", args.motor, "--repeticiones", str(args.repeticiones),
+                        "--latencia", str(args.latencia), "--caracteres", str(args.caracteres)],
+                       cwd=RAIZ, env={**os.environ, **entorno(directorio, args), "PYTHONPATH": RAIZ}, check=True)
+        with open(resultado, encoding='utf-8') as f:
+            return json.load(f)
+
+
+# ==================== RESULTADOS ====================
+def git(*argumentos):
+    try:
+        return subprocess.run(["git", *argumentos], cwd=RAIZ, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(actual, base, umbral):
+    """Imprime la comparación con una ejecución anterior; retorna las regresiones"""
+    print(f"\nComparación con {base.get('commit') or '?'} (umbral {umbral:.0%}, mediana ms)")
+    print(f"{'tamaño':>9} {'escenario':<48}{'base':>12}{'actual':>12}{'cambio':>9}")
+    regresiones = []
+    for tamano, escenarios in actual["resultados"].items():
+        anteriores = base["resultados"].get(tamano, {})
+        for nombre, medida in escenarios.items():
+            if nombre not in anteriores:
+                continue
+            antes, ahora = anteriores[nombre]["mediana_ms"], medida["mediana_ms"]
+            cambio = (ahora - antes) / antes if antes else 0.0
+            marca = ""
+            if cambio > umbral and ahora - antes > MINIMO_REGRESION_MS:
+                marca = "  <- regresión"
+                regresiones.append((tamano, nombre, antes, ahora))
+            elif cambio < -umbral and antes - ahora > MINIMO_REGRESION_MS:
+                marca = "  mejora"
+            print(f"{tamano:>9} {nombre:<48}{antes:>12.3f}{ahora:>12.3f}{cambio:>+9.0%}{marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000],
+                        help="Artículos de cada memoria sintética, p. ej. 1000 100000 1000000")
+    parser.add_argument("--motor", choices=["json", "diario", "sqlite"], default="json")
+    parser.add_argument("--repeticiones", type=int, default=30, help="Por escenario; los pesados hacen 1/10")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos por llamada del LLM falso")
+    parser.add_argument("--caracteres", type=int, default=0, help="Tamaño de cada respuesta del LLM falso")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--datos", help="Directorio donde generar y reutilizar las memorias sintéticas")
+    parser.add_argument("--salida", help="JSON de resultados (por defecto benchmarks/resultados/<commit>.json)")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior; falla si hay regresiones")
+    parser.add_argument("--umbral", type=float, default=0.25)
+    parser.add_argument("--trabajador", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--directorio", help=argparse.SUPPRESS)
+    parser.add_argument("--resultado", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.trabajador:
+        return trabajador(args)
+
+    commit = git("rev-parse", "--short", "HEAD")
+    ejecucion = {
+        "commit": commit,
+        "cambios_sin_confirmar": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parametros": {"motor": args.motor, "repeticiones": args.repeticiones, "latencia": args.latencia,
+                       "caracteres": args.caracteres, "semilla": args.semilla},
+        "resultados": {}
+    }
+    with tempfile.TemporaryDirectory() as temporal:
+        datos = args.datos or temporal
+        os.makedirs(datos, exist_ok=True)
+        for n in args.tamanos:
+            print(f"Midiendo {n} artículos ({args.motor})...")
+            ejecucion["resultados"][str(n)] = medir_tamano(n, args, datos)
+
+    print(f"\n{'escenario':<48}" + "".join(f"{n:>12}" for n in args.tamanos) + "   (mediana ms)")
+    for nombre in ejecucion["resultados"][str(args.tamanos[0])]:
+        print(f"{nombre:<48}" + "".join(f"{ejecucion['resultados'][str(n)][nombre]['mediana_ms']:>12.3f}"
+                                        for n in args.tamanos))
+
+    salida = args.salida or os.path.join(RAIZ, "benchmarks", "resultados", f"{commit or 'sin-git'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(ejecucion, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            regresiones = comparar(ejecucion, json.load(f), args.umbral)
+        assert not regresiones, f"{len(regresiones)} regresiones: {[nombre for _, nombre, _, _ in regresiones]}"
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,680 @@
+# buscador.py - Herramienta de búsqueda y resumen con LLM compartida por el CLI y la API
+import asyncio
+import re
+import threading
+from collections import OrderedDict
+
+import config
+from cache_respuestas import normalizar_texto
+from coalescencia import VueloUnico, VueloUnicoAsync
+from resiliencia import Resiliencia, debe_respaldar
+
+
+# Aproximación de caracteres por token para decidir sin llamar al tokenizador del modelo
+CARACTERES_POR_TOKEN = 4
+
+# Fronteras estructurales de mayor a menor: secciones Markdown, párrafos, frases, palabras
+SEPARADORES = [
+    (re.compile(r"\n(?=#{1,6} )"), "\n"),
+    (re.compile(r"\n\s*\n"), "\n\n"),
+    (re.compile(r"(?<=[.!?])\s+"), " "),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def estimar_tokens(texto):
+    """Estimación rápida del número de tokens de un texto"""
+    return len(texto) // CARACTERES_POR_TOKEN + 1
+
+
+def dividir_contenido(texto, max_caracteres, nivel=0):
+    """Divide el texto en fragmentos de hasta max_caracteres respetando su estructura"""
+    if len(texto) <= max_caracteres:
+        return [texto] if texto.strip() else []
+    if nivel == len(SEPARADORES):
+        return [texto[i:i + max_caracteres] for i in range(0, len(texto), max_caracteres)]
+
+    patron, union = SEPARADORES[nivel]
+    fragmentos, actual = [], ""
+    for pieza in patron.split(texto):
+        if len(pieza) > max_caracteres:
+            if actual:
+                fragmentos.append(actual)
+                actual = ""
+            fragmentos.extend(dividir_contenido(pieza, max_caracteres, nivel + 1))
+        elif not actual:
+            actual = pieza
+        elif len(actual) + len(union) + len(pieza) <= max_caracteres:
+            actual += union + pieza
+        else:
+            fragmentos.append(actual)
+            actual = pieza
+    if actual:
+        fragmentos.append(actual)
+    return [fragmento for fragmento in fragmentos if fragmento.strip()]
+
+
+class SeparadorArticulos:
+    """Detecta secciones "ARTÍCULO N:" completas a medida que llega el texto"""
+
+    ENCABEZADO = re.compile(r"ART[ÍI]CULO\s+(\d+)\s*:", re.IGNORECASE)
+
+    def __init__(self):
+        self.pendiente = ""
+
+    def agregar(self, fragmento):
+        """Retorna las secciones que quedaron cerradas por un nuevo encabezado"""
+        self.pendiente += fragmento
+        encabezados = list(self.ENCABEZADO.finditer(self.pendiente))
+        completos = []
+        for actual, siguiente in zip(encabezados, encabezados[1:]):
+            completos.append((int(actual.group(1)), self.pendiente[actual.start():siguiente.start()].strip()))
+        if len(encabezados) > 1:
+            self.pendiente = self.pendiente[encabezados[-1].start():]
+        return completos
+
+    def finalizar(self):
+        """Retorna la última sección al terminar el texto"""
+        encabezado = self.ENCABEZADO.search(self.pendiente)
+        if encabezado is None:
+            return []
+        return [(int(encabezado.group(1)), self.pendiente[encabezado.start():].strip())]
+
+
+# ==================== SUGERENCIAS ESTRUCTURADAS ====================
+CAMPO = re.compile(
+    r"^[\s*\-•#]*(t[íi]tulo|descripci[óo]n|conceptos|nivel|etiquetas)[\s*]*:[\s*]*(.*)$",
+    re.IGNORECASE
+)
+CLAVES_CAMPO = {"t": "titulo", "d": "descripcion", "c": "conceptos", "n": "nivel", "e": "etiquetas"}
+NIVELES = ("Principiante", "Intermedio", "Avanzado")
+
+
+def _lista(valor):
+    return [elemento.strip(" *.") for elemento in valor.split(",") if elemento.strip(" *.")]
+
+
+def parsear_articulos(texto):
+    """Convierte la respuesta de prompt_busqueda en artículos sugeridos.
+
+    Tolera negritas Markdown, viñetas, acentos omitidos y descripciones de
+    varias líneas; los campos ausentes quedan vacíos.
+    """
+    encabezados = list(SeparadorArticulos.ENCABEZADO.finditer(texto))
+    articulos = []
+    for actual, siguiente in zip(encabezados, encabezados[1:] + [None]):
+        bloque = texto[actual.end():siguiente.start() if siguiente else len(texto)]
+        campos, campo = {}, None
+        for linea in bloque.splitlines():
+            coincidencia = CAMPO.match(linea)
+            if coincidencia:
+                campo = CLAVES_CAMPO[coincidencia.group(1)[0].lower()]
+                campos[campo] = coincidencia.group(2).strip()
+            elif campo is not None and linea.strip() and campo == "descripcion":
+                campos[campo] = f"{campos[campo]} {linea.strip()}".strip()
+        nivel = campos.get("nivel", "").strip(" *")
+        articulos.append({
+            "numero": int(actual.group(1)),
+            "titulo": campos.get("titulo", "").strip(" *\"") or "Sin título",
+            "descripcion": campos.get("descripcion", "").strip(" *"),
+            "conceptos": _lista(campos.get("conceptos", "")),
+            "nivel": next((n for n in NIVELES if n.lower() in nivel.lower()), nivel or None),
+            "etiquetas": _lista(campos.get("etiquetas", ""))
+        })
+    return articulos
+
+
+class RegistroSugerencias:
+    """Últimas sugerencias parseadas por tema, para guardarlas sin reenviarlas"""
+
+    def __init__(self, max_temas=200):
+        self.max_temas = max_temas
+        self.bloqueo = threading.Lock()
+        self.temas = OrderedDict()
+
+    def registrar(self, tema, articulos):
+        with self.bloqueo:
+            clave = normalizar_texto(tema)
+            self.temas[clave] = articulos
+            self.temas.move_to_end(clave)
+            while len(self.temas) > self.max_temas:
+                self.temas.popitem(last=False)
+
+    def obtener(self, tema, numero):
+        """Retorna el artículo sugerido número `numero` del tema o None"""
+        with self.bloqueo:
+            articulos = self.temas.get(normalizar_texto(tema), [])
+        return next((art for art in articulos if art["numero"] == numero), None)
+
+
+class FlujoEventos:
+    """Convierte fragmentos del modelo en eventos de streaming"""
+
+    def __init__(self, separar_articulos):
+        self.separador = SeparadorArticulos() if separar_articulos else None
+        self.partes = []
+
+    def procesar(self, fragmento):
+        if not fragmento:
+            return []
+        self.partes.append(fragmento)
+        eventos = [{"tipo": "token", "texto": fragmento}]
+        if self.separador is not None:
+            eventos += [self._evento_articulo(numero, bloque)
+                        for numero, bloque in self.separador.agregar(fragmento)]
+        return eventos
+
+    @staticmethod
+    def _evento_articulo(numero, bloque):
+        articulos = parsear_articulos(bloque)
+        return {"tipo": "articulo", "numero": numero, "texto": bloque,
+                "articulo": articulos[0] if articulos else None}
+
+    def finalizar(self):
+        eventos = []
+        fin = {"tipo": "fin", "texto": self.texto}
+        if self.separador is not None:
+            eventos += [self._evento_articulo(numero, bloque)
+                        for numero, bloque in self.separador.finalizar()]
+            fin["articulos"] = parsear_articulos(self.texto)
+        eventos.append(fin)
+        return eventos
+
+    @property
+    def texto(self):
+        return "".join(self.partes)
+
+
+def crear_llm(modelo=None):
+    """Cliente de Gemini configurado"""
+    # langchain_google_genai tarda casi un segundo en importarse: solo se paga al usarlo
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    # Los reintentos y el plazo total los lleva Resiliencia; el timeout del
+    # cliente libera el hilo de un intento abandonado
+    return ChatGoogleGenerativeAI(model=modelo or config.LLM_MODELO, temperature=config.LLM_TEMPERATURA,
+                                  timeout=config.LLM_PLAZO, max_retries=0)
+
+
+class HerramientaBuscador:
+    """Herramienta de búsqueda y análisis de contenido técnico.
+
+    El LLM, los prompts y las cadenas de LangChain se crean en la primera
+    llamada que los necesita: arrancar, listar o consultar la memoria no
+    importa LangChain. Sin `llm` se usa `crear_llm()`, y sin `respaldo` el
+    modelo de config.LLM_MODELO_RESPALDO si hay uno.
+
+    Cada llamada al LLM pasa por `resiliencia` (plazo, reintentos con
+    jitter y cortocircuito); si aun así falla, se recurre al modelo de
+    respaldo y, por último, a la respuesta cacheada aunque haya expirado.
+    """
+
+    # Atributos que se crean en `_preparar`
+    PEREZOSOS = frozenset({
+        "llm", "prompt_busqueda", "prompt_resumen", "prompt_fragmento", "prompt_combinar",
+        "chain_busqueda", "chain_resumen", "chain_fragmento", "chain_combinar", "cadena_fragmento",
+        "cadena_resumen",
+    })
+    
+    def __init__(self, llm=None, cache=None, concurrencia_max=None,
+                 umbral_tokens=None, tokens_fragmento=None, respaldo=None, resiliencia=None):
+        self._llm = llm
+        self._respaldo = respaldo
+        self.resiliencia = resiliencia or Resiliencia()
+        self._bloqueo_preparacion = threading.Lock()
+        self.cache = cache
+        self.umbral_tokens = umbral_tokens or config.RESUMEN_UMBRAL_TOKENS
+        self.tokens_fragmento = tokens_fragmento or config.RESUMEN_TOKENS_FRAGMENTO
+        self.vuelo = VueloUnico()
+        self.vuelo_async = VueloUnicoAsync()
+        self.sugerencias = RegistroSugerencias()
+        # Limita las llamadas async en curso al LLM, no el número de hilos
+        self.semaforo = asyncio.Semaphore(concurrencia_max or config.LLM_CONCURRENCIA_MAX)
+
+    def __getattr__(self, nombre):
+        # Solo se llega aquí si el atributo todavía no existe
+        if nombre not in self.PEREZOSOS:
+            raise AttributeError(f"'{type(self).__name__}' no tiene el atributo '{nombre}'")
+        self._preparar()
+        return self.__dict__[nombre]
+
+    def _preparar(self):
+        with self._bloqueo_preparacion:
+            if "cadena_resumen" not in self.__dict__:
+                self._crear_cadenas()
+
+    def _crear_cadenas(self):
+        """Crea el LLM, los prompts y las cadenas de LangChain"""
+        from langchain.chains import LLMChain
+        from langchain_core.runnables import RunnableLambda
+
+        from llm_resiliente import LLMResiliente, PromptMedido
+
+        respaldo = self._respaldo
+        if respaldo is None and self._llm is None and config.LLM_MODELO_RESPALDO:
+            respaldo = crear_llm(config.LLM_MODELO_RESPALDO)
+        self.llm = LLMResiliente(self._llm if self._llm is not None else crear_llm(),
+                                 self.resiliencia, respaldo)
+        self.prompt_busqueda = PromptMedido(
+            input_variables=["tema"],
+            template="""Eres un experto curador de contenido técnico. 
+            
+Genera una lista de 5 artículos técnicos recomendados sobre: {tema}
+
+Para cada artículo proporciona:
+- Título sugerido
+- Breve descripción (2-3 líneas)
+- Conceptos clave
+- Nivel de dificultad (Principiante/Intermedio/Avanzado)
+- 2-3 etiquetas relevantes
+
+Formato de respuesta:
+ARTÍCULO 1:
+Título: [título]
+Descripción: [descripción]
+Conceptos: [conceptos separados por comas]
+Nivel: [nivel]
+Etiquetas: [etiquetas separadas por comas]
+
+[Repite para los 5 artículos]"""
+        )
+        
+        self.prompt_resumen = PromptMedido(
+            input_variables=["contenido"],
+            template="""Analiza el siguiente contenido técnico y genera un resumen estructurado:
+
+CONTENIDO:
+{contenido}
+
+Proporciona:
+1. Resumen ejecutivo (3-4 líneas)
+2. Puntos clave (máximo 5 puntos)
+3. Tecnologías mencionadas
+4. Público objetivo
+5. 3-5 etiquetas descriptivas
+
+Formato estructurado y claro."""
+        )
+        
+        # Map-reduce para contenidos largos: notas por fragmento y combinación final
+        self.prompt_fragmento = PromptMedido(
+            input_variables=["fragmento", "parte", "total"],
+            template="""Esta es la parte {parte} de {total} de un contenido técnico extenso.
+
+FRAGMENTO:
+{fragmento}
+
+Extrae en notas breves las ideas principales, los puntos clave, las tecnologías
+mencionadas y el público al que se dirige. No añadas introducciones."""
+        )
+        
+        self.prompt_combinar = PromptMedido(
+            input_variables=["resumenes"],
+            template="""Las siguientes notas resumen, en orden, las partes de un contenido técnico extenso.
+Genera un único resumen estructurado del contenido completo:
+
+NOTAS:
+{resumenes}
+
+Proporciona:
+1. Resumen ejecutivo (3-4 líneas)
+2. Puntos clave (máximo 5 puntos)
+3. Tecnologías mencionadas
+4. Público objetivo
+5. 3-5 etiquetas descriptivas
+
+Formato estructurado y claro."""
+        )
+        
+        self.chain_busqueda = LLMChain(llm=self.llm, prompt=self.prompt_busqueda)
+        self.chain_resumen = LLMChain(llm=self.llm, prompt=self.prompt_resumen)
+        self.chain_fragmento = LLMChain(llm=self.llm, prompt=self.prompt_fragmento)
+        self.chain_combinar = LLMChain(llm=self.llm, prompt=self.prompt_combinar)
+        # Cada fragmento del mapeo async espera su turno en el semáforo
+        self.cadena_fragmento = RunnableLambda(self.chain_fragmento.invoke, afunc=self._afragmento)
+        # Resumen completo (directo o map-reduce) como Runnable para los lotes; va
+        # la última porque su presencia indica que todo lo anterior ya existe
+        self.cadena_resumen = RunnableLambda(self._resumir, afunc=self._aresumir)
+    
+    def _consultar(self, espacio, texto, llamada):
+        """Resuelve desde la caché o invoca al LLM una sola vez por entrada concurrente"""
+        if self.cache is not None:
+            respuesta = self.cache.obtener(espacio, texto)
+            if respuesta is not None:
+                return respuesta
+        try:
+            return self.vuelo.ejecutar(
+                (espacio, normalizar_texto(texto)),
+                lambda: self._invocar(espacio, texto, llamada)
+            )
+        except Exception as e:
+            # El respaldo lo decide cada petición: el vuelo puede ser del precalentador, que no lo usa
+            respuesta = self._respaldo_cache(espacio, texto, e)
+            if respuesta is None:
+                raise
+            return respuesta
+    
+    def _respaldo_cache(self, espacio, texto, error):
+        """Respuesta cacheada (aunque expirada) si el fallo es del proveedor, o None"""
+        if self.cache is None or not debe_respaldar(error):
+            return None
+        respuesta = self.cache.obtener_respaldo(espacio, texto)
+        if respuesta is not None:
+            self.resiliencia.contar("respaldos_cache")
+        return respuesta
+    
+    def _invocar(self, espacio, texto, llamada):
+        respuesta = llamada()
+        if self.cache is not None:
+            self.cache.guardar(espacio, texto, respuesta)
+        return respuesta
+    
+    def buscar_articulos(self, tema):
+        """Busca artículos sobre un tema"""
+        try:
+            return self._consultar(
+                "busqueda", tema,
+                lambda: self.chain_busqueda.invoke({"tema": tema})["text"]
+            )
+        except Exception as e:
+            raise Exception(f"Error en búsqueda: {str(e)}")
+    
+    def buscar_sugerencias(self, tema):
+        """Busca artículos y retorna (texto, artículos parseados)"""
+        texto = self.buscar_articulos(tema)
+        articulos = parsear_articulos(texto)
+        self.sugerencias.registrar(tema, articulos)
+        return texto, articulos
+    
+    def precalentar_busqueda(self, tema):
+        """Llama al LLM para `tema` aunque esté en caché y guarda la respuesta como precalentada.
+
+        Sin respaldo de caché: si falla, la entrada anterior queda como estaba
+        y el error llega al precalentador. Comparte vuelo con buscar_articulos;
+        dentro de la API se usa aprecalentar_busqueda.
+        """
+        def llamada():
+            respuesta = self.chain_busqueda.invoke({"tema": tema})["text"]
+            self.cache.guardar("busqueda", tema, respuesta, origen="precalentador")
+            return respuesta
+        return self.vuelo.ejecutar(("busqueda", normalizar_texto(tema)), llamada)
+
+    def resumir_contenido(self, contenido):
+        """Genera resumen de contenido"""
+        try:
+            return self._consultar(
+                "resumen", contenido,
+                lambda: self._resumir(contenido)
+            )
+        except Exception as e:
+            raise Exception(f"Error al resumir: {str(e)}")
+    
+    # ==================== VERSIÓN ASYNC ====================
+    async def _aconsultar(self, espacio, texto, llamada):
+        """Equivalente async de _consultar para los manejadores de la API"""
+        if self.cache is not None:
+            respuesta = self.cache.obtener(espacio, texto)
+            if respuesta is not None:
+                return respuesta
+        try:
+            return await self.vuelo_async.ejecutar(
+                (espacio, normalizar_texto(texto)),
+                lambda: self._ainvocar(espacio, texto, llamada)
+            )
+        except Exception as e:
+            respuesta = self._respaldo_cache(espacio, texto, e)
+            if respuesta is None:
+                raise
+            return respuesta
+    
+    async def _ainvocar(self, espacio, texto, llamada):
+        respuesta = await llamada()
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.guardar, espacio, texto, respuesta)
+        return respuesta
+    
+    async def abuscar_articulos(self, tema):
+        """Busca artículos sobre un tema sin bloquear el bucle de eventos"""
+        async def llamada():
+            async with self.semaforo:
+                return (await self.chain_busqueda.ainvoke({"tema": tema}))["text"]
+        try:
+            return await self._aconsultar("busqueda", tema, llamada)
+        except Exception as e:
+            raise Exception(f"Error en búsqueda: {str(e)}")
+    
+    async def abuscar_sugerencias(self, tema):
+        """Versión async de buscar_sugerencias"""
+        texto = await self.abuscar_articulos(tema)
+        articulos = parsear_articulos(texto)
+        self.sugerencias.registrar(tema, articulos)
+        return texto, articulos
+    
+    async def aresumir_contenido(self, contenido):
+        """Genera resumen de contenido sin bloquear el bucle de eventos"""
+        try:
+            return await self._aconsultar("resumen", contenido, lambda: self._aresumir(contenido))
+        except Exception as e:
+            raise Exception(f"Error al resumir: {str(e)}")
+    
+    async def aprecalentar_busqueda(self, tema):
+        """precalentar_busqueda en el vuelo async: se une a las búsquedas de los usuarios en curso"""
+        async def llamada():
+            async with self.semaforo:
+                respuesta = (await self.chain_busqueda.ainvoke({"tema": tema}))["text"]
+            await asyncio.to_thread(self.cache.guardar, "busqueda", tema, respuesta, origen="precalentador")
+            return respuesta
+        return await self.vuelo_async.ejecutar(("busqueda", normalizar_texto(tema)), llamada)
+    
+    def estadisticas_coalescencia(self):
+        """Suma de las métricas de coalescencia síncrona y async"""
+        sincrona, asincrona = self.vuelo.estadisticas(), self.vuelo_async.estadisticas()
+        return {clave: sincrona[clave] + asincrona[clave] for clave in sincrona}
+    
+    def estadisticas_resiliencia(self):
+        """Reintentos, plazos agotados, estado del circuito y respaldos usados"""
+        return self.resiliencia.estadisticas()
+    
+    # ==================== RESUMEN MAP-REDUCE ====================
+    def _entradas_fragmentos(self, texto):
+        fragmentos = dividir_contenido(texto, self.tokens_fragmento * CARACTERES_POR_TOKEN)
+        return [{"fragmento": fragmento, "parte": i, "total": len(fragmentos)}
+                for i, fragmento in enumerate(fragmentos, 1)]
+    
+    @staticmethod
+    def _unir_notas(salidas):
+        return "\n\n".join(f"[Parte {i}]\n{salida['text'].strip()}" for i, salida in enumerate(salidas, 1))
+    
+    def _necesita_mapeo(self, texto, anterior=None):
+        # Se detiene también si una ronda de mapeo ya no reduce el tamaño
+        return estimar_tokens(texto) > self.umbral_tokens and (anterior is None or len(texto) < len(anterior))
+    
+    def _preparar_resumen(self, contenido):
+        """Elige resumen directo o map-reduce; retorna el prompt final y su entrada"""
+        if not self._necesita_mapeo(contenido):
+            return self.prompt_resumen, {"contenido": contenido}
+        texto, anterior = contenido, None
+        while self._necesita_mapeo(texto, anterior):
+            salidas = self.chain_fragmento.batch(
+                self._entradas_fragmentos(texto),
+                config={"max_concurrency": config.LOTE_CONCURRENCIA_MAX}
+            )
+            texto, anterior = self._unir_notas(salidas), texto
+        return self.prompt_combinar, {"resumenes": texto}
+    
+    async def _apreparar_resumen(self, contenido):
+        if not self._necesita_mapeo(contenido):
+            return self.prompt_resumen, {"contenido": contenido}
+        texto, anterior = contenido, None
+        while self._necesita_mapeo(texto, anterior):
+            salidas = await self.cadena_fragmento.abatch(
+                self._entradas_fragmentos(texto),
+                config={"max_concurrency": config.LOTE_CONCURRENCIA_MAX}
+            )
+            texto, anterior = self._unir_notas(salidas), texto
+        return self.prompt_combinar, {"resumenes": texto}
+    
+    async def _afragmento(self, entrada):
+        async with self.semaforo:
+            return await self.chain_fragmento.ainvoke(entrada)
+    
+    def _cadena(self, prompt):
+        return self.chain_resumen if prompt is self.prompt_resumen else self.chain_combinar
+    
+    def _resumir(self, contenido):
+        prompt, entrada = self._preparar_resumen(contenido)
+        return self._cadena(prompt).invoke(entrada)["text"]
+    
+    async def _aresumir(self, contenido):
+        # El semáforo se toma por llamada al LLM, no durante el mapeo, que ya lo toma por fragmento
+        prompt, entrada = await self._apreparar_resumen(contenido)
+        async with self.semaforo:
+            return (await self._cadena(prompt).ainvoke(entrada))["text"]
+    
+    # ==================== LOTES ====================
+    @staticmethod
+    def _resultado_lote(indice, salida):
+        if isinstance(salida, Exception):
+            return {"indice": indice, "exito": False, "resumen": None,
+                    "error": f"Error al resumir: {str(salida)}"}
+        return {"indice": indice, "exito": True, "resumen": salida, "error": None}
+    
+    def _pendientes_lote(self, contenidos):
+        """Separa los documentos ya cacheados de los que requieren al LLM"""
+        cacheados, pendientes = [], []
+        for indice, contenido in enumerate(contenidos):
+            cacheada = self.cache.obtener("resumen", contenido) if self.cache is not None else None
+            if cacheada is not None:
+                cacheados.append(self._resultado_lote(indice, cacheada))
+            else:
+                pendientes.append(indice)
+        return cacheados, pendientes
+    
+    def resumir_lote(self, contenidos, concurrencia_max=None, progreso=None):
+        """Resume varios documentos en paralelo; retorna los resultados en orden de entrada.
+        
+        `progreso(resultado, completados, total)` se llama en cuanto termina cada documento.
+        """
+        resultados = [None] * len(contenidos)
+        cacheados, pendientes = self._pendientes_lote(contenidos)
+        completados = 0
+        
+        def registrar(resultado):
+            nonlocal completados
+            resultados[resultado["indice"]] = resultado
+            completados += 1
+            if progreso is not None:
+                progreso(resultado, completados, len(contenidos))
+        
+        for resultado in cacheados:
+            registrar(resultado)
+        lote = self.cadena_resumen.batch_as_completed(
+            [contenidos[i] for i in pendientes],
+            config={"max_concurrency": concurrencia_max or config.LOTE_CONCURRENCIA_MAX},
+            return_exceptions=True
+        )
+        for posicion, salida in lote:
+            indice = pendientes[posicion]
+            if not isinstance(salida, Exception):
+                if self.cache is not None:
+                    self.cache.guardar("resumen", contenidos[indice], salida)
+            registrar(self._resultado_lote(indice, salida))
+        return resultados
+    
+    async def aresumir_lote_stream(self, contenidos, concurrencia_max=None):
+        """Resume varios documentos en paralelo produciendo cada resultado al completarse"""
+        cacheados, pendientes = self._pendientes_lote(contenidos)
+        for resultado in cacheados:
+            yield resultado
+        lote = self.cadena_resumen.abatch_as_completed(
+            [contenidos[i] for i in pendientes],
+            config={"max_concurrency": concurrencia_max or config.LOTE_CONCURRENCIA_MAX},
+            return_exceptions=True
+        )
+        async for posicion, salida in lote:
+            indice = pendientes[posicion]
+            if not isinstance(salida, Exception):
+                if self.cache is not None:
+                    await asyncio.to_thread(self.cache.guardar, "resumen", contenidos[indice], salida)
+            yield self._resultado_lote(indice, salida)
+    
+    async def aresumir_lote(self, contenidos, concurrencia_max=None):
+        """Versión async de resumir_lote"""
+        resultados = [None] * len(contenidos)
+        async for resultado in self.aresumir_lote_stream(contenidos, concurrencia_max):
+            resultados[resultado["indice"]] = resultado
+        return resultados
+    
+    # ==================== STREAMING ====================
+    def _registrar_fin(self, tema, evento):
+        if evento["tipo"] == "fin" and "articulos" in evento:
+            self.sugerencias.registrar(tema, evento["articulos"])
+    
+    def _cadena_stream(self, prompt):
+        from langchain_core.output_parsers import StrOutputParser
+        return prompt | self.llm | StrOutputParser()
+    
+    def _stream(self, espacio, texto, preparar):
+        """Eventos de streaming; `preparar()` da el prompt y su entrada si no hay caché"""
+        cacheada = self.cache.obtener(espacio, texto) if self.cache is not None else None
+        flujo = FlujoEventos(separar_articulos=espacio == "busqueda")
+        if cacheada is not None:
+            yield from flujo.procesar(cacheada)
+        else:
+            try:
+                prompt, entrada = preparar()
+                for fragmento in self._cadena_stream(prompt).stream(entrada):
+                    yield from flujo.procesar(fragmento)
+            except Exception as e:
+                # Con algo ya emitido no se puede cambiar de respuesta a mitad
+                cacheada = None if flujo.partes else self._respaldo_cache(espacio, texto, e)
+                if cacheada is None:
+                    raise
+                yield from flujo.procesar(cacheada)
+            else:
+                if self.cache is not None:
+                    self.cache.guardar(espacio, texto, flujo.texto)
+        for evento in flujo.finalizar():
+            self._registrar_fin(texto, evento)
+            yield evento
+    
+    async def _astream(self, espacio, texto, apreparar):
+        cacheada = self.cache.obtener(espacio, texto) if self.cache is not None else None
+        flujo = FlujoEventos(separar_articulos=espacio == "busqueda")
+        if cacheada is not None:
+            for evento in flujo.procesar(cacheada):
+                yield evento
+        else:
+            try:
+                prompt, entrada = await apreparar()
+                async with self.semaforo:
+                    async for fragmento in self._cadena_stream(prompt).astream(entrada):
+                        for evento in flujo.procesar(fragmento):
+                            yield evento
+            except Exception as e:
+                cacheada = None if flujo.partes else self._respaldo_cache(espacio, texto, e)
+                if cacheada is None:
+                    raise
+                for evento in flujo.procesar(cacheada):
+                    yield evento
+            else:
+                if self.cache is not None:
+                    await asyncio.to_thread(self.cache.guardar, espacio, texto, flujo.texto)
+        for evento in flujo.finalizar():
+            self._registrar_fin(texto, evento)
+            yield evento
+    
+    def stream_busqueda(self, tema):
+        """Eventos token/articulo/fin de una búsqueda a medida que se generan"""
+        return self._stream("busqueda", tema, lambda: (self.prompt_busqueda, {"tema": tema}))
+    
+    def stream_resumen(self, contenido):
+        """Eventos token/fin de un resumen; en map-reduce solo se transmite la combinación final"""
+        return self._stream("resumen", contenido, lambda: self._preparar_resumen(contenido))
+    
+    def astream_busqueda(self, tema):
+        async def apreparar():
+            return self.prompt_busqueda, {"tema": tema}
+        return self._astream("busqueda", tema, apreparar)
+    
+    def astream_resumen(self, contenido):
+        return self._astream("resumen", contenido, lambda: self._apreparar_resumen(contenido))
@@ -0,0 +1,103 @@
+# cache_http.py - ETags por versión de la memoria, 304 condicionales y cuerpos comprimidos
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Response
+
+import config
+import metricas
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional; sin él se usa gzip
+    brotli = None
+
+
+def _codificaciones_aceptadas(cabecera):
+    """Codificaciones de Accept-Encoding con q > 0"""
+    aceptadas = set()
+    for parte in cabecera.split(","):
+        nombre, *parametros = [p.strip() for p in parte.split(";")]
+        calidad = 1.0
+        for parametro in parametros:
+            if parametro.startswith("q="):
+                try:
+                    calidad = float(parametro[2:])
+                except ValueError:
+                    calidad = 0.0
+        if nombre and calidad > 0:
+            aceptadas.add(nombre.lower())
+    return aceptadas
+
+
+class RespuestasVersionadas:
+    """Caché de cuerpos JSON ya renderizados, indexada por ruta y versión de los datos.
+
+    Mientras la versión no cambie, cada petición reutiliza los bytes (y sus
+    variantes comprimidas) sin volver a serializar. El ETag es fuerte y
+    distinto por codificación, así que un `If-None-Match` que coincide se
+    responde con 304 sin cuerpo.
+    """
+
+    def __init__(self, max_entradas=None, umbral_compresion=None):
+        self.max_entradas = max_entradas or config.HTTP_CACHE_ENTRADAS
+        self.umbral_compresion = (umbral_compresion if umbral_compresion is not None
+                                  else config.HTTP_UMBRAL_COMPRESION)
+        # Las versiones empiezan en 0 en cada arranque: la época evita repetir ETags
+        self.epoca = format(time.time_ns(), "x")
+        self.bloqueo = threading.Lock()
+        # clave -> {"version", "etag", "cuerpos": {codificación: bytes}}
+        self.entradas = OrderedDict()
+
+    def _entrada(self, clave, version, generar):
+        with self.bloqueo:
+            entrada = self.entradas.get(clave)
+            if entrada is not None and entrada["version"] == version:
+                self.entradas.move_to_end(clave)
+                return entrada
+
+        contenido = generar()
+        with metricas.ETAPAS.cronometro(etapa="serializacion"):
+            cuerpo = json.dumps(contenido, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        resumen = hashlib.sha256(f"{clave}|{version}".encode("utf-8")).hexdigest()[:16]
+        entrada = {"version": version, "etag": f"{self.epoca}-{resumen}", "cuerpos": {"identity": cuerpo}}
+        with self.bloqueo:
+            self.entradas[clave] = entrada
+            self.entradas.move_to_end(clave)
+            while len(self.entradas) > self.max_entradas:
+                self.entradas.popitem(last=False)
+        return entrada
+
+    def _codificar(self, entrada, aceptadas):
+        """Elige la codificación y comprime una sola vez por versión"""
+        cuerpo = entrada["cuerpos"]["identity"]
+        if len(cuerpo) < self.umbral_compresion:
+            return "identity"
+        if brotli is not None and "br" in aceptadas:
+            codificacion, comprimir = "br", lambda datos: brotli.compress(datos, quality=5)
+        elif "gzip" in aceptadas:
+            codificacion, comprimir = "gzip", lambda datos: gzip.compress(datos, compresslevel=6)
+        else:
+            return "identity"
+        if codificacion not in entrada["cuerpos"]:
+            entrada["cuerpos"][codificacion] = comprimir(cuerpo)
+        return codificacion
+
+    def responder(self, request, clave, version, generar):
+        """Respuesta JSON para `clave` en `version`; `generar()` solo se llama si no está cacheada"""
+        entrada = self._entrada(clave, version, generar)
+        codificacion = self._codificar(entrada, _codificaciones_aceptadas(request.headers.get("accept-encoding", "")))
+        etag = f'"{entrada["etag"]}"' if codificacion == "identity" else f'"{entrada["etag"]}-{codificacion}"'
+        cabeceras = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+
+        condicion = request.headers.get("if-none-match")
+        if condicion and (condicion.strip() == "*" or etag in [e.strip() for e in condicion.split(",")]):
+            return Response(status_code=304, headers=cabeceras)
+
+        if codificacion != "identity":
+            cabeceras["Content-Encoding"] = codificacion
+        return Response(entrada["cuerpos"][codificacion], media_type="application/json", headers=cabeceras)
@@ -0,0 +1,283 @@
+# cache_respuestas.py - Caché de respuestas del LLM para búsquedas y resúmenes
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+
+import config
+from almacenamiento import temporal_junto
+
+
+def normalizar_texto(texto):
+    """Pliega mayúsculas, acentos y espacios para comparar entradas del prompt"""
+    if texto.isascii():
+        return re.sub(r"\s+", " ", texto.casefold()).strip()
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", sin_acentos.casefold()).strip()
+
+
+def trigramas(texto):
+    """Trigramas de caracteres de un texto ya normalizado"""
+    relleno = f"  {texto} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def similitud(a, b):
+    """Coeficiente de Jaccard entre dos conjuntos de trigramas"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class CacheRespuestas:
+    """Caché con TTL y expulsión LRU acotada, persistida en un archivo JSON.
+
+    El nivel exacto usa como clave el texto normalizado. El nivel por
+    similitud (opcional, solo en los espacios indicados) reutiliza una
+    respuesta cuando los trigramas del nuevo texto se parecen lo suficiente
+    a los de una entrada guardada.
+
+    Las entradas que guarda el precalentador llevan `origen`; sus aciertos
+    se cuentan aparte para saber qué parte de las consultas sirvió él.
+
+    Con `intervalo_escritura` > 0 los cambios solo marcan la caché como
+    pendiente y un hilo la vuelca cada intervalo, fuera del bloqueo.
+    """
+
+    def __init__(self, archivo=None, ttl=None, max_entradas=None, umbral_similitud=None,
+                 espacios_similitud=("busqueda",), gracia=None, intervalo_escritura=None):
+        self.archivo = archivo
+        self.intervalo_escritura = (intervalo_escritura if intervalo_escritura is not None
+                                    else config.CACHE_INTERVALO_ESCRITURA)
+        self.ttl = ttl if ttl is not None else config.CACHE_TTL
+        # Las entradas expiradas se conservan este tiempo para obtener_respaldo
+        self.gracia = gracia if gracia is not None else config.CACHE_GRACIA
+        self.max_entradas = max_entradas if max_entradas is not None else config.CACHE_MAX_ENTRADAS
+        self.umbral_similitud = (umbral_similitud if umbral_similitud is not None
+                                 else config.CACHE_UMBRAL_SIMILITUD)
+        self.espacios_similitud = set(espacios_similitud)
+        self.bloqueo = threading.Lock()
+        # clave -> {"espacio", "texto", "valor", "expira"[, "origen"]}
+        self.entradas = OrderedDict()
+        self._trigramas = {}
+        self.aciertos_exactos = 0
+        self.aciertos_similares = 0
+        self.fallos = 0
+        # (espacio, "acierto" | "precalentada" | "fallo") -> consultas
+        self.por_espacio = Counter()
+        # Serializa los volcados entre sí sin retener `bloqueo` mientras se escribe
+        self._bloqueo_volcado = threading.Lock()
+        self._pendiente = False
+        self._detener = threading.Event()
+        self._hilo = None
+        self.cargar()
+
+    # ---------- claves ----------
+    @staticmethod
+    def clave(espacio, texto_normalizado):
+        resumen = hashlib.sha256(texto_normalizado.encode("utf-8")).hexdigest()
+        return f"{espacio}:{resumen}"
+
+    def _usa_similitud(self, espacio):
+        return self.umbral_similitud > 0 and espacio in self.espacios_similitud
+
+    # ---------- consulta ----------
+    def obtener(self, espacio, texto):
+        """Retorna la respuesta cacheada o None"""
+        normalizado = normalizar_texto(texto)
+        clave = self.clave(espacio, normalizado)
+        ahora = time.time()
+        with self.bloqueo:
+            entrada = self.entradas.get(clave)
+            if entrada is not None and entrada["expira"] > ahora:
+                self.entradas.move_to_end(clave)
+                self.aciertos_exactos += 1
+                self._contar_acierto(espacio, entrada)
+                return entrada["valor"]
+            if entrada is not None and entrada["expira"] + self.gracia <= ahora:
+                self._quitar(clave)
+
+            if self._usa_similitud(espacio):
+                similar = self._buscar_similar(espacio, normalizado, ahora)
+                if similar is not None:
+                    self.entradas.move_to_end(similar)
+                    self.aciertos_similares += 1
+                    self._contar_acierto(espacio, self.entradas[similar])
+                    return self.entradas[similar]["valor"]
+
+            self.fallos += 1
+            self.por_espacio[espacio, "fallo"] += 1
+            return None
+
+    def _contar_acierto(self, espacio, entrada):
+        self.por_espacio[espacio, "precalentada" if entrada.get("origen") else "acierto"] += 1
+
+    def restante(self, espacio, texto):
+        """Segundos hasta que expira la entrada (negativo si ya expiró) o None si no está; no cuenta como consulta"""
+        clave = self.clave(espacio, normalizar_texto(texto))
+        with self.bloqueo:
+            entrada = self.entradas.get(clave)
+            return None if entrada is None else entrada["expira"] - time.time()
+
+    def obtener_respaldo(self, espacio, texto):
+        """Respuesta guardada aunque haya expirado (dentro de la gracia), o None.
+
+        Solo para cuando el LLM no responde: no cuenta como acierto ni fallo.
+        """
+        clave = self.clave(espacio, normalizar_texto(texto))
+        with self.bloqueo:
+            entrada = self.entradas.get(clave)
+            if entrada is None or entrada["expira"] + self.gracia <= time.time():
+                return None
+            return entrada["valor"]
+
+    def _buscar_similar(self, espacio, normalizado, ahora):
+        buscados = trigramas(normalizado)
+        mejor, mejor_puntaje = None, self.umbral_similitud
+        for clave, guardados in self._trigramas.items():
+            entrada = self.entradas[clave]
+            if entrada["espacio"] != espacio or entrada["expira"] <= ahora:
+                continue
+            puntaje = similitud(buscados, guardados)
+            if puntaje >= mejor_puntaje:
+                mejor, mejor_puntaje = clave, puntaje
+        return mejor
+
+    # ---------- escritura ----------
+    def guardar(self, espacio, texto, valor, origen=None):
+        """Guarda una respuesta y persiste la caché; `origen` marca las que no pidió un usuario"""
+        normalizado = normalizar_texto(texto)
+        clave = self.clave(espacio, normalizado)
+        with self.bloqueo:
+            self.entradas[clave] = {
+                "espacio": espacio,
+                # El texto solo hace falta para el nivel por similitud
+                "texto": normalizado if self._usa_similitud(espacio) else None,
+                "valor": valor,
+                "expira": time.time() + self.ttl
+            }
+            if origen:
+                self.entradas[clave]["origen"] = origen
+            self.entradas.move_to_end(clave)
+            if self._usa_similitud(espacio):
+                self._trigramas[clave] = trigramas(normalizado)
+            while len(self.entradas) > self.max_entradas:
+                self._quitar(next(iter(self.entradas)))
+            self._marcar()
+        if not self.intervalo_escritura:
+            self.vaciar()
+
+    def _quitar(self, clave):
+        self.entradas.pop(clave, None)
+        self._trigramas.pop(clave, None)
+
+    def limpiar(self):
+        """Vacía la caché y sus contadores"""
+        with self.bloqueo:
+            self.entradas.clear()
+            self._trigramas.clear()
+            self.aciertos_exactos = self.aciertos_similares = self.fallos = 0
+            self.por_espacio.clear()
+            self._marcar()
+        if not self.intervalo_escritura:
+            self.vaciar()
+
+    # ---------- persistencia ----------
+    def cargar(self):
+        """Carga las entradas vigentes o en gracia desde el archivo de caché"""
+        if not self.archivo or not os.path.exists(self.archivo):
+            return
+        try:
+            with open(self.archivo, 'r', encoding='utf-8') as f:
+                guardadas = json.load(f)
+        except Exception as e:
+            print(f"Error al cargar caché: {e}")
+            return
+        ahora = time.time()
+        for clave, entrada in guardadas.items():
+            if entrada["expira"] + self.gracia <= ahora:
+                continue
+            self.entradas[clave] = entrada
+            if entrada.get("texto") and self._usa_similitud(entrada["espacio"]):
+                self._trigramas[clave] = trigramas(entrada["texto"])
+        while len(self.entradas) > self.max_entradas:
+            self._quitar(next(iter(self.entradas)))
+
+    def _marcar(self):
+        """Deja la caché pendiente de volcar y arranca el hilo de escritura (requiere bloqueo)"""
+        if not self.archivo:
+            return
+        self._pendiente = True
+        if self.intervalo_escritura and self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name="escritura-cache", daemon=True)
+            self._hilo.start()
+            atexit.register(self.cerrar)
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo_escritura):
+            self.vaciar()
+
+    def vaciar(self):
+        """Escribe ya la caché si hay cambios pendientes"""
+        with self._bloqueo_volcado:
+            with self.bloqueo:
+                if not self._pendiente:
+                    return
+                # Las entradas no se modifican una vez guardadas: basta copiar el diccionario
+                copia = dict(self.entradas)
+                self._pendiente = False
+            if not self._persistir(copia):
+                with self.bloqueo:
+                    self._pendiente = True
+
+    def cerrar(self):
+        """Detiene el hilo de escritura y vuelca lo pendiente"""
+        self._detener.set()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(timeout=5)
+        self.vaciar()
+
+    def _persistir(self, entradas):
+        try:
+            # Con varios workers cada uno tiene su caché en memoria y el archivo
+            # queda con la última que se guardó; el temporal es propio de cada escritura
+            temporal = temporal_junto(self.archivo)
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(entradas, f, ensure_ascii=False)
+            os.replace(temporal, self.archivo)
+            return True
+        except Exception as e:
+            print(f"Error al guardar caché: {e}")
+            return False
+
+    # ---------- métricas ----------
+    def estadisticas(self):
+        """Contadores de aciertos y fallos"""
+        with self.bloqueo:
+            consultas = self.aciertos_exactos + self.aciertos_similares + self.fallos
+            aciertos = self.aciertos_exactos + self.aciertos_similares
+            return {
+                "entradas": len(self.entradas),
+                "aciertos_exactos": self.aciertos_exactos,
+                "aciertos_similares": self.aciertos_similares,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(aciertos / consultas, 4) if consultas else 0.0
+            }
+
+    def estadisticas_espacio(self, espacio):
+        """Consultas de un espacio por resultado: {"acierto", "precalentada", "fallo"}"""
+        with self.bloqueo:
+            return {resultado: self.por_espacio[espacio, resultado] for resultado in ("acierto", "precalentada", "fallo")}
+
+
+def crear_cache():
+    """Crea la caché configurada o None si está desactivada"""
+    if not config.CACHE_ACTIVA:
+        return None
+    return CacheRespuestas(config.CACHE_ARCHIVO)
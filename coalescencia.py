@@ -0,0 +1,94 @@
+# coalescencia.py - Coalescencia de llamadas idénticas concurrentes (single-flight)
+import asyncio
+import threading
+
+
+class _Vuelo:
+    """Llamada en curso compartida por todos los que piden la misma clave"""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class VueloUnico:
+    """Ejecuta una sola vez las llamadas concurrentes con la misma clave.
+
+    La primera petición (líder) ejecuta la función; las que llegan mientras
+    está en curso esperan y reciben el mismo resultado o la misma excepción.
+    """
+
+    def __init__(self):
+        self.bloqueo = threading.Lock()
+        self.en_vuelo = {}
+        self.llamadas = 0
+        self.coalescidas = 0
+
+    def ejecutar(self, clave, funcion):
+        with self.bloqueo:
+            vuelo = self.en_vuelo.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = self.en_vuelo[clave] = _Vuelo()
+                self.llamadas += 1
+            else:
+                self.coalescidas += 1
+
+        if not lider:
+            vuelo.evento.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.resultado
+
+        try:
+            vuelo.resultado = funcion()
+            return vuelo.resultado
+        except Exception as e:
+            vuelo.error = e
+            raise
+        finally:
+            with self.bloqueo:
+                del self.en_vuelo[clave]
+            vuelo.evento.set()
+
+    def estadisticas(self):
+        """Llamadas ejecutadas, coalescidas y en curso"""
+        with self.bloqueo:
+            return {
+                "llamadas": self.llamadas,
+                "coalescidas": self.coalescidas,
+                "en_vuelo": len(self.en_vuelo)
+            }
+
+
+class VueloUnicoAsync:
+    """Versión asyncio de VueloUnico para los manejadores async de la API.
+
+    La llamada del líder corre como tarea propia, así que si su cliente se
+    desconecta el resto sigue esperando el mismo resultado.
+    """
+
+    def __init__(self):
+        self.en_vuelo = {}
+        self.llamadas = 0
+        self.coalescidas = 0
+
+    async def ejecutar(self, clave, funcion):
+        tarea = self.en_vuelo.get(clave)
+        if tarea is None:
+            self.llamadas += 1
+            tarea = asyncio.ensure_future(funcion())
+            self.en_vuelo[clave] = tarea
+            tarea.add_done_callback(lambda _: self.en_vuelo.pop(clave, None))
+        else:
+            self.coalescidas += 1
+        return await asyncio.shield(tarea)
+
+    def estadisticas(self):
+        """Llamadas ejecutadas, coalescidas y en curso"""
+        return {
+            "llamadas": self.llamadas,
+            "coalescidas": self.coalescidas,
+            "en_vuelo": len(self.en_vuelo)
+        }
@@ -0,0 +1,285 @@
+# coleccion.py - Artículos en columnas compactas: ids y fechas en arrays, etiquetas internadas y textos en una arena
+import bisect
+import sys
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from json.encoder import encode_basestring
+from operator import itemgetter
+
+EPOCA = datetime(1970, 1, 1)
+UN_SEGUNDO = timedelta(seconds=1)
+# Por artículo, 4 desplazamientos en la arena: título, resumen, url y fin (-1 si la url es None)
+CAMPOS_TEXTO = 4
+
+
+def a_segundos(fecha):
+    """"YYYY-MM-DD HH:MM:SS" (o una fecha ISO) a segundos desde 1970, sin zona horaria, como se guarda"""
+    return (datetime.fromisoformat(fecha) - EPOCA) // UN_SEGUNDO
+
+
+def a_fecha(segundos):
+    return (EPOCA + timedelta(seconds=segundos)).isoformat(" ")
+
+
+class _Columnas:
+    """Estado de la colección. Las altas solo añaden al final (el id el último);
+    las bajas y la compactación crean unas columnas nuevas, así quien esté
+    recorriendo las anteriores no ve cambiar sus posiciones."""
+
+    __slots__ = ("ids", "fechas", "textos", "arena", "etiquetas", "inicio_etiquetas", "num_etiquetas", "basura",
+                 "fechas_ordenadas")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.fechas = array("q")
+        self.textos = array("q")
+        self.arena = bytearray()
+        self.etiquetas = array("I")
+        self.inicio_etiquetas = array("q")
+        self.num_etiquetas = array("H")
+        # Bytes de la arena de artículos ya borrados
+        self.basura = 0
+        # Si las fechas no decrecen con el id se puede hacer bisect sobre ellas
+        self.fechas_ordenadas = True
+
+
+class ColeccionArticulos(Sequence):
+    """Secuencia de artículos ordenada por id con una fracción de la memoria de una lista de dicts.
+
+    Cada artículo ocupa unas decenas de bytes en arrays más sus textos en
+    UTF-8 dentro de una única arena; las etiquetas son índices a una tabla
+    de nombres internados. Al leer un artículo (índice, iteración, `obtener`)
+    se materializa un dict nuevo con la forma de siempre (id, fecha_guardado,
+    titulo, resumen, etiquetas, url), que es lo que reciben la API y los
+    índices. Las fechas se normalizan a "YYYY-MM-DD HH:MM:SS".
+    """
+
+    def __init__(self, articulos=()):
+        self._limite = None
+        self.nombres = []
+        self._id_nombre = {}
+        self._c = self._construir(articulos)
+
+    def instantanea(self):
+        """Vista de solo lectura del estado actual, para serializar fuera del bloqueo"""
+        vista = ColeccionArticulos.__new__(ColeccionArticulos)
+        vista._c, vista._limite = self._c, len(self)
+        vista.nombres, vista._id_nombre = self.nombres, self._id_nombre
+        return vista
+
+    # ==================== ESCRITURA ====================
+    def _id_etiqueta(self, nombre):
+        id_etiqueta = self._id_nombre.get(nombre)
+        if id_etiqueta is None:
+            # La tabla solo crece: las vistas y los recorridos en curso la comparten
+            id_etiqueta = self._id_nombre[nombre] = len(self.nombres)
+            self.nombres.append(sys.intern(nombre))
+        return id_etiqueta
+
+    def _anexar(self, c, articulo):
+        inicio = len(c.arena)
+        titulo = articulo["titulo"].encode()
+        resumen = articulo["resumen"].encode()
+        url = articulo.get("url")
+        c.arena += titulo
+        c.arena += resumen
+        if url is not None:
+            c.arena += url.encode()
+        fin_resumen = inicio + len(titulo) + len(resumen)
+        c.textos.extend((inicio, inicio + len(titulo), fin_resumen, len(c.arena) if url is not None else -1))
+        etiquetas = [self._id_etiqueta(nombre) for nombre in articulo["etiquetas"]]
+        c.inicio_etiquetas.append(len(c.etiquetas))
+        c.num_etiquetas.append(len(etiquetas))
+        c.etiquetas.extend(etiquetas)
+        fecha = a_segundos(articulo["fecha_guardado"])
+        if c.fechas and fecha < c.fechas[-1]:
+            c.fechas_ordenadas = False
+        c.fechas.append(fecha)
+        # El id va el último: len(ids) solo cuenta artículos completos
+        c.ids.append(articulo["id"])
+
+    def agregar(self, articulo):
+        """Añade un artículo (dict); si su id no es el mayor se inserta en orden"""
+        if self._limite is not None:
+            raise TypeError("Una instantánea de la colección es de solo lectura")
+        c = self._c
+        if not c.ids or articulo["id"] > c.ids[-1]:
+            self._anexar(c, articulo)
+            return
+        self._c = self._construir(list(self) + [articulo])
+
+    def eliminar(self, id_articulo):
+        """Quita un artículo por id; retorna False si no estaba"""
+        if self._limite is not None:
+            raise TypeError("Una instantánea de la colección es de solo lectura")
+        c = self._c
+        posicion = self.posicion(id_articulo)
+        if posicion is None:
+            return False
+        nuevas = _Columnas()
+        nuevas.arena = c.arena
+        nuevas.etiquetas = c.etiquetas
+        siguiente = posicion + 1
+        for nombre in ("ids", "fechas", "inicio_etiquetas", "num_etiquetas"):
+            columna = getattr(c, nombre)
+            setattr(nuevas, nombre, columna[:posicion] + columna[siguiente:])
+        nuevas.textos = c.textos[:CAMPOS_TEXTO * posicion] + c.textos[CAMPOS_TEXTO * siguiente:]
+        inicio, _, fin_resumen, fin = c.textos[CAMPOS_TEXTO * posicion:CAMPOS_TEXTO * siguiente]
+        nuevas.fechas_ordenadas = c.fechas_ordenadas
+        nuevas.basura = c.basura + (fin if fin >= 0 else fin_resumen) - inicio
+        # La arena vieja se recupera cuando más de la mitad es de artículos borrados
+        if nuevas.basura * 2 > len(nuevas.arena):
+            nuevas = self._construir(self._articulos(nuevas, len(nuevas.ids)))
+        self._c = nuevas
+        return True
+
+    def _construir(self, articulos):
+        """Columnas de muchos artículos a la vez (al cargar o compactar), sin pasar por `_anexar`"""
+        articulos = sorted(articulos, key=itemgetter("id"))
+        c = _Columnas()
+        textos = []
+        partes = []
+        fin = 0
+        for articulo in articulos:
+            titulo = articulo["titulo"].encode()
+            resumen = articulo["resumen"].encode()
+            url = articulo.get("url")
+            url = url.encode() if url is not None else None
+            inicio, fin_titulo = fin, fin + len(titulo)
+            fin_resumen = fin_titulo + len(resumen)
+            fin = fin_resumen + len(url) if url is not None else fin_resumen
+            textos += (inicio, fin_titulo, fin_resumen, fin if url is not None else -1)
+            partes += (titulo, resumen, url) if url is not None else (titulo, resumen)
+        c.arena = bytearray(b"".join(partes))
+        c.textos = array("q", textos)
+        id_etiqueta = self._id_etiqueta
+        etiquetas = [[id_etiqueta(nombre) for nombre in articulo["etiquetas"]] for articulo in articulos]
+        c.num_etiquetas = array("H", map(len, etiquetas))
+        inicios, total = [], 0
+        for cantidad in c.num_etiquetas:
+            inicios.append(total)
+            total += cantidad
+        c.inicio_etiquetas = array("q", inicios)
+        c.etiquetas = array("I", [i for ids in etiquetas for i in ids])
+        c.fechas = array("q", [a_segundos(articulo["fecha_guardado"]) for articulo in articulos])
+        c.fechas_ordenadas = all(a <= b for a, b in zip(c.fechas, c.fechas[1:]))
+        c.ids = array("q", map(itemgetter("id"), articulos))
+        return c
+
+    # ==================== LECTURA ====================
+    def __len__(self):
+        return len(self._c.ids) if self._limite is None else self._limite
+
+    def _articulo(self, c, posicion):
+        titulo, resumen, url, fin = c.textos[CAMPOS_TEXTO * posicion:CAMPOS_TEXTO * (posicion + 1)]
+        arena = c.arena
+        inicio = c.inicio_etiquetas[posicion]
+        nombres = self.nombres
+        return {
+            "id": c.ids[posicion],
+            "fecha_guardado": a_fecha(c.fechas[posicion]),
+            "titulo": arena[titulo:resumen].decode(),
+            "resumen": arena[resumen:url].decode(),
+            "etiquetas": [nombres[i] for i in c.etiquetas[inicio:inicio + c.num_etiquetas[posicion]]],
+            "url": arena[url:fin].decode() if fin >= 0 else None
+        }
+
+    def _articulos(self, c, total):
+        for posicion in range(total):
+            yield self._articulo(c, posicion)
+
+    def etiquetas_por_articulo(self):
+        """{"id", "etiquetas"} de cada artículo, sin decodificar textos (para el registro de etiquetas)"""
+        c = self._c
+        nombres = self.nombres
+        for posicion in range(len(self)):
+            inicio = c.inicio_etiquetas[posicion]
+            yield {"id": c.ids[posicion],
+                   "etiquetas": [nombres[i] for i in c.etiquetas[inicio:inicio + c.num_etiquetas[posicion]]]}
+
+    def __getitem__(self, posicion):
+        if isinstance(posicion, slice):
+            return [self[p] for p in range(*posicion.indices(len(self)))]
+        total = len(self)
+        if posicion < 0:
+            posicion += total
+        if not 0 <= posicion < total:
+            raise IndexError("posición fuera de la colección")
+        return self._articulo(self._c, posicion)
+
+    def __iter__(self):
+        # Se fijan las columnas y el total al empezar: es seguro aunque otro hilo escriba
+        c = self._c
+        return self._articulos(c, len(c.ids) if self._limite is None else self._limite)
+
+    def textos_json(self, indent=None, nivel=0):
+        """El JSON de cada artículo, igual que json.dumps(articulo, indent=indent, ensure_ascii=False)
+        sangrado para ir `nivel` niveles dentro, sin materializar los dicts (para guardar la memoria)"""
+        c = self._c
+        arena, nombres = c.arena, self.nombres
+        if indent:
+            sangria = " " * indent
+            clave = ",\n" + sangria * (nivel + 1)
+            apertura, cierre = "{\n" + sangria * (nivel + 1), "\n" + sangria * nivel + "}"
+            apertura_etiquetas = "[\n" + sangria * (nivel + 2)
+            separador_etiquetas = ",\n" + sangria * (nivel + 2)
+            cierre_etiquetas = "\n" + sangria * (nivel + 1) + "]"
+        else:
+            clave, apertura, cierre = ", ", "{", "}"
+            apertura_etiquetas, separador_etiquetas, cierre_etiquetas = "[", ", ", "]"
+        for posicion in range(len(self)):
+            titulo, resumen, url, fin = c.textos[CAMPOS_TEXTO * posicion:CAMPOS_TEXTO * (posicion + 1)]
+            inicio = c.inicio_etiquetas[posicion]
+            etiquetas = c.etiquetas[inicio:inicio + c.num_etiquetas[posicion]]
+            etiquetas = (apertura_etiquetas + separador_etiquetas.join(encode_basestring(nombres[i]) for i in etiquetas)
+                         + cierre_etiquetas) if etiquetas else "[]"
+            yield "".join((
+                apertura, '"id": ', str(c.ids[posicion]),
+                clave, '"fecha_guardado": ', encode_basestring(a_fecha(c.fechas[posicion])),
+                clave, '"titulo": ', encode_basestring(arena[titulo:resumen].decode()),
+                clave, '"resumen": ', encode_basestring(arena[resumen:url].decode()),
+                clave, '"etiquetas": ', etiquetas,
+                clave, '"url": ', encode_basestring(arena[url:fin].decode()) if fin >= 0 else "null",
+                cierre))
+
+    @property
+    def ids(self):
+        """Ids en orden (array de solo lectura: no lo modifiques)"""
+        c = self._c
+        return c.ids if self._limite is None else c.ids[:self._limite]
+
+    def ultimo_id(self):
+        ids = self.ids
+        return ids[-1] if ids else 0
+
+    def posicion(self, id_articulo):
+        """Posición del artículo con ese id o None"""
+        ids = self.ids
+        posicion = bisect.bisect_left(ids, id_articulo)
+        if posicion < len(ids) and ids[posicion] == id_articulo:
+            return posicion
+        return None
+
+    def obtener(self, id_articulo):
+        """Artículo por id (dict) o None"""
+        posicion = self.posicion(id_articulo)
+        return None if posicion is None else self[posicion]
+
+    def posicion_id(self, id_articulo, despues=False):
+        """Primera posición con id >= (o > si `despues`) que el dado"""
+        return (bisect.bisect_right if despues else bisect.bisect_left)(self.ids, id_articulo)
+
+    @property
+    def fechas_ordenadas(self):
+        """True si las fechas crecen con el id (lo normal); si no, posicion_fecha no sirve"""
+        return self._c.fechas_ordenadas
+
+    def posicion_fecha(self, fecha):
+        """Primera posición guardada en o después de `fecha` (texto ISO); requiere fechas_ordenadas"""
+        fechas = self._c.fechas
+        return min(bisect.bisect_left(fechas, a_segundos(fecha)), len(self))
+
+    def segundos(self, posicion):
+        """fecha_guardado de una posición en segundos, sin materializar el artículo"""
+        return self._c.fechas[posicion]
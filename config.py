@@ -0,0 +1,139 @@
+# config.py - Configuración compartida del Agente Curador (variables de entorno)
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ==================== MEMORIA ====================
+ARCHIVO_MEMORIA = os.getenv("CURADOR_ARCHIVO_MEMORIA", "curator_memory.json")
+
+# Motor de almacenamiento: "json" (reescritura completa), "diario" (append-only)
+# o "sqlite" (base de datos indexada en ARCHIVO_SQLITE)
+ALMACENAMIENTO = os.getenv("CURADOR_ALMACENAMIENTO", "json")
+ARCHIVO_SQLITE = os.getenv("CURADOR_ARCHIVO_SQLITE", "curator_memory.db")
+
+# Diario: fsync por lotes y compactación en segundo plano
+DIARIO_INTERVALO_FSYNC = float(os.getenv("CURADOR_DIARIO_INTERVALO_FSYNC", "0.05"))
+DIARIO_LOTE_FSYNC = int(os.getenv("CURADOR_DIARIO_LOTE_FSYNC", "64"))
+DIARIO_UMBRAL_COMPACTACION = int(os.getenv("CURADOR_DIARIO_UMBRAL_COMPACTACION", "10000"))
+DIARIO_INTERVALO_COMPACTACION = float(os.getenv("CURADOR_DIARIO_INTERVALO_COMPACTACION", "300"))
+
+# JSON: escritura diferida; las mutaciones se agrupan y se vuelcan cada
+# intervalo (segundos) o al llegar al lote. 0 escribe en cada mutación
+JSON_INTERVALO_ESCRITURA = float(os.getenv("CURADOR_JSON_INTERVALO_ESCRITURA", "1"))
+JSON_LOTE_ESCRITURA = int(os.getenv("CURADOR_JSON_LOTE_ESCRITURA", "200"))
+
+# Respaldos rotativos de la memoria (archivo.respaldo.1 es el más reciente);
+# se rota como mucho una vez por intervalo. 0 respaldos los desactiva
+MEMORIA_RESPALDOS = int(os.getenv("CURADOR_MEMORIA_RESPALDOS", "3"))
+MEMORIA_INTERVALO_RESPALDO = float(os.getenv("CURADOR_MEMORIA_INTERVALO_RESPALDO", "3600"))
+
+# Con varios workers (uvicorn --workers N) cada proceso incorpora cada tanto
+# lo que escribieron los demás; las escrituras se serializan con flock
+MEMORIA_INTERVALO_REFRESCO = float(os.getenv("CURADOR_MEMORIA_INTERVALO_REFRESCO", "1"))
+
+# ==================== CACHÉ DE RESPUESTAS ====================
+CACHE_ACTIVA = os.getenv("CURADOR_CACHE", "1") == "1"
+CACHE_ARCHIVO = os.getenv("CURADOR_CACHE_ARCHIVO", "curator_cache.json")
+CACHE_TTL = float(os.getenv("CURADOR_CACHE_TTL", "86400"))
+CACHE_MAX_ENTRADAS = int(os.getenv("CURADOR_CACHE_MAX_ENTRADAS", "1000"))
+# 0 desactiva el nivel por similitud; p. ej. 0.8 reutiliza temas casi iguales
+CACHE_UMBRAL_SIMILITUD = float(os.getenv("CURADOR_CACHE_UMBRAL_SIMILITUD", "0"))
+# Segundos tras expirar en que una respuesta aún sirve de respaldo si el LLM falla
+CACHE_GRACIA = float(os.getenv("CURADOR_CACHE_GRACIA", str(7 * 86400)))
+# Cada cuántos segundos se vuelca la caché al archivo si cambió (0 = en cada cambio)
+CACHE_INTERVALO_ESCRITURA = float(os.getenv("CURADOR_CACHE_INTERVALO_ESCRITURA", "1"))
+
+# ==================== LLM ====================
+LLM_MODELO = os.getenv("CURADOR_LLM_MODELO", "gemini-2.5-flash")
+LLM_TEMPERATURA = float(os.getenv("CURADOR_LLM_TEMPERATURA", "0.7"))
+# Máximo de llamadas async simultáneas al LLM desde la API
+LLM_CONCURRENCIA_MAX = int(os.getenv("CURADOR_LLM_CONCURRENCIA_MAX", "64"))
+# Documentos resumidos en paralelo por /resumir/lote si la petición no indica otro valor
+LOTE_CONCURRENCIA_MAX = int(os.getenv("CURADOR_LOTE_CONCURRENCIA_MAX", "8"))
+# Modelo más barato al que se recurre si el principal no responde; vacío lo desactiva
+LLM_MODELO_RESPALDO = os.getenv("CURADOR_LLM_MODELO_RESPALDO", "")
+
+# ==================== RESILIENCIA DEL LLM ====================
+# Plazo total de cada llamada, reintentos incluidos (segundos)
+LLM_PLAZO = float(os.getenv("CURADOR_LLM_PLAZO", "120"))
+LLM_INTENTOS = int(os.getenv("CURADOR_LLM_INTENTOS", "3"))
+# Backoff exponencial con jitter: espera aleatoria hasta base * 2^intento, sin pasar del máximo
+LLM_ESPERA_BASE = float(os.getenv("CURADOR_LLM_ESPERA_BASE", "0.5"))
+LLM_ESPERA_MAXIMA = float(os.getenv("CURADOR_LLM_ESPERA_MAXIMA", "8"))
+# El circuito se abre si falla al menos UMBRAL de las últimas VENTANA llamadas (mínimo MINIMO)
+LLM_CIRCUITO_VENTANA = int(os.getenv("CURADOR_LLM_CIRCUITO_VENTANA", "20"))
+LLM_CIRCUITO_MINIMO = int(os.getenv("CURADOR_LLM_CIRCUITO_MINIMO", "5"))
+LLM_CIRCUITO_UMBRAL = float(os.getenv("CURADOR_LLM_CIRCUITO_UMBRAL", "0.5"))
+# Segundos abierto antes de dejar pasar una llamada de prueba
+LLM_CIRCUITO_ESPERA = float(os.getenv("CURADOR_LLM_CIRCUITO_ESPERA", "30"))
+
+# ==================== RESUMEN MAP-REDUCE ====================
+# Por encima de este tamaño estimado (tokens) /resumir divide el contenido en fragmentos
+RESUMEN_UMBRAL_TOKENS = int(os.getenv("CURADOR_RESUMEN_UMBRAL_TOKENS", "6000"))
+RESUMEN_TOKENS_FRAGMENTO = int(os.getenv("CURADOR_RESUMEN_TOKENS_FRAGMENTO", "2000"))
+
+# ==================== ÍNDICE VECTORIAL ====================
+# Matriz de vectores (memmap de NumPy); junto a ella se guardan .ids.npy y .json
+VECTORES_ARCHIVO = os.getenv("CURADOR_VECTORES_ARCHIVO", "curator_vectores.npy")
+# Modelo local de sentence-transformers (p. ej. "paraphrase-multilingual-MiniLM-L12-v2");
+# vacío usa TF-IDF con hashing, sin dependencias extra
+VECTORES_MODELO = os.getenv("CURADOR_VECTORES_MODELO", "")
+VECTORES_DIMENSION = int(os.getenv("CURADOR_VECTORES_DIMENSION", "512"))
+# Segundos entre volcados del memmap y sus metadatos a disco, y siempre al apagar (0 = tras cada lote)
+VECTORES_INTERVALO_VOLCADO = float(os.getenv("CURADOR_VECTORES_INTERVALO_VOLCADO", "5"))
+
+# ==================== RESPUESTAS HTTP ====================
+# Cuerpos renderizados que se conservan por ruta y versión de la memoria
+HTTP_CACHE_ENTRADAS = int(os.getenv("CURADOR_HTTP_CACHE_ENTRADAS", "256"))
+# Bytes a partir de los cuales se comprime con brotli (si está instalado) o gzip
+HTTP_UMBRAL_COMPRESION = int(os.getenv("CURADOR_HTTP_UMBRAL_COMPRESION", "1024"))
+
+# ==================== MÉTRICAS ====================
+# Histogramas y contadores expuestos en /metrics (formato de Prometheus)
+METRICAS_ACTIVAS = os.getenv("CURADOR_METRICAS", "1") == "1"
+# Perfilador por muestreo de pilas: arranca encendido si vale 1; se conmuta en POST /metrics/perfil
+PERFILADOR_ACTIVO = os.getenv("CURADOR_PERFILADOR", "0") == "1"
+PERFILADOR_INTERVALO = float(os.getenv("CURADOR_PERFILADOR_INTERVALO", "0.01"))
+
+# ==================== EXPORTACIÓN ====================
+# Artículos que se leen de la memoria por página al exportar
+EXPORTAR_LOTE = int(os.getenv("CURADOR_EXPORTAR_LOTE", "1000"))
+# Bytes que se acumulan antes de cada escritura o trozo de la respuesta HTTP
+EXPORTAR_TAMANO_TROZO = int(os.getenv("CURADOR_EXPORTAR_TAMANO_TROZO", "65536"))
+
+# ==================== IMPORTACIÓN ====================
+# Artículos que se guardan por lote al importar: una escritura de la memoria por lote
+IMPORTAR_LOTE = int(os.getenv("CURADOR_IMPORTAR_LOTE", "1000"))
+# Líneas rechazadas de las que se informa el motivo (el resto solo se cuentan)
+IMPORTAR_MAX_ERRORES = int(os.getenv("CURADOR_IMPORTAR_MAX_ERRORES", "20"))
+# Bytes del cuerpo de POST /articulos/lote que se guardan en memoria antes de pasar a un temporal en disco
+IMPORTAR_MEMORIA_CUERPO = int(os.getenv("CURADOR_IMPORTAR_MEMORIA_CUERPO", "1048576"))
+
+# ==================== HISTORIAL ====================
+# Búsquedas que se conservan una a una; al pasar de aquí se podan las más antiguas (0 = sin límite)
+HISTORIAL_MAX_ENTRADAS = int(os.getenv("CURADOR_HISTORIAL_MAX_ENTRADAS", "1000"))
+# Días que se conserva cada búsqueda suelta (0 = sin límite). Al activarlo en una
+# memoria existente se podan de una vez las más antiguas; las tendencias no cambian
+HISTORIAL_MAX_DIAS = int(os.getenv("CURADOR_HISTORIAL_MAX_DIAS", "0"))
+# Días que conserva el resumen diario (0 = sin límite); por defecto, la ventana más
+# larga que acepta /historial/tendencias
+HISTORIAL_RESUMEN_DIAS = int(os.getenv("CURADOR_HISTORIAL_RESUMEN_DIAS", "3660"))
+# Fracción de HISTORIAL_MAX_ENTRADAS que se poda de una vez, para no escribir una poda por búsqueda
+HISTORIAL_HOLGURA = float(os.getenv("CURADOR_HISTORIAL_HOLGURA", "0.1"))
+
+# ==================== PRECALENTADOR ====================
+# Precalcula en segundo plano las búsquedas más probables según el historial
+# (gasta llamadas al LLM sin que nadie las pida: desactivado por defecto)
+PRECALENTADOR_ACTIVO = os.getenv("CURADOR_PRECALENTADOR", "0") == "1"
+# Temas que se mantienen calientes en la caché
+PRECALENTADOR_TEMAS = int(os.getenv("CURADOR_PRECALENTADOR_TEMAS", "20"))
+# Presupuesto: llamadas al LLM del precalentador por hora (ventana deslizante)
+PRECALENTADOR_LLAMADAS_HORA = int(os.getenv("CURADOR_PRECALENTADOR_LLAMADAS_HORA", "30"))
+# Segundos entre pasadas; en cada una solo se llama al LLM si no hay peticiones ni llamadas en curso
+PRECALENTADOR_INTERVALO = float(os.getenv("CURADOR_PRECALENTADOR_INTERVALO", "60"))
+# Una entrada se renueva si le quedan menos de estos segundos para expirar
+PRECALENTADOR_ANTELACION = float(os.getenv("CURADOR_PRECALENTADOR_ANTELACION", "3600"))
+# Días del historial que se miran y horas en que el peso de una búsqueda se reduce a la mitad
+PRECALENTADOR_VENTANA_DIAS = int(os.getenv("CURADOR_PRECALENTADOR_VENTANA_DIAS", "30"))
+PRECALENTADOR_VIDA_MEDIA = float(os.getenv("CURADOR_PRECALENTADOR_VIDA_MEDIA", "72"))
@@ -1,12 +1,11 @@
 # Agente Curador de Artículos Técnicos con Memoria Persistente
 import os
-import json
-from datetime import datetime
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
-from langchain.memory import ConversationBufferMemory
 from dotenv import load_dotenv
+from memoria import crear_memoria
+from buscador import HerramientaBuscador
+from cache_respuestas import crear_cache
+import exportador
+import importador
 
 # Carga variables de entorno
 load_dotenv()
@@ -16,156 +15,6 @@ if 'GOOGLE_API_KEY' not in os.environ:
     print("Error: La variable de entorno 'GOOGLE_API_KEY' no está configurada.")
     exit()
 
-class MemoriaPersistente:
-    """Herramienta de memoria persistente en JSON"""
-    
-    def __init__(self, archivo="curator_memory.json"):
-        self.archivo = archivo
-        self.datos = self.cargar_memoria()
-    
-    def cargar_memoria(self):
-        """Carga la memoria desde archivo JSON"""
-        if os.path.exists(self.archivo):
-            try:
-                with open(self.archivo, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error al cargar memoria: {e}")
-                return self.estructura_inicial()
-        return self.estructura_inicial()
-    
-    def estructura_inicial(self):
-        """Estructura inicial de la memoria"""
-        return {
-            "historial_busquedas": [],
-            "articulos_guardados": [],
-            "etiquetas": [],
-            "preferencias": {
-                "temas_favoritos": [],
-                "idioma_preferido": "español"
-            },
-            "estadisticas": {
-                "total_busquedas": 0,
-                "total_articulos_guardados": 0
-            }
-        }
-    
-    def guardar_memoria(self):
-        """Guarda la memoria en archivo JSON"""
-        try:
-            with open(self.archivo, 'w', encoding='utf-8') as f:
-                json.dump(self.datos, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            print(f"Error al guardar memoria: {e}")
-            return False
-    
-    def agregar_busqueda(self, query, resultados):
-        """Registra una búsqueda en el historial"""
-        busqueda = {
-            "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "query": query,
-            "num_resultados": resultados
-        }
-        self.datos["historial_busquedas"].append(busqueda)
-        self.datos["estadisticas"]["total_busquedas"] += 1
-        self.guardar_memoria()
-    
-    def guardar_articulo(self, titulo, resumen, etiquetas, url=None):
-        """Guarda un artículo en la colección"""
-        articulo = {
-            "id": len(self.datos["articulos_guardados"]) + 1,
-            "fecha_guardado": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "titulo": titulo,
-            "resumen": resumen,
-            "etiquetas": etiquetas,
-            "url": url
-        }
-        self.datos["articulos_guardados"].append(articulo)
-        self.datos["estadisticas"]["total_articulos_guardados"] += 1
-        
-        # Actualizar lista de etiquetas únicas
-        for etiqueta in etiquetas:
-            if etiqueta not in self.datos["etiquetas"]:
-                self.datos["etiquetas"].append(etiqueta)
-        
-        self.guardar_memoria()
-        return articulo["id"]
-    
-    def obtener_estadisticas(self):
-        """Retorna estadísticas de uso"""
-        return self.datos["estadisticas"]
-    
-    def buscar_por_etiqueta(self, etiqueta):
-        """Busca artículos por etiqueta"""
-        return [art for art in self.datos["articulos_guardados"] 
-                if etiqueta.lower() in [e.lower() for e in art["etiquetas"]]]
-
-class HerramientaBuscador:
-    """Herramienta de búsqueda y análisis de contenido técnico"""
-    
-    def __init__(self, llm):
-        self.llm = llm
-        self.prompt_busqueda = PromptTemplate(
-            input_variables=["tema"],
-            template="""Eres un experto curador de contenido técnico. 
-            
-Genera una lista de 5 artículos técnicos recomendados sobre: {tema}
-
-Para cada artículo proporciona:
-- Título sugerido
-- Breve descripción (2-3 líneas)
-- Conceptos clave
-- Nivel de dificultad (Principiante/Intermedio/Avanzado)
-- 2-3 etiquetas relevantes
-
-Formato de respuesta:
-ARTÍCULO 1:
-Título: [título]
-Descripción: [descripción]
-Conceptos: [conceptos separados por comas]
-Nivel: [nivel]
-Etiquetas: [etiquetas separadas por comas]
-
-[Repite para los 5 artículos]"""
-        )
-        
-        self.prompt_resumen = PromptTemplate(
-            input_variables=["contenido"],
-            template="""Analiza el siguiente contenido técnico y genera un resumen estructurado:
-
-CONTENIDO:
-{contenido}
-
-Proporciona:
-1. Resumen ejecutivo (3-4 líneas)
-2. Puntos clave (máximo 5 puntos)
-3. Tecnologías mencionadas
-4. Público objetivo
-5. 3-5 etiquetas descriptivas
-
-Formato estructurado y claro."""
-        )
-        
-        self.chain_busqueda = LLMChain(llm=self.llm, prompt=self.prompt_busqueda)
-        self.chain_resumen = LLMChain(llm=self.llm, prompt=self.prompt_resumen)
-    
-    def buscar_articulos(self, tema):
-        """Busca artículos sobre un tema"""
-        try:
-            respuesta = self.chain_busqueda.invoke({"tema": tema})
-            return respuesta["text"]
-        except Exception as e:
-            return f"Error en búsqueda: {str(e)}"
-    
-    def resumir_contenido(self, contenido):
-        """Genera resumen de contenido"""
-        try:
-            respuesta = self.chain_resumen.invoke({"contenido": contenido})
-            return respuesta["text"]
-        except Exception as e:
-            return f"Error al resumir: {str(e)}"
-
 class HerramientaExportador:
     """Herramienta para exportar colecciones en diferentes formatos"""
     
@@ -174,40 +23,45 @@ class HerramientaExportador:
         """Exporta artículos a formato Markdown"""
         try:
             with open(nombre_archivo, 'w', encoding='utf-8') as f:
-                f.write("# Mi Colección de Artículos Técnicos\n\n")
-                f.write(f"*Generado el {datetime.now().strftime('%Y-%m-%d')}*\n\n")
-                f.write("---\n\n")
-                
-                for art in articulos:
-                    f.write(f"## {art['titulo']}\n\n")
-                    f.write(f"**ID:** {art['id']} | **Guardado:** {art['fecha_guardado']}\n\n")
-                    if art.get('url'):
-                        f.write(f"**URL:** {art['url']}\n\n")
-                    f.write(f"### Resumen\n\n{art['resumen']}\n\n")
-                    f.write(f"**Etiquetas:** {', '.join(art['etiquetas'])}\n\n")
-                    f.write("---\n\n")
+                for trozo in exportador.trozos(exportador.lineas_markdown(articulos)):
+                    f.write(trozo)
             
             return True, nombre_archivo
         except Exception as e:
             return False, str(e)
+    
+    @staticmethod
+    def exportar(memoria, formato="markdown", nombre_archivo=None, incremental=False, **filtros):
+        """Exporta la colección leyéndola por páginas; incremental, solo lo guardado desde la última vez"""
+        nombre_archivo = nombre_archivo or "coleccion_articulos" + exportador.FORMATOS[formato][2]
+        try:
+            escritos = exportador.exportar_archivo(memoria, nombre_archivo, formato,
+                                                   incremental=incremental, **filtros)
+            return True, nombre_archivo, escritos
+        except Exception as e:
+            return False, str(e), 0
 
 class AgenteCurador:
     """Agente principal que integra todas las herramientas"""
     
     def __init__(self):
-        # Inicialización del modelo LLM
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            temperature=0.7
-        )
-        
-        # Inicialización de herramientas
-        self.memoria = MemoriaPersistente()
-        self.buscador = HerramientaBuscador(self.llm)
+        # Inicialización de herramientas; el LLM se crea con la primera búsqueda o resumen
+        self.memoria = crear_memoria()
+        self.buscador = HerramientaBuscador(cache=crear_cache())
         self.exportador = HerramientaExportador()
-        
-        # Memoria conversacional
-        self.memoria_conversacion = ConversationBufferMemory()
+        self._memoria_conversacion = None
+
+    @property
+    def llm(self):
+        return self.buscador.llm
+
+    @property
+    def memoria_conversacion(self):
+        """Memoria conversacional (LangChain se importa al pedirla)"""
+        if self._memoria_conversacion is None:
+            from langchain.memory import ConversationBufferMemory
+            self._memoria_conversacion = ConversationBufferMemory()
+        return self._memoria_conversacion
     
     def mostrar_menu(self):
         """Muestra el menú principal"""
@@ -216,10 +70,10 @@ class AgenteCurador:
         print("="*60)
         print("1. Buscar artículos sobre un tema")
         print("2. Resumir contenido técnico")
-        print("3. Guardar artículo manualmente")
+        print("3. Guardar artículo manualmente o importar un archivo")
         print("4. Ver artículos guardados")
         print("5. Buscar por etiqueta")
-        print("6. Exportar colección a Markdown")
+        print("6. Exportar colección (Markdown, JSONL o CSV)")
         print("7. Ver estadísticas")
         print("8. Ver historial de búsquedas")
         print("9. Salir")
@@ -230,14 +84,31 @@ class AgenteCurador:
         tema = input("\n Ingresa el tema de búsqueda: ")
         print("\n Buscando artículos recomendados...\n")
         
-        resultados = self.buscador.buscar_articulos(tema)
-        print(resultados)
+        articulos = []
+        try:
+            for evento in self.buscador.stream_busqueda(tema):
+                if evento["tipo"] == "token":
+                    print(evento["texto"], end="", flush=True)
+                elif evento["tipo"] == "fin":
+                    articulos = evento["articulos"]
+        except Exception as e:
+            print(f"\n Error en búsqueda: {e}")
+            return
+        print()
         
-        self.memoria.agregar_busqueda(tema, 5)
+        self.memoria.agregar_busqueda(tema, len(articulos))
         
         guardar = input("\n¿Deseas guardar algún artículo? (s/n): ")
         if guardar.lower() == 's':
-            self.guardar_articulo_interactivo()
+            numero = input("Número del artículo sugerido (Enter para ingresarlo manualmente): ")
+            sugerido = next((a for a in articulos if numero.strip().isdigit() and a["numero"] == int(numero)), None)
+            if sugerido is None:
+                self.guardar_articulo_interactivo()
+                return
+            id_articulo = self.memoria.guardar_articulo(
+                sugerido["titulo"], sugerido["descripcion"], sugerido["etiquetas"]
+            )
+            print(f" Artículo guardado con ID: {id_articulo}")
     
     def resumir_contenido(self):
         """Opción 2: Resumir contenido"""
@@ -253,14 +124,23 @@ class AgenteCurador:
         
         if contenido.strip():
             print("\n Generando resumen...\n")
-            resumen = self.buscador.resumir_contenido(contenido)
-            print(resumen)
+            try:
+                for evento in self.buscador.stream_resumen(contenido):
+                    if evento["tipo"] == "token":
+                        print(evento["texto"], end="", flush=True)
+                print()
+            except Exception as e:
+                print(f"\n Error al resumir: {e}")
         else:
             print(" No se ingresó contenido.")
     
     def guardar_articulo_interactivo(self):
-        """Opción 3: Guardar artículo manualmente"""
+        """Opción 3: Guardar artículo manualmente o importar JSONL, CSV o Markdown"""
         print("\n Guardar nuevo artículo")
+        archivo = input("Archivo a importar (.jsonl, .csv o .md; Enter para escribirlo a mano): ").strip()
+        if archivo:
+            self.importar_archivo(archivo)
+            return
         titulo = input("Título: ")
         resumen = input("Resumen: ")
         etiquetas_str = input("Etiquetas (separadas por comas): ")
@@ -272,9 +152,21 @@ class AgenteCurador:
         id_articulo = self.memoria.guardar_articulo(titulo, resumen, etiquetas, url)
         print(f" Artículo guardado con ID: {id_articulo}")
     
+    def importar_archivo(self, archivo):
+        """Importa un archivo (p. ej. una exportación de la opción 6) sin repetir artículos"""
+        try:
+            resultado = importador.importar_archivo(self.memoria, archivo)
+        except (OSError, ValueError) as e:
+            print(f" Error al importar: {e}")
+            return
+        print(f" Insertados: {resultado['insertados']} | Duplicados: {resultado['duplicados']} | "
+              f"Rechazados: {resultado['rechazados']}")
+        for error in resultado["errores"]:
+            print(f"   línea {error['linea']}: {error['motivo']}")
+    
     def ver_articulos_guardados(self):
         """Opción 4: Ver artículos guardados"""
-        articulos = self.memoria.datos["articulos_guardados"]
+        articulos = self.memoria.obtener_articulos()
         
         if not articulos:
             print("\n No hay artículos guardados.")
@@ -289,7 +181,7 @@ class AgenteCurador:
     
     def buscar_por_etiqueta(self):
         """Opción 5: Buscar por etiqueta"""
-        etiquetas_disponibles = self.memoria.datos["etiquetas"]
+        etiquetas_disponibles = self.memoria.obtener_etiquetas()
         
         if not etiquetas_disponibles:
             print("\n No hay etiquetas disponibles.")
@@ -310,24 +202,30 @@ class AgenteCurador:
             print(f"\n No se encontraron artículos con la etiqueta '{etiqueta}'")
     
     def exportar_coleccion(self):
-        """Opción 6: Exportar a Markdown"""
-        articulos = self.memoria.datos["articulos_guardados"]
-        
-        if not articulos:
+        """Opción 6: Exportar a Markdown, JSONL o CSV"""
+        if not exportador.ultimo_id(self.memoria):
             print("\n No hay artículos para exportar.")
             return
         
-        exito, resultado = self.exportador.exportar_markdown(articulos)
+        formato = input("Formato (markdown, jsonl, csv) [markdown]: ").strip().lower() or "markdown"
+        if formato not in exportador.FORMATOS:
+            print(f"\n Formato no válido: {formato}")
+            return
+        incremental = input("¿Añadir solo los artículos nuevos desde la última exportación? (s/N): ")
+        
+        exito, resultado, escritos = self.exportador.exportar(
+            self.memoria, formato, incremental=incremental.strip().lower() == "s"
+        )
         
         if exito:
-            print(f"\n Colección exportada exitosamente a: {resultado}")
+            print(f"\n Colección exportada exitosamente a: {resultado} ({escritos} artículos)")
         else:
             print(f"\n Error al exportar: {resultado}")
     
     def ver_estadisticas(self):
         """Opción 7: Ver estadísticas"""
         stats = self.memoria.obtener_estadisticas()
-        etiquetas = self.memoria.datos["etiquetas"]
+        etiquetas = self.memoria.obtener_etiquetas()
         
         print("\n ESTADÍSTICAS DEL CURADOR")
         print("="*40)
@@ -336,27 +234,41 @@ class AgenteCurador:
         print(f"Etiquetas únicas: {len(etiquetas)}")
         if etiquetas:
             print(f"Etiquetas: {', '.join(etiquetas[:10])}")
+        if self.buscador.cache is not None:
+            cache = self.buscador.cache.estadisticas()
+            print(f"Caché: {cache['aciertos_exactos'] + cache['aciertos_similares']} aciertos, "
+                  f"{cache['fallos']} fallos ({cache['entradas']} entradas)")
     
     def ver_historial(self):
         """Opción 8: Ver historial de búsquedas"""
-        historial = self.memoria.datos["historial_busquedas"]
+        historial = self.memoria.obtener_historial(10)
         
         if not historial:
             print("\n No hay historial de búsquedas.")
             return
         
         print(f"\n HISTORIAL DE BÚSQUEDAS (últimas 10):\n")
-        for busqueda in historial[-10:]:
+        for busqueda in historial:
             print(f"• {busqueda['fecha']} - '{busqueda['query']}' ({busqueda['num_resultados']} resultados)")
+
+        tendencias = self.memoria.tendencias_historial(7, 5)
+        if tendencias:
+            print(f"\n MÁS BUSCADAS (últimos 7 días):\n")
+            for consulta in tendencias:
+                print(f"• '{consulta['query']}': {consulta['busquedas']} búsquedas en {consulta['dias']} días")
     
     def ejecutar(self):
         """Bucle principal del agente"""
         print("\n Agente Curador iniciado correctamente.")
-        print(f" Memoria cargada: {len(self.memoria.datos['articulos_guardados'])} artículos")
+        print(f" Memoria cargada: {len(self.memoria.obtener_articulos())} artículos")
         
         while True:
             self.mostrar_menu()
-            opcion = input("\nSelecciona una opción (1-9): ")
+            try:
+                opcion = input("\nSelecciona una opción (1-9): ")
+            except (KeyboardInterrupt, EOFError):
+                # Ctrl+C / Ctrl+D: igual que "Salir", sin perder la escritura diferida
+                opcion = "9"
             
             if opcion == "1":
                 self.buscar_y_sugerir()
@@ -375,6 +287,7 @@ class AgenteCurador:
             elif opcion == "8":
                 self.ver_historial()
             elif opcion == "9":
+                self.memoria.cerrar()
                 print("\n ¡Hasta luego! Memoria guardada exitosamente.")
                 break
             else:
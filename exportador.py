@@ -0,0 +1,162 @@
+# exportador.py - Exportación de la colección por streaming a Markdown, JSONL y CSV, completa o incremental
+#
+# Los artículos se leen página a página con pagina_articulos (sin copiar la
+# lista ni retener el bloqueo de la memoria) y el texto se agrupa en trozos
+# de EXPORTAR_TAMANO_TROZO: un archivo o una respuesta HTTP de 1M artículos
+# se genera en memoria constante.
+import csv
+import io
+import json
+import os
+from datetime import datetime
+
+import config
+from almacenamiento import temporal_junto
+
+CAMPOS = ("id", "fecha_guardado", "titulo", "resumen", "etiquetas", "url")
+# Un solo codificador para toda la exportación: json.dumps crearía uno por artículo
+_JSON = json.JSONEncoder(ensure_ascii=False, check_circular=False)
+
+
+# ==================== LECTURA ====================
+def iterar_articulos(memoria, etiqueta=None, desde=None, hasta=None, despues_de=None, hasta_id=None, lote=None):
+    """Artículos en orden de id, con id en (despues_de, hasta_id] si se indican"""
+    lote = lote or config.EXPORTAR_LOTE
+    cursor = despues_de
+    while True:
+        pagina, cursor = memoria.pagina_articulos(lote, cursor, False, etiqueta, desde, hasta)
+        for articulo in pagina:
+            if hasta_id is not None and articulo["id"] > hasta_id:
+                return
+            yield articulo
+        if cursor is None:
+            return
+
+
+def ultimo_id(memoria):
+    """Id del artículo más reciente (0 si no hay ninguno): la marca de una exportación"""
+    pagina, _ = memoria.pagina_articulos(1, None, True)
+    return pagina[0]["id"] if pagina else 0
+
+
+# ==================== FORMATOS ====================
+def lineas_markdown(articulos, encabezado=True):
+    if encabezado:
+        yield ("# Mi Colección de Artículos Técnicos\n\n"
+               f"*Generado el {datetime.now().strftime('%Y-%m-%d')}*\n\n"
+               "---\n\n")
+    for art in articulos:
+        url = f"**URL:** {art['url']}\n\n" if art.get('url') else ""
+        yield (f"## {art['titulo']}\n\n"
+               f"**ID:** {art['id']} | **Guardado:** {art['fecha_guardado']}\n\n"
+               f"{url}"
+               f"### Resumen\n\n{art['resumen']}\n\n"
+               f"**Etiquetas:** {', '.join(art['etiquetas'])}\n\n"
+               "---\n\n")
+
+
+def lineas_jsonl(articulos, encabezado=True):
+    for art in articulos:
+        yield _JSON.encode({campo: art.get(campo) for campo in CAMPOS}) + "\n"
+
+
+def lineas_csv(articulos, encabezado=True):
+    """RFC 4180; las etiquetas van en una sola columna separadas por "; " """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    def fila(valores):
+        escritor.writerow(valores)
+        texto = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return texto
+
+    if encabezado:
+        yield fila(CAMPOS)
+    for art in articulos:
+        yield fila([art["id"], art["fecha_guardado"], art["titulo"], art["resumen"],
+                    "; ".join(art["etiquetas"]), art.get("url") or ""])
+
+
+# formato: (generador de líneas, tipo de contenido, extensión)
+FORMATOS = {
+    "markdown": (lineas_markdown, "text/markdown; charset=utf-8", ".md"),
+    "jsonl": (lineas_jsonl, "application/x-ndjson", ".jsonl"),
+    "csv": (lineas_csv, "text/csv; charset=utf-8", ".csv"),
+}
+
+
+def trozos(partes, tamano=None):
+    """Agrupa textos pequeños en trozos de unos `tamano` caracteres: menos write() y menos envíos"""
+    tamano = tamano or config.EXPORTAR_TAMANO_TROZO
+    pendientes, acumulado = [], 0
+    for parte in partes:
+        pendientes.append(parte)
+        acumulado += len(parte)
+        if acumulado >= tamano:
+            yield "".join(pendientes)
+            pendientes, acumulado = [], 0
+    if pendientes:
+        yield "".join(pendientes)
+
+
+def generar(memoria, formato="markdown", etiqueta=None, desde=None, hasta=None,
+            despues_de=None, hasta_id=None, encabezado=True):
+    """Trozos de texto de la exportación, listos para escribir o enviar"""
+    lineas = FORMATOS[formato][0]
+    articulos = iterar_articulos(memoria, etiqueta, desde, hasta, despues_de, hasta_id)
+    return trozos(lineas(articulos, encabezado))
+
+
+# ==================== ARCHIVOS ====================
+def ruta_marca(archivo):
+    return f"{archivo}.marca"
+
+
+def leer_marca(archivo):
+    """Marca de la última exportación a `archivo` o None"""
+    try:
+        with open(ruta_marca(archivo), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def exportar_archivo(memoria, archivo, formato="markdown", etiqueta=None, desde=None, hasta=None,
+                     incremental=False):
+    """Exporta a `archivo` y retorna cuántos artículos escribió.
+
+    Completa, se escribe en un temporal que se renombra al terminar.
+    Incremental, si la marca del archivo es del mismo formato y filtros,
+    solo se añaden al final los artículos guardados después; si no, se
+    hace una exportación completa.
+    """
+    filtros = {"formato": formato, "etiqueta": etiqueta,
+               "desde": str(desde) if desde else None, "hasta": str(hasta) if hasta else None}
+    marca = leer_marca(archivo) if incremental else None
+    anexar = marca is not None and marca.get("filtros") == filtros and os.path.exists(archivo)
+    # Lo que se guarde mientras se exporta queda para la siguiente exportación incremental
+    tope = ultimo_id(memoria)
+    escritos = 0
+
+    def contar(articulos):
+        nonlocal escritos
+        for articulo in articulos:
+            escritos += 1
+            yield articulo
+
+    articulos = contar(iterar_articulos(memoria, etiqueta, desde, hasta,
+                                        marca["ultimo_id"] if anexar else None, tope))
+    destino = archivo if anexar else temporal_junto(archivo)
+    # newline="" deja intactos los \r\n que exige CSV
+    with open(destino, 'a' if anexar else 'w', encoding='utf-8', newline='') as f:
+        for trozo in trozos(FORMATOS[formato][0](articulos, encabezado=not anexar)):
+            f.write(trozo)
+    if not anexar:
+        os.replace(destino, archivo)
+
+    with open(ruta_marca(archivo), 'w', encoding='utf-8') as f:
+        json.dump({"ultimo_id": tope, "filtros": filtros, "articulos": escritos,
+                   "fecha": datetime.now().isoformat(timespec="seconds")}, f)
+    return escritos
@@ -0,0 +1,207 @@
+# importador.py - Importación de artículos en bloque desde JSONL, CSV o Markdown (los formatos de exportador.py)
+#
+# El archivo se lee línea a línea: cada artículo se valida al llegar y se
+# descarta si ya está en la colección o antes en el propio archivo (misma
+# URL o mismo título normalizado). Los válidos se guardan por lotes de
+# IMPORTAR_LOTE con guardar_articulos: ids en bloque, etiquetas de una vez
+# y una sola escritura de la memoria por lote, en vez de una por artículo.
+#
+# Uso: python importador.py lista.jsonl [--formato jsonl|csv|markdown]
+import csv
+import json
+import os
+from urllib.parse import urlsplit, urlunsplit
+
+import config
+import exportador
+
+
+# ==================== FORMATOS ====================
+# Cada lector recibe las líneas del archivo y da (número de línea, registro),
+# donde registro es un dict con los campos tal cual o el ValueError de una
+# línea que no se pudo leer. Un archivo ilegible entero lanza ValueError.
+def registros_jsonl(lineas):
+    for numero, linea in enumerate(lineas, 1):
+        if not linea.strip():
+            continue
+        try:
+            registro = json.loads(linea)
+        except ValueError as e:
+            yield numero, ValueError(f"JSON no válido: {e}")
+            continue
+        yield numero, registro if isinstance(registro, dict) else ValueError("Se esperaba un objeto JSON")
+
+
+def registros_csv(lineas):
+    """Con cabecera; las etiquetas van en una columna separadas por ";" (o por "," si no hay ";")"""
+    lector = csv.DictReader(lineas)
+    if lector.fieldnames is None:
+        return
+    if not {"titulo", "resumen"} <= set(lector.fieldnames):
+        raise ValueError("El CSV necesita una cabecera con al menos las columnas titulo y resumen")
+    for fila in lector:
+        etiquetas = fila.get("etiquetas") or ""
+        fila["etiquetas"] = etiquetas.split(";" if ";" in etiquetas else ",")
+        yield lector.line_num, fila
+
+
+def registros_markdown(lineas):
+    """Las secciones "## Título" de lineas_markdown (también la opción 6 del CLI).
+
+    El resumen llega hasta la línea "**Etiquetas:**": puede tener sus propios
+    "## " y "---" sin que se corte el artículo.
+    """
+    articulo, numero, en_resumen = None, 0, False
+    for posicion, linea in enumerate(lineas, 1):
+        linea = linea.rstrip("\r\n")
+        if en_resumen:
+            if linea.startswith("**Etiquetas:**"):
+                articulo["etiquetas"] = linea[len("**Etiquetas:**"):].split(",")
+                en_resumen = False
+            else:
+                articulo["resumen"].append(linea)
+        elif linea.startswith("## "):
+            if articulo is not None:
+                yield numero, articulo
+            articulo, numero, en_resumen = {"titulo": linea[3:], "resumen": [], "etiquetas": []}, posicion, False
+        elif articulo is None:
+            continue
+        elif linea.strip() == "---":
+            yield numero, articulo
+            articulo = None
+        elif linea.startswith("**URL:** "):
+            articulo["url"] = linea[len("**URL:** "):]
+        elif linea.startswith("### Resumen"):
+            en_resumen = True
+    if articulo is not None:
+        yield numero, articulo
+
+
+# formato: lector de registros
+FORMATOS = {
+    "jsonl": registros_jsonl,
+    "csv": registros_csv,
+    "markdown": registros_markdown,
+}
+EXTENSIONES = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".md": "markdown", ".markdown": "markdown"}
+# Tipo de contenido de POST /articulos/lote: los mismos que sirve GET /exportar
+TIPOS = {tipo.split(";")[0]: formato for formato, (_, tipo, _) in exportador.FORMATOS.items()}
+TIPOS["application/jsonl"] = "jsonl"
+
+
+# ==================== VALIDACIÓN ====================
+def _texto(registro, campo):
+    valor = registro.get(campo)
+    if isinstance(valor, list):
+        valor = "\n".join(valor)
+    if not isinstance(valor, str) or not valor.strip():
+        raise ValueError(f"Falta el campo '{campo}'")
+    return valor.strip()
+
+
+def validar(registro):
+    """Artículo listo para guardar (titulo, resumen, etiquetas, url) o ValueError con el motivo"""
+    etiquetas = registro.get("etiquetas") or []
+    if isinstance(etiquetas, str):
+        etiquetas = etiquetas.split(",")
+    if not isinstance(etiquetas, list) or not all(isinstance(e, str) for e in etiquetas):
+        raise ValueError("'etiquetas' debe ser una lista de textos")
+    url = registro.get("url") or None
+    if url is not None:
+        partes = urlsplit(url.strip()) if isinstance(url, str) else None
+        if partes is None or partes.scheme not in ("http", "https") or not partes.netloc:
+            raise ValueError(f"URL no válida: {url!r}")
+        url = url.strip()
+    return {
+        "titulo": _texto(registro, "titulo"),
+        "resumen": _texto(registro, "resumen"),
+        "etiquetas": list(dict.fromkeys(e.strip() for e in etiquetas if e.strip())),
+        "url": url
+    }
+
+
+def claves(articulo):
+    """Lo que identifica un artículo repetido: su URL (sin fragmento ni "/" final) y su título normalizado"""
+    resultado = ["titulo:" + " ".join(articulo["titulo"].casefold().split())]
+    if articulo.get("url"):
+        partes = urlsplit(articulo["url"])
+        resultado.append("url:" + urlunsplit((partes.scheme.lower(), partes.netloc.lower(),
+                                              partes.path.rstrip("/"), partes.query, "")))
+    return resultado
+
+
+# ==================== IMPORTACIÓN ====================
+def importar(memoria, lineas, formato="jsonl", lote=None):
+    """Importa los artículos de `lineas` y retorna los conteos.
+
+    {"insertados", "duplicados", "rechazados", "errores": [{"linea", "motivo"}]};
+    de los rechazados solo se detallan los IMPORTAR_MAX_ERRORES primeros.
+    Las fechas e ids del archivo se ignoran: cada lote recibe ids nuevos y
+    la fecha de la importación, así la colección sigue ordenada por ambos.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no válido: {formato}")
+    lote = lote or config.IMPORTAR_LOTE
+    resultado = {"insertados": 0, "duplicados": 0, "rechazados": 0, "errores": []}
+    vistos = {clave for articulo in exportador.iterar_articulos(memoria) for clave in claves(articulo)}
+    pendientes = []
+
+    def guardar():
+        memoria.guardar_articulos(pendientes)
+        # Una escritura por lote también con la escritura diferida del JSON
+        memoria.vaciar()
+        resultado["insertados"] += len(pendientes)
+        pendientes.clear()
+
+    for numero, registro in FORMATOS[formato](lineas):
+        try:
+            if isinstance(registro, ValueError):
+                raise registro
+            articulo = validar(registro)
+        except ValueError as e:
+            resultado["rechazados"] += 1
+            if len(resultado["errores"]) < config.IMPORTAR_MAX_ERRORES:
+                resultado["errores"].append({"linea": numero, "motivo": str(e)})
+            continue
+        claves_articulo = claves(articulo)
+        if not vistos.isdisjoint(claves_articulo):
+            resultado["duplicados"] += 1
+            continue
+        vistos.update(claves_articulo)
+        pendientes.append(articulo)
+        if len(pendientes) >= lote:
+            guardar()
+    if pendientes:
+        guardar()
+    return resultado
+
+
+def importar_archivo(memoria, archivo, formato=None):
+    """Importa un archivo; sin `formato` se deduce de la extensión"""
+    formato = formato or EXTENSIONES.get(os.path.splitext(archivo)[1].lower())
+    if formato is None:
+        raise ValueError(f"No se reconoce el formato de '{archivo}': usa .jsonl, .csv o .md")
+    # newline="" conserva los saltos de línea dentro de los campos CSV entre comillas
+    with open(archivo, 'r', encoding='utf-8', newline='') as f:
+        return importar(memoria, f, formato)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from memoria import crear_memoria
+
+    parser = argparse.ArgumentParser(description="Importa artículos desde JSONL, CSV o Markdown")
+    parser.add_argument("archivo")
+    parser.add_argument("--formato", choices=list(FORMATOS), help="Por defecto, según la extensión")
+    args = parser.parse_args()
+
+    memoria = crear_memoria()
+    try:
+        resultado = importar_archivo(memoria, args.archivo, args.formato)
+    finally:
+        memoria.cerrar()
+    print(f"Insertados: {resultado['insertados']} | Duplicados: {resultado['duplicados']} | "
+          f"Rechazados: {resultado['rechazados']}")
+    for error in resultado["errores"]:
+        print(f"  línea {error['linea']}: {error['motivo']}")
@@ -0,0 +1,232 @@
+# indice_texto.py - Índice invertido en memoria para buscar artículos guardados (BM25)
+import bisect
+import heapq
+import math
+import re
+import threading
+
+from cache_respuestas import normalizar_texto
+
+# Ya sin acentos, igual que los términos del índice
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes asi aun bajo bien cada casi como con
+contra cual cuales cuando de del desde donde dos e el ella ellas ello ellos en entre era eran
+es esa esas ese eso esos esta estan estas este esto estos fue fueron ha han hasta hay la las
+le les lo los mas me mi mis mucho muy ni no nos o otra otras otro otros para pero poco por
+porque que quien se sea segun ser si sin sino sobre son su sus tambien tan tanto te tiene
+tienen todo todos tu tus u un una unas uno unos y ya
+""".split())
+
+# Peso de cada campo en la frecuencia del término (BM25F simplificado)
+CAMPOS = (("titulo", 3), ("etiquetas", 2), ("resumen", 1))
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokenizar(texto):
+    """Términos normalizados de un texto, sin stopwords"""
+    return [t for t in TOKEN.findall(normalizar_texto(texto))
+            if t not in STOPWORDS and (len(t) > 1 or t.isdigit())]
+
+
+class IndiceTexto:
+    """Índice invertido de artículos con ranking BM25.
+
+    Se construye una vez con los artículos existentes y después se mantiene
+    al día con las operaciones que publica la memoria (`suscribir`), sin
+    volver a recorrer la colección. Solo guarda ids: los artículos se leen
+    de la memoria.
+    """
+
+    def __init__(self, k1=1.2, b=0.75, max_expansiones=20):
+        self.k1 = k1
+        self.b = b
+        self.max_expansiones = max_expansiones
+        self.bloqueo = threading.Lock()
+        # término -> {id_articulo: frecuencia ponderada}
+        self.postings = {}
+        self._terminos_articulo = {}
+        # id_articulo -> longitud ponderada; sus claves son los artículos indexados
+        self._longitudes = {}
+        self._longitud_total = 0
+        # Términos ordenados para expandir prefijos con bisect
+        self._ordenados = []
+        # Mientras se construye en segundo plano las operaciones esperan aquí
+        self._listo = threading.Event()
+        self._listo.set()
+        self._bloqueo_pendientes = threading.Lock()
+        self._pendientes = []
+
+    # ==================== MANTENIMIENTO ====================
+    def construir(self, articulos):
+        """Indexa de cero una colección de artículos"""
+        with self.bloqueo:
+            for articulo in articulos:
+                self._agregar(articulo, ordenar=False)
+            self._ordenados = sorted(self.postings)
+
+    def construir_en_segundo_plano(self, articulos):
+        """Como `construir`, pero en un hilo para no retrasar el arranque.
+
+        Las búsquedas esperan a que termine; las altas y bajas que lleguen
+        mientras tanto se aplican al final, en orden (son idempotentes por
+        id, así que da igual si el recorrido ya las vio).
+        """
+        self._listo.clear()
+
+        def construir():
+            self.construir(articulos)
+            with self._bloqueo_pendientes:
+                for operacion in self._pendientes:
+                    self._aplicar(operacion)
+                self._pendientes = []
+                self._listo.set()
+
+        threading.Thread(target=construir, name="indice-texto", daemon=True).start()
+
+    def esperar(self, timeout=None):
+        """Espera a que termine la construcción en segundo plano"""
+        return self._listo.wait(timeout)
+
+    def aplicar_operacion(self, operacion):
+        """Mantiene el índice con las operaciones de la memoria"""
+        if not self._listo.is_set():
+            with self._bloqueo_pendientes:
+                if not self._listo.is_set():
+                    self._pendientes.append(operacion)
+                    return
+        self._aplicar(operacion)
+
+    def _aplicar(self, operacion):
+        if operacion["op"] == "articulo":
+            self.agregar(operacion["articulo"])
+        elif operacion["op"] == "eliminar_articulo":
+            self.eliminar(operacion["id"])
+
+    def agregar(self, articulo):
+        with self.bloqueo:
+            self._agregar(articulo)
+
+    def eliminar(self, id_articulo):
+        with self.bloqueo:
+            self._eliminar(id_articulo)
+
+    def _agregar(self, articulo, ordenar=True):
+        id_articulo = articulo["id"]
+        if id_articulo in self._longitudes:
+            self._eliminar(id_articulo)
+        frecuencias = {}
+        for campo, peso in CAMPOS:
+            valor = articulo.get(campo) or ""
+            if isinstance(valor, list):
+                valor = " ".join(valor)
+            for termino in tokenizar(valor):
+                frecuencias[termino] = frecuencias.get(termino, 0) + peso
+
+        for termino, frecuencia in frecuencias.items():
+            lista = self.postings.get(termino)
+            if lista is None:
+                lista = self.postings[termino] = {}
+                if ordenar:
+                    bisect.insort(self._ordenados, termino)
+            lista[id_articulo] = frecuencia
+
+        longitud = sum(frecuencias.values())
+        self._terminos_articulo[id_articulo] = tuple(frecuencias)
+        self._longitudes[id_articulo] = longitud
+        self._longitud_total += longitud
+
+    def _eliminar(self, id_articulo):
+        if id_articulo not in self._longitudes:
+            return
+        for termino in self._terminos_articulo.pop(id_articulo):
+            lista = self.postings[termino]
+            del lista[id_articulo]
+            if not lista:
+                del self.postings[termino]
+                posicion = bisect.bisect_left(self._ordenados, termino)
+                # Durante construir() la lista ordenada aún no existe
+                if posicion < len(self._ordenados) and self._ordenados[posicion] == termino:
+                    del self._ordenados[posicion]
+        self._longitud_total -= self._longitudes.pop(id_articulo)
+
+    # ==================== CONSULTA ====================
+    def _expandir(self, prefijo):
+        """Términos del índice que empiezan por el prefijo"""
+        inicio = bisect.bisect_left(self._ordenados, prefijo)
+        terminos = []
+        for termino in self._ordenados[inicio:inicio + self.max_expansiones]:
+            if not termino.startswith(prefijo):
+                break
+            terminos.append(termino)
+        return terminos
+
+    def _puntuar(self, termino, puntuaciones, total, longitud_media):
+        lista = self.postings[termino]
+        idf = math.log(1 + (total - len(lista) + 0.5) / (len(lista) + 0.5))
+        k1, longitudes = self.k1, self._longitudes
+        # k1 * (1 - b + b * dl / avgdl) = base + pendiente * dl
+        base = k1 * (1 - self.b)
+        pendiente = k1 * self.b / longitud_media
+        factor = idf * (k1 + 1)
+        for id_articulo, frecuencia in lista.items():
+            puntuaciones[id_articulo] = (
+                factor * frecuencia / (frecuencia + base + pendiente * longitudes[id_articulo])
+            )
+
+    def buscar(self, consulta, limite=10, desplazamiento=0, prefijo=True):
+        """Retorna (total, [(id_articulo, puntuación)]) de la página pedida.
+
+        Si `prefijo` es verdadero, el último término de la consulta también
+        coincide con los términos que empiezan por él (búsqueda al teclear).
+        """
+        terminos = tokenizar(consulta)
+        if not terminos:
+            return 0, []
+
+        self._listo.wait()
+        with self.bloqueo:
+            total = len(self._longitudes)
+            if not total:
+                return 0, []
+            longitud_media = self._longitud_total / total
+
+            grupos = [[t] for t in dict.fromkeys(terminos[:-1]) if t in self.postings]
+            ultimo = terminos[-1]
+            if prefijo:
+                expansion = self._expandir(ultimo)
+                if ultimo in self.postings and ultimo not in expansion:
+                    expansion.insert(0, ultimo)
+                if expansion:
+                    grupos.append(expansion)
+            elif ultimo in self.postings:
+                grupos.append([ultimo])
+
+            acumulado = {}
+            for grupo in grupos:
+                puntuaciones = {}
+                self._puntuar(grupo[0], puntuaciones, total, longitud_media)
+                # Entre expansiones de un mismo prefijo cuenta la mejor coincidencia
+                for termino in grupo[1:]:
+                    extra = {}
+                    self._puntuar(termino, extra, total, longitud_media)
+                    for id_articulo, valor in extra.items():
+                        if valor > puntuaciones.get(id_articulo, 0.0):
+                            puntuaciones[id_articulo] = valor
+                if not acumulado:
+                    acumulado = puntuaciones
+                    continue
+                for id_articulo, valor in puntuaciones.items():
+                    acumulado[id_articulo] = acumulado.get(id_articulo, 0.0) + valor
+
+            # Empates por id descendente: primero lo guardado más recientemente
+            mejores = heapq.nlargest(desplazamiento + limite, acumulado.items(),
+                                     key=lambda par: (par[1], par[0]))
+            pagina = [(id_articulo, round(puntuacion, 4))
+                      for id_articulo, puntuacion in mejores[desplazamiento:]]
+            return len(acumulado), pagina
+
+    def estadisticas(self):
+        self._listo.wait()
+        with self.bloqueo:
+            return {"articulos": len(self._longitudes), "terminos": len(self.postings)}
@@ -0,0 +1,383 @@
+# indice_vectorial.py - Índice de embeddings locales para búsqueda semántica y artículos relacionados
+import atexit
+import json
+import math
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+import config
+from almacenamiento import BloqueoArchivo, temporal_junto
+from indice_texto import tokenizar
+
+
+# ==================== EMBEDDINGS ====================
+class EmbeddingHash:
+    """TF-IDF con hashing: palabras y trigramas de caracteres en `dimension` cubetas.
+
+    No necesita modelo ni entrenamiento. Los trigramas acercan variantes de
+    una misma palabra (plural, conjugación); el IDF lo aplica el índice al
+    consultar porque depende de la colección.
+    """
+
+    usa_idf = True
+
+    def __init__(self, dimension=None, peso_trigramas=0.5):
+        self.dimension = dimension or config.VECTORES_DIMENSION
+        self.peso_trigramas = peso_trigramas
+        self.nombre = f"hash-{self.dimension}"
+
+    def _rasgos(self, texto):
+        rasgos = Counter()
+        for palabra in tokenizar(texto):
+            rasgos[palabra] += 1.0
+            marcada = f"<{palabra}>"
+            for i in range(len(marcada) - 2):
+                rasgos["#" + marcada[i:i + 3]] += self.peso_trigramas
+        return rasgos
+
+    def vectorizar(self, textos):
+        matriz = np.zeros((len(textos), self.dimension), dtype=np.float32)
+        for fila, texto in enumerate(textos):
+            for rasgo, cuenta in self._rasgos(texto).items():
+                valor = zlib.crc32(rasgo.encode("utf-8"))
+                # El bit alto da el signo: las colisiones tienden a cancelarse
+                signo = 1.0 if valor & 0x80000000 else -1.0
+                matriz[fila, valor % self.dimension] += signo * (1.0 + math.log1p(cuenta))
+        normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+        return matriz / np.maximum(normas, 1e-12)
+
+
+class EmbeddingLocal:
+    """Modelo de sentence-transformers en CPU (opcional, relaciona sinónimos e idiomas)"""
+
+    usa_idf = False
+
+    def __init__(self, modelo):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "CURADOR_VECTORES_MODELO requiere 'pip install sentence-transformers'"
+            ) from e
+        self.modelo = SentenceTransformer(modelo, device="cpu")
+        self.dimension = self.modelo.get_sentence_embedding_dimension()
+        self.nombre = modelo
+
+    def vectorizar(self, textos):
+        return self.modelo.encode(list(textos), batch_size=64, normalize_embeddings=True,
+                                  convert_to_numpy=True).astype(np.float32)
+
+
+def crear_embedding():
+    """Modelo local si está configurado; si no, TF-IDF con hashing"""
+    if config.VECTORES_MODELO:
+        return EmbeddingLocal(config.VECTORES_MODELO)
+    return EmbeddingHash()
+
+
+def texto_articulo(articulo):
+    return " ".join([articulo["titulo"], " ".join(articulo["etiquetas"]), articulo["resumen"]])
+
+
+# ==================== ÍNDICE ====================
+class IndiceVectorial:
+    """Matriz de vectores en un memmap de NumPy con búsqueda top-k vectorizada.
+
+    Las altas y bajas llegan por `aplicar_operacion` (suscrito a la memoria)
+    y las procesa por lotes un hilo de fondo, que también vectoriza los
+    artículos que falten al arrancar. Las filas borradas quedan con id -1.
+    El memmap se vuelca cada `intervalo_volcado` segundos y al cerrar, no
+    tras cada lote.
+
+    Con varios workers todos reciben las mismas operaciones, pero solo el
+    que toma el flock de `<base>.lock` escribe los archivos; los demás
+    parten de una copia en RAM de lo guardado y no la vuelcan.
+    """
+
+    CAPACIDAD_INICIAL = 1024
+
+    def __init__(self, archivo=None, embedding=None, tamano_bloque=65536, lote=256, intervalo_volcado=None):
+        self.archivo = archivo or config.VECTORES_ARCHIVO
+        base = self.archivo[:-4] if self.archivo.endswith(".npy") else self.archivo
+        self.archivo_ids = base + ".ids.npy"
+        self.archivo_meta = base + ".json"
+        # El flock se conserva mientras viva el proceso
+        self._bloqueo_archivos = BloqueoArchivo(base + ".lock")
+        self.propietario = self._bloqueo_archivos.tomar_proceso()
+        self.embedding = embedding or crear_embedding()
+        self.tamano_bloque = tamano_bloque
+        self.lote = lote
+        self.intervalo_volcado = (intervalo_volcado if intervalo_volcado is not None
+                                  else config.VECTORES_INTERVALO_VOLCADO)
+        self._sucio = False
+        self._ultimo_volcado = time.monotonic()
+        self.bloqueo = threading.RLock()
+        self.filas = {}
+        self.usadas = 0
+        self.frecuencias = np.zeros(self.embedding.dimension, dtype=np.float64)
+        self._cola = queue.Queue()
+        self._hilo = None
+        self._abrir()
+
+    # ---------- archivos ----------
+    def _abrir(self):
+        meta = None
+        if os.path.exists(self.archivo_meta):
+            try:
+                with open(self.archivo_meta, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except ValueError:
+                # Metadatos a medio escribir: se recalcula como si no hubiera índice
+                meta = None
+        compatible = (meta is not None and meta.get("modelo") == self.embedding.nombre
+                      and os.path.exists(self.archivo) and os.path.exists(self.archivo_ids))
+        if not compatible:
+            # Sin vectores o de otro modelo: se recalculan todos en segundo plano
+            self._crear(self.CAPACIDAD_INICIAL)
+            return
+        if self.propietario:
+            self.matriz = np.lib.format.open_memmap(self.archivo, mode="r+")
+            self.ids = np.lib.format.open_memmap(self.archivo_ids, mode="r+")
+        else:
+            self.matriz, self.ids = np.load(self.archivo), np.load(self.archivo_ids)
+        self.usadas = meta["filas"]
+        for fila, id_articulo in enumerate(self.ids[:self.usadas].tolist()):
+            if id_articulo >= 0:
+                self.filas[id_articulo] = fila
+        self.frecuencias = (self.matriz[:self.usadas] != 0).sum(axis=0, dtype=np.float64)
+
+    def _crear(self, capacidad, anterior=None):
+        forma = (capacidad, self.embedding.dimension)
+        if not self.propietario:
+            matriz, ids = np.zeros(forma, dtype=np.float32), np.full(capacidad, -1, dtype=np.int64)
+            if anterior is not None:
+                matriz[:self.usadas] = anterior[0][:self.usadas]
+                ids[:self.usadas] = anterior[1][:self.usadas]
+            self.matriz, self.ids = matriz, ids
+            return
+        temporal, temporal_ids = temporal_junto(self.archivo), temporal_junto(self.archivo_ids)
+        matriz = np.lib.format.open_memmap(temporal, mode="w+", dtype=np.float32, shape=forma)
+        ids = np.lib.format.open_memmap(temporal_ids, mode="w+", dtype=np.int64, shape=(capacidad,))
+        ids[:] = -1
+        if anterior is not None:
+            matriz[:self.usadas] = anterior[0][:self.usadas]
+            ids[:self.usadas] = anterior[1][:self.usadas]
+        matriz.flush()
+        ids.flush()
+        os.replace(temporal, self.archivo)
+        os.replace(temporal_ids, self.archivo_ids)
+        self.matriz, self.ids = matriz, ids
+        self._persistir_meta()
+
+    def _persistir_meta(self):
+        # Temporal, fsync y rename: un corte deja los metadatos anteriores o los nuevos
+        temporal = temporal_junto(self.archivo_meta)
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({"modelo": self.embedding.nombre, "dimension": self.embedding.dimension,
+                       "filas": self.usadas}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.archivo_meta)
+
+    def sincronizar_disco(self):
+        if not self.propietario:
+            return
+        with self.bloqueo:
+            # Primero las filas: los metadatos nunca cuentan filas que no estén en disco
+            self.matriz.flush()
+            self.ids.flush()
+            self._persistir_meta()
+            self._sucio = False
+            self._ultimo_volcado = time.monotonic()
+
+    def cerrar(self):
+        """Espera las altas pendientes, vuelca el memmap y deja los archivos a otro proceso"""
+        self.esperar()
+        self.sincronizar_disco()
+        atexit.unregister(self.sincronizar_disco)
+        if self.propietario:
+            self.propietario = False
+            self._bloqueo_archivos.soltar_proceso()
+
+    # ---------- mantenimiento ----------
+    def sincronizar(self, articulos):
+        """Encola los artículos sin vector y descarta los vectores de artículos borrados"""
+        vigentes = set()
+        faltantes = []
+        for articulo in articulos:
+            vigentes.add(articulo["id"])
+            if articulo["id"] not in self.filas:
+                faltantes.append(articulo)
+        with self.bloqueo:
+            for id_articulo in [i for i in self.filas if i not in vigentes]:
+                self._eliminar(id_articulo)
+        for articulo in faltantes:
+            self._cola.put(("articulo", articulo))
+        self._iniciar()
+        return len(faltantes)
+
+    def aplicar_operacion(self, operacion):
+        """Encola las altas y bajas de la memoria para el hilo de fondo"""
+        if operacion["op"] == "articulo":
+            self._cola.put(("articulo", operacion["articulo"]))
+        elif operacion["op"] == "eliminar_articulo":
+            self._cola.put(("eliminar", operacion["id"]))
+        else:
+            return
+        self._iniciar()
+
+    def _iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name="indice-vectorial", daemon=True)
+            self._hilo.start()
+            atexit.register(self.sincronizar_disco)
+
+    def _bucle(self):
+        while True:
+            try:
+                tareas = [self._cola.get(timeout=self.intervalo_volcado or None)]
+            except queue.Empty:
+                # Sin altas en todo el intervalo: se vuelca lo que quede
+                self._volcar_si_toca(forzar=True)
+                continue
+            while len(tareas) < self.lote:
+                try:
+                    tareas.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._procesar(tareas)
+            except Exception as e:
+                print(f"Error al actualizar el índice vectorial: {e}")
+            finally:
+                for _ in tareas:
+                    self._cola.task_done()
+            self._volcar_si_toca()
+
+    def _volcar_si_toca(self, forzar=False):
+        if not self._sucio or not self.propietario:
+            return
+        if forzar or time.monotonic() - self._ultimo_volcado >= self.intervalo_volcado:
+            try:
+                self.sincronizar_disco()
+            except Exception as e:
+                print(f"Error al volcar el índice vectorial: {e}")
+
+    def _procesar(self, tareas):
+        # Las altas consecutivas se vectorizan juntas; el orden con las bajas se respeta
+        altas = []
+        for tipo, valor in tareas + [("fin", None)]:
+            if tipo == "articulo":
+                altas.append(valor)
+                continue
+            if altas:
+                self.agregar(altas)
+                altas = []
+            if tipo == "eliminar":
+                with self.bloqueo:
+                    self._eliminar(valor)
+
+    def esperar(self):
+        """Bloquea hasta que el hilo de fondo vacía la cola"""
+        self._cola.join()
+
+    def agregar(self, articulos):
+        """Vectoriza e inserta (o reemplaza) artículos"""
+        vectores = self.embedding.vectorizar([texto_articulo(a) for a in articulos])
+        with self.bloqueo:
+            nuevas = sum(1 for a in articulos if a["id"] not in self.filas)
+            if self.usadas + nuevas > len(self.ids):
+                capacidad = max(2 * len(self.ids), self.usadas + nuevas)
+                self._crear(capacidad, (self.matriz, self.ids))
+            for articulo, vector in zip(articulos, vectores):
+                fila = self.filas.get(articulo["id"])
+                if fila is None:
+                    fila = self.filas[articulo["id"]] = self.usadas
+                    self.usadas += 1
+                else:
+                    self.frecuencias -= self.matriz[fila] != 0
+                self.matriz[fila] = vector
+                self.ids[fila] = articulo["id"]
+                self.frecuencias += vector != 0
+            self._sucio = True
+
+    def _eliminar(self, id_articulo):
+        fila = self.filas.pop(id_articulo, None)
+        if fila is None:
+            return
+        self.frecuencias -= self.matriz[fila] != 0
+        self.matriz[fila] = 0
+        self.ids[fila] = -1
+        self._sucio = True
+
+    # ==================== CONSULTA ====================
+    def _ponderar(self, consultas):
+        """Aplica el IDF de la colección a las consultas (solo embeddings con hashing)"""
+        if not self.embedding.usa_idf:
+            return consultas
+        idf = np.log((1 + len(self.filas)) / (1 + self.frecuencias)) + 1
+        ponderadas = consultas * (idf * idf).astype(np.float32)
+        return ponderadas / np.maximum(np.linalg.norm(ponderadas, axis=1, keepdims=True), 1e-12)
+
+    def buscar_vectores(self, consultas, k=10, excluir=()):
+        """Top-k por producto escalar para un lote de consultas: [[(id, puntuación)], ...]"""
+        consultas = np.atleast_2d(np.asarray(consultas, dtype=np.float32))
+        excluir = np.fromiter(excluir, dtype=np.int64)
+        with self.bloqueo:
+            consultas = self._ponderar(consultas)
+            candidatos_puntos, candidatos_ids = [], []
+            # Por bloques: acota la memoria temporal y recorre el memmap secuencialmente
+            for inicio in range(0, self.usadas, self.tamano_bloque):
+                fin = min(inicio + self.tamano_bloque, self.usadas)
+                ids = np.asarray(self.ids[inicio:fin])
+                puntos = consultas @ self.matriz[inicio:fin].T
+                invalidas = ids < 0
+                if len(excluir):
+                    invalidas |= np.isin(ids, excluir)
+                puntos[:, invalidas] = -np.inf
+                tomar = min(k, fin - inicio)
+                mejores = np.argpartition(-puntos, tomar - 1, axis=1)[:, :tomar]
+                candidatos_puntos.append(np.take_along_axis(puntos, mejores, axis=1))
+                candidatos_ids.append(ids[mejores])
+        if not candidatos_puntos:
+            return [[] for _ in range(len(consultas))]
+
+        puntos = np.concatenate(candidatos_puntos, axis=1)
+        ids = np.concatenate(candidatos_ids, axis=1)
+        orden = np.argsort(-puntos, axis=1)[:, :k]
+        resultados = []
+        for fila_puntos, fila_ids in zip(np.take_along_axis(puntos, orden, axis=1),
+                                         np.take_along_axis(ids, orden, axis=1)):
+            resultados.append([(int(i), round(float(p), 4))
+                               for i, p in zip(fila_ids, fila_puntos) if np.isfinite(p)])
+        return resultados
+
+    def buscar(self, texto, k=10):
+        """Artículos más cercanos a un texto libre"""
+        return self.buscar_lote([texto], k)[0]
+
+    def buscar_lote(self, textos, k=10):
+        return self.buscar_vectores(self.embedding.vectorizar(textos), k)
+
+    def similares(self, id_articulo, k=5):
+        """Artículos más cercanos a uno guardado; None si aún no tiene vector"""
+        with self.bloqueo:
+            fila = self.filas.get(id_articulo)
+            if fila is None:
+                return None
+            vector = np.array(self.matriz[fila])
+        return self.buscar_vectores(vector, k, excluir=(id_articulo,))[0]
+
+    def estadisticas(self):
+        with self.bloqueo:
+            return {
+                "modelo": self.embedding.nombre,
+                "vectores": len(self.filas),
+                "pendientes": self._cola.unfinished_tasks
+            }
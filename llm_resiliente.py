@@ -0,0 +1,147 @@
+# llm_resiliente.py - Envoltorios de LangChain: LLM con resiliencia, respaldo y métricas; prompts medidos
+#
+# Se importa desde HerramientaBuscador._crear_cadenas, nunca al arrancar:
+# depende de langchain_core.
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import Runnable
+
+import metricas
+from buscador import estimar_tokens
+from resiliencia import CircuitoAbierto, debe_respaldar
+
+
+class PromptMedido(PromptTemplate):
+    """PromptTemplate que mide en la etapa "prompt" el tiempo de formatearse"""
+
+    def format(self, **kwargs):
+        with metricas.ETAPAS.cronometro(etapa="prompt"):
+            return super().format(**kwargs)
+
+
+def _texto(valor):
+    """Texto de una entrada (PromptValue, str) o salida (mensaje, str) del modelo"""
+    if hasattr(valor, "to_string"):
+        return valor.to_string()
+    return str(getattr(valor, "content", valor))
+
+
+def _registrar_tokens(entrada, salida, uso):
+    """Tokens que informa el proveedor; si no los da (modelos locales), una estimación"""
+    uso = uso or {}
+    metricas.TOKENS_LLM.observar(uso.get("input_tokens") or estimar_tokens(_texto(entrada)), tipo="prompt")
+    metricas.TOKENS_LLM.observar(uso.get("output_tokens") or estimar_tokens(salida), tipo="completion")
+
+
+class LLMResiliente(Runnable):
+    """LLM principal con plazo, reintentos y cortocircuito; al agotarse, el de respaldo.
+
+    Las cadenas (LLMChain, prompt | llm) lo usan como a cualquier modelo. El
+    respaldo solo entra por fallos del proveedor (cuota, caídas, plazos,
+    circuito abierto), no por errores de la petición. Cada llamada se mide
+    en la etapa "llm" (reintentos y respaldo incluidos) junto con sus tokens.
+    """
+
+    def __init__(self, principal, resiliencia, respaldo=None):
+        self.principal = principal
+        self.resiliencia = resiliencia
+        self.respaldo = respaldo
+
+    def _usar_respaldo(self, error):
+        if self.respaldo is None or not debe_respaldar(error):
+            raise error
+        self.resiliencia.contar("respaldos_modelo")
+
+    def invoke(self, input, config=None, **kwargs):
+        with metricas.LLM_EN_CURSO.en_curso(), metricas.ETAPAS.cronometro(etapa="llm"):
+            salida = self._invocar(input, config, **kwargs)
+        _registrar_tokens(input, _texto(salida), getattr(salida, "usage_metadata", None))
+        return salida
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        with metricas.LLM_EN_CURSO.en_curso(), metricas.ETAPAS.cronometro(etapa="llm"):
+            salida = await self._ainvocar(input, config, **kwargs)
+        _registrar_tokens(input, _texto(salida), getattr(salida, "usage_metadata", None))
+        return salida
+
+    def _invocar(self, input, config, **kwargs):
+        try:
+            return self.resiliencia.ejecutar(lambda: self.principal.invoke(input, config, **kwargs))
+        except Exception as e:
+            self._usar_respaldo(e)
+        return self.respaldo.invoke(input, config, **kwargs)
+
+    async def _ainvocar(self, input, config, **kwargs):
+        try:
+            return await self.resiliencia.aejecutar(lambda: self.principal.ainvoke(input, config, **kwargs))
+        except Exception as e:
+            self._usar_respaldo(e)
+        return await self.respaldo.ainvoke(input, config, **kwargs)
+
+    def stream(self, input, config=None, **kwargs):
+        partes, uso = [], None
+        with metricas.LLM_EN_CURSO.en_curso(), metricas.ETAPAS.cronometro(etapa="llm"):
+            for fragmento in self._stream(input, config, **kwargs):
+                partes.append(_texto(fragmento))
+                uso = getattr(fragmento, "usage_metadata", None) or uso
+                yield fragmento
+        _registrar_tokens(input, "".join(partes), uso)
+
+    async def astream(self, input, config=None, **kwargs):
+        partes, uso = [], None
+        with metricas.LLM_EN_CURSO.en_curso(), metricas.ETAPAS.cronometro(etapa="llm"):
+            async for fragmento in self._astream(input, config, **kwargs):
+                partes.append(_texto(fragmento))
+                uso = getattr(fragmento, "usage_metadata", None) or uso
+                yield fragmento
+        _registrar_tokens(input, "".join(partes), uso)
+
+    # En streaming no se reintenta: el plazo lo pone el cliente del LLM, y el
+    # respaldo solo entra si todavía no se emitió ningún fragmento
+    def _stream(self, input, config, **kwargs):
+        circuito = self.resiliencia.circuito
+        emitido = sonda = False
+        try:
+            sonda = circuito.permitir()
+            for fragmento in self.principal.stream(input, config, **kwargs):
+                emitido = True
+                yield fragmento
+        except Exception as e:
+            if not isinstance(e, CircuitoAbierto):
+                circuito.registrar(False)
+            if emitido:
+                raise
+            self._usar_respaldo(e)
+        except BaseException:
+            # Stream cortado (GeneratorExit, CancelledError): la prueba no se cuenta, pero se libera
+            if sonda:
+                circuito.liberar()
+            raise
+        else:
+            circuito.registrar(True)
+            return
+        yield from self.respaldo.stream(input, config, **kwargs)
+
+    async def _astream(self, input, config, **kwargs):
+        circuito = self.resiliencia.circuito
+        emitido = sonda = False
+        try:
+            sonda = circuito.permitir()
+            async for fragmento in self.principal.astream(input, config, **kwargs):
+                emitido = True
+                yield fragmento
+        except Exception as e:
+            if not isinstance(e, CircuitoAbierto):
+                circuito.registrar(False)
+            if emitido:
+                raise
+            self._usar_respaldo(e)
+        except BaseException:
+            # Stream cortado (GeneratorExit, CancelledError): la prueba no se cuenta, pero se libera
+            if sonda:
+                circuito.liberar()
+            raise
+        else:
+            circuito.registrar(True)
+            return
+        async for fragmento in self.respaldo.astream(input, config, **kwargs):
+            yield fragmento
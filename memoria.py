@@ -0,0 +1,436 @@
+# memoria.py - Memoria persistente compartida por el CLI y la API
+import asyncio
+import functools
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import config
+import metricas
+import resumen_historial
+from almacenamiento import crear_almacenamiento
+from coleccion import ColeccionArticulos, a_segundos
+from registro_etiquetas import RegistroEtiquetas, clave_etiqueta
+
+
+def limites_fecha(desde=None, hasta=None):
+    """Convierte días inclusivos (YYYY-MM-DD) en límites [inicio, fin) sobre fecha_guardado"""
+    inicio = desde.isoformat() if isinstance(desde, date) else desde
+    fin = None
+    if hasta is not None:
+        dia = hasta if isinstance(hasta, date) else date.fromisoformat(hasta)
+        fin = (dia + timedelta(days=1)).isoformat()
+    return inicio, fin
+
+
+class MemoriaPersistente:
+    """Herramienta de memoria persistente en JSON"""
+
+    def __init__(self, archivo=None, almacenamiento=None):
+        self.archivo = archivo or config.ARCHIVO_MEMORIA
+        self.almacenamiento = almacenamiento or crear_almacenamiento(self.archivo)
+        self.suscriptores = []
+        # Sube con cada mutación; las respuestas HTTP cacheadas se invalidan con ella
+        self.version = 0
+        self.etiquetas = RegistroEtiquetas()
+        self._detener_vigilancia = threading.Event()
+        # Último límite con el que se podó el resumen: solo cambia una vez al día
+        self._resumen_podado_hasta = None
+        self.datos = self.cargar_memoria()
+
+    def cargar_memoria(self):
+        """Carga la instantánea y reproduce las operaciones pendientes"""
+        try:
+            datos, operaciones = self.almacenamiento.cargar()
+        except Exception as e:
+            print(f"Error al cargar memoria: {e}")
+            datos, operaciones = None, ()
+        if datos is None:
+            datos = self.estructura_inicial()
+        return self._preparar(datos, operaciones)
+
+    def _preparar(self, datos, operaciones=()):
+        """Compacta los artículos de unos datos recién leídos, reproduce lo pendiente y completa los derivados"""
+        leidos = datos["articulos_guardados"]
+        # Lo leído del JSON se pasa a columnas y la lista de dicts se libera
+        datos["articulos_guardados"] = ColeccionArticulos(leidos)
+        # Memorias anteriores al resumen: se calcula una vez con el historial que traigan
+        if "resumen_historial" not in datos:
+            datos["resumen_historial"] = resumen_historial.construir(datos["historial_busquedas"])
+        for operacion in operaciones:
+            self.aplicar_operacion(datos, operacion)
+        # Memorias anteriores no guardaban el contador: se parte del id más alto
+        datos["ultimo_id"] = max(datos.get("ultimo_id", 0), datos["articulos_guardados"].ultimo_id())
+        # La lista guardada puede traer etiquetas huérfanas de versiones anteriores.
+        # Sin operaciones pendientes los dicts leídos ya son el estado final y salen más baratos
+        self.etiquetas.construir(datos["articulos_guardados"].etiquetas_por_articulo() if operaciones else leidos)
+        datos["etiquetas"] = self.etiquetas.lista()
+        return datos
+
+    def estructura_inicial(self):
+        """Estructura inicial de la memoria"""
+        return {
+            "historial_busquedas": [],
+            # {día: {consulta: [cuenta, primera, última]}}: lo que cuentan las tendencias
+            "resumen_historial": {},
+            "articulos_guardados": [],
+            "etiquetas": [],
+            "ultimo_id": 0,
+            "preferencias": {
+                "temas_favoritos": [],
+                "idioma_preferido": "español"
+            },
+            "estadisticas": {
+                "total_busquedas": 0,
+                "total_articulos_guardados": 0
+            }
+        }
+
+    def guardar_memoria(self):
+        """Guarda la memoria completa"""
+        with self._escritura(), self.almacenamiento.bloqueo, metricas.ETAPAS.cronometro(etapa="persistencia"):
+            return self.almacenamiento.guardar(self.datos)
+
+    def vaciar(self):
+        """Escribe ya lo pendiente de la escritura diferida"""
+        return self.almacenamiento.vaciar()
+
+    def cerrar(self):
+        """Sincroniza y libera el almacenamiento"""
+        self._detener_vigilancia.set()
+        self.almacenamiento.cerrar()
+
+    # ==================== VARIOS PROCESOS ====================
+    @contextmanager
+    def _escritura(self):
+        """Exclusión frente a otros procesos con los datos ya al día.
+
+        Toda mutación pasa por aquí: con el bloqueo de escritura tomado se
+        incorpora primero lo que hayan escrito otros workers, así los ids se
+        asignan sobre el último contador y nada se pisa.
+        """
+        with self.almacenamiento.bloqueo_escritura:
+            self._sincronizar_externo()
+            yield
+
+    def _sincronizar_externo(self):
+        cambios = self.almacenamiento.cambios_externos()
+        if not cambios:
+            return False
+        with self.almacenamiento.bloqueo:
+            if isinstance(cambios, tuple):
+                # Recarga completa (el archivo JSON cambió o el diario se rotó
+                # sin que lo leyéramos): se deducen las altas y bajas
+                cambios, pendientes = cambios
+                anteriores = set(self.datos["articulos_guardados"].ids)
+                nuevos = self._preparar(cambios, pendientes)["articulos_guardados"]
+                actuales = set(nuevos.ids)
+                operaciones = [{"op": "eliminar_articulo", "id": i} for i in sorted(anteriores - actuales)]
+                operaciones += [{"op": "articulo", "articulo": nuevos[p]}
+                                for p, i in enumerate(nuevos.ids) if i not in anteriores]
+                self.datos = cambios
+            else:
+                operaciones = cambios
+                for operacion in operaciones:
+                    self.aplicar_operacion(self.datos, operacion)
+                    self._actualizar_etiquetas(operacion)
+            self.version += 1
+            self._notificar(operaciones)
+        return True
+
+    def refrescar(self):
+        """Incorpora lo que hayan escrito otros procesos; retorna True si había algo"""
+        if not self.almacenamiento.hay_cambios_externos():
+            return False
+        with self.almacenamiento.bloqueo_escritura:
+            return self._sincronizar_externo()
+
+    def vigilar(self, intervalo=None):
+        """Refresca en segundo plano cada `intervalo` segundos (varios workers de uvicorn)"""
+        intervalo = intervalo or config.MEMORIA_INTERVALO_REFRESCO
+
+        def bucle():
+            while not self._detener_vigilancia.wait(intervalo):
+                try:
+                    self.refrescar()
+                except Exception as e:
+                    print(f"Error al refrescar memoria: {e}")
+
+        threading.Thread(target=bucle, name="vigilancia-memoria", daemon=True).start()
+
+    # ==================== OPERACIONES ====================
+    @staticmethod
+    def aplicar_operacion(datos, operacion):
+        """Aplica una mutación sobre los datos (en vivo o al reproducir el diario).
+
+        La lista de etiquetas no se toca aquí: la mantiene el registro de
+        etiquetas en `_registrar` y se reconstruye al cargar. El resumen del
+        historial sí: cada búsqueda se suma al registrarse y la poda solo
+        quita búsquedas sueltas que ya están contadas en él.
+        """
+        tipo = operacion["op"]
+        if tipo == "busqueda":
+            datos["historial_busquedas"].append(operacion["busqueda"])
+            resumen_historial.acumular(datos["resumen_historial"], operacion["busqueda"])
+            datos["estadisticas"]["total_busquedas"] += 1
+        elif tipo == "articulo":
+            articulo = operacion["articulo"]
+            datos["articulos_guardados"].agregar(articulo)
+            datos["estadisticas"]["total_articulos_guardados"] += 1
+            datos["ultimo_id"] = max(datos.get("ultimo_id", 0), articulo["id"])
+        elif tipo == "articulos":
+            for articulo in operacion["articulos"]:
+                datos["articulos_guardados"].agregar(articulo)
+            datos["estadisticas"]["total_articulos_guardados"] += len(operacion["articulos"])
+            datos["ultimo_id"] = max([datos.get("ultimo_id", 0)] + [a["id"] for a in operacion["articulos"]])
+        elif tipo == "eliminar_articulo":
+            datos["articulos_guardados"].eliminar(operacion["id"])
+            datos["estadisticas"]["total_articulos_guardados"] = len(datos["articulos_guardados"])
+        elif tipo == "eliminar_busqueda":
+            busqueda = datos["historial_busquedas"].pop(operacion["indice"])
+            resumen_historial.acumular(datos["resumen_historial"], busqueda, -1)
+            # Cuenta también las podadas: no puede bajarse al número de búsquedas sueltas
+            datos["estadisticas"]["total_busquedas"] = max(datos["estadisticas"]["total_busquedas"] - 1, 0)
+        elif tipo == "podar_historial":
+            del datos["historial_busquedas"][:operacion["cantidad"]]
+            if operacion.get("resumen_hasta"):
+                resumen_historial.podar_resumen(datos["resumen_historial"], operacion["resumen_hasta"])
+        elif tipo == "limpiar_historial":
+            datos["historial_busquedas"] = []
+            datos["resumen_historial"] = {}
+            datos["estadisticas"]["total_busquedas"] = 0
+        else:
+            raise ValueError(f"Operación desconocida: '{tipo}'")
+
+    def suscribir(self, funcion):
+        """Registra una función que recibe cada operación aplicada (índices, cachés)"""
+        self.suscriptores.append(funcion)
+
+    def _registrar(self, operacion):
+        """Aplica la operación en memoria, la persiste y notifica a los suscriptores"""
+        with self._escritura(), self.almacenamiento.bloqueo:
+            self.aplicar_operacion(self.datos, operacion)
+            self._actualizar_etiquetas(operacion)
+            with metricas.ETAPAS.cronometro(etapa="persistencia"):
+                exito = self.almacenamiento.registrar(operacion, self.datos)
+            self.version += 1
+            self._notificar([operacion])
+            return exito
+
+    def _notificar(self, operaciones):
+        # Los suscriptores reciben las altas de un lote como altas sueltas
+        for operacion in operaciones:
+            simples = ([{"op": "articulo", "articulo": a} for a in operacion["articulos"]]
+                       if operacion["op"] == "articulos" else [operacion])
+            for simple in simples:
+                for funcion in self.suscriptores:
+                    funcion(simple)
+
+    def _actualizar_etiquetas(self, operacion):
+        if operacion["op"] == "articulo":
+            self.datos["etiquetas"].extend(self.etiquetas.agregar(operacion["articulo"]))
+        elif operacion["op"] == "articulos":
+            self.datos["etiquetas"].extend(self.etiquetas.agregar_varios(operacion["articulos"]))
+        elif operacion["op"] == "eliminar_articulo" and self.etiquetas.eliminar(operacion["id"]):
+            self.datos["etiquetas"] = self.etiquetas.lista()
+
+    def agregar_busqueda(self, query, resultados):
+        """Registra una búsqueda en el historial (las vacías no); retorna si se registró"""
+        if not query or not query.strip():
+            return False
+        busqueda = {
+            "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "query": query,
+            "num_resultados": resultados
+        }
+        with self._escritura():
+            self._registrar({"op": "busqueda", "busqueda": busqueda})
+            self.podar_historial()
+        return True
+
+    def podar_historial(self):
+        """Quita las búsquedas sueltas que pasan de HISTORIAL_MAX_ENTRADAS o HISTORIAL_MAX_DIAS.
+
+        Ya están sumadas en el resumen, así que las tendencias no cambian.
+        Del resumen se quitan los días anteriores a HISTORIAL_RESUMEN_DIAS.
+        Retorna cuántas búsquedas se podaron.
+        """
+        with self._escritura():
+            cantidad = resumen_historial.a_podar(self.datos["historial_busquedas"])
+            operacion = {"op": "podar_historial", "cantidad": cantidad}
+            hasta = resumen_historial.limite_resumen()
+            if hasta is not None and hasta != self._resumen_podado_hasta:
+                if any(dia < hasta for dia in self.datos["resumen_historial"]):
+                    operacion["resumen_hasta"] = hasta
+                self._resumen_podado_hasta = hasta
+            if cantidad or "resumen_hasta" in operacion:
+                self._registrar(operacion)
+        return cantidad
+
+    def guardar_articulo(self, titulo, resumen, etiquetas, url=None):
+        """Guarda un artículo en la colección"""
+        with self._escritura():
+            # Contador monótono: un id no se reutiliza aunque se borre el último artículo
+            articulo = {
+                "id": self.datos["ultimo_id"] + 1,
+                "fecha_guardado": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "titulo": titulo,
+                "resumen": resumen,
+                "etiquetas": etiquetas,
+                "url": url
+            }
+            self._registrar({"op": "articulo", "articulo": articulo})
+        return articulo["id"]
+
+    def guardar_articulos(self, articulos):
+        """Guarda un lote de artículos (dicts con titulo, resumen, etiquetas y url) en una sola operación.
+
+        Los ids se asignan en bloque y el lote se persiste de una vez (una
+        línea del diario o una escritura del JSON). Retorna los ids.
+        """
+        if not articulos:
+            return []
+        with self._escritura():
+            primero = self.datos["ultimo_id"] + 1
+            fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            lote = [{
+                "id": primero + posicion,
+                "fecha_guardado": fecha,
+                "titulo": articulo["titulo"],
+                "resumen": articulo["resumen"],
+                "etiquetas": articulo["etiquetas"],
+                "url": articulo.get("url")
+            } for posicion, articulo in enumerate(articulos)]
+            self._registrar({"op": "articulos", "articulos": lote})
+        return [articulo["id"] for articulo in lote]
+
+    def obtener_estadisticas(self):
+        """Retorna estadísticas de uso"""
+        return self.datos["estadisticas"]
+
+    def buscar_por_etiqueta(self, etiqueta):
+        """Busca artículos por etiqueta"""
+        articulos = (self.obtener_articulo(i) for i in sorted(self.etiquetas.ids_de(etiqueta)))
+        return [art for art in articulos if art is not None]
+
+    def obtener_articulos(self):
+        """Secuencia de solo lectura: cada artículo se materializa como dict al leerlo"""
+        return self.datos["articulos_guardados"]
+
+    def obtener_articulo(self, id_articulo):
+        """Artículo por id o None"""
+        with self.almacenamiento.bloqueo:
+            return self.datos["articulos_guardados"].obtener(id_articulo)
+
+    def pagina_articulos(self, limite=20, cursor=None, descendente=False,
+                         etiqueta=None, desde=None, hasta=None):
+        """Página de artículos ordenada por id (y por tanto por fecha de guardado).
+
+        `cursor` es el último id de la página anterior. Retorna (artículos,
+        siguiente cursor o None). Los límites se buscan con bisect sobre las
+        columnas de ids y fechas; solo el filtro por etiqueta recorre ids más
+        allá de la página, y solo se materializan los artículos devueltos.
+        Si las fechas no crecen con el id (importadas o editadas a mano) el
+        rango de fechas se filtra recorriendo en vez de con bisect.
+        """
+        with self.almacenamiento.bloqueo:
+            articulos = self.datos["articulos_guardados"]
+            ids = articulos.ids
+            inicio, fin = 0, len(articulos)
+            fecha_inicio, fecha_fin = limites_fecha(desde, hasta)
+            rango = None
+            if articulos.fechas_ordenadas:
+                if fecha_inicio is not None:
+                    inicio = articulos.posicion_fecha(fecha_inicio)
+                if fecha_fin is not None:
+                    fin = articulos.posicion_fecha(fecha_fin)
+            elif fecha_inicio is not None or fecha_fin is not None:
+                rango = (a_segundos(fecha_inicio) if fecha_inicio is not None else float("-inf"),
+                         a_segundos(fecha_fin) if fecha_fin is not None else float("inf"))
+            if cursor is not None and descendente:
+                fin = min(fin, articulos.posicion_id(cursor))
+            elif cursor is not None:
+                inicio = max(inicio, articulos.posicion_id(cursor, despues=True))
+
+            posiciones = range(fin - 1, inicio - 1, -1) if descendente else range(inicio, fin)
+            # El registro solo cambia bajo este mismo bloqueo: se consulta sin copiar
+            buscada = self.etiquetas.ids.get(clave_etiqueta(etiqueta)) if etiqueta else None
+            if etiqueta and buscada is None:
+                return [], None
+            pagina = []
+            for posicion in posiciones:
+                if buscada is not None and ids[posicion] not in buscada:
+                    continue
+                if rango is not None and not rango[0] <= articulos.segundos(posicion) < rango[1]:
+                    continue
+                if len(pagina) == limite:
+                    return pagina, pagina[-1]["id"]
+                pagina.append(articulos[posicion])
+            return pagina, None
+
+    def obtener_historial(self, limite=10):
+        return self.datos["historial_busquedas"][-limite:]
+
+    def pagina_historial(self, limite=10, desplazamiento=0):
+        """Búsquedas de la más reciente a la más antigua; cada una lleva su índice para borrarla"""
+        with self.almacenamiento.bloqueo:
+            historial = self.datos["historial_busquedas"]
+            total = len(historial)
+            indices = range(total - 1 - desplazamiento, max(total - 1 - desplazamiento - limite, -1), -1)
+            return [{**historial[i], "indice": i} for i in indices], total
+
+    def tendencias_historial(self, dias=7, limite=10):
+        """Consultas más buscadas en los últimos `dias` días, leídas del resumen"""
+        with self.almacenamiento.bloqueo:
+            return resumen_historial.tendencias(self.datos["resumen_historial"], dias, limite)
+
+    def obtener_etiquetas(self):
+        return self.etiquetas.lista()
+
+    def eliminar_articulo(self, id_articulo):
+        """Elimina un artículo por ID"""
+        self._registrar({"op": "eliminar_articulo", "id": id_articulo})
+        return True
+
+    def eliminar_busqueda(self, index):
+        """Elimina una búsqueda por índice"""
+        with self._escritura():
+            if 0 <= index < len(self.datos["historial_busquedas"]):
+                self._registrar({"op": "eliminar_busqueda", "indice": index})
+                return True
+        return False
+
+    def limpiar_historial(self):
+        """Limpia todo el historial"""
+        self._registrar({"op": "limpiar_historial"})
+        return True
+
+
+def crear_memoria(motor=None):
+    """Crea la memoria con el motor configurado en CURADOR_ALMACENAMIENTO"""
+    motor = motor or config.ALMACENAMIENTO
+    if motor == "sqlite":
+        from memoria_sqlite import MemoriaSQLite
+        return MemoriaSQLite()
+    return MemoriaPersistente(almacenamiento=crear_almacenamiento(config.ARCHIVO_MEMORIA, motor))
+
+
+class EscritorAsync:
+    """Serializa las mutaciones de la memoria en un hilo dedicado.
+
+    Los manejadores async esperan la escritura sin bloquear el bucle de
+    eventos y sin ocupar hilos del pool de Starlette.
+    """
+
+    def __init__(self, memoria):
+        self.memoria = memoria
+        self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="escritor-memoria")
+
+    async def ejecutar(self, metodo, *args, **kwargs):
+        """Ejecuta un método de la memoria en el hilo escritor y retorna su resultado"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._ejecutor, functools.partial(metodo, *args, **kwargs))
+
+    def cerrar(self):
+        self._ejecutor.shutdown(wait=True)
@@ -0,0 +1,591 @@
+# memoria_sqlite.py - MemoriaPersistente sobre SQLite (tablas normalizadas e índices)
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import config
+import metricas
+import resumen_historial
+from memoria import limites_fecha
+from registro_etiquetas import RegistroEtiquetas
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS articulos (
+    id INTEGER PRIMARY KEY,
+    fecha_guardado TEXT NOT NULL,
+    titulo TEXT NOT NULL,
+    resumen TEXT NOT NULL,
+    url TEXT
+);
+CREATE TABLE IF NOT EXISTS etiquetas (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE,
+    nombre_min TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS articulo_etiquetas (
+    articulo_id INTEGER NOT NULL REFERENCES articulos(id) ON DELETE CASCADE,
+    posicion INTEGER NOT NULL,
+    etiqueta_id INTEGER NOT NULL REFERENCES etiquetas(id),
+    PRIMARY KEY (articulo_id, posicion)
+);
+CREATE TABLE IF NOT EXISTS busquedas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha TEXT NOT NULL,
+    query TEXT NOT NULL,
+    num_resultados INTEGER NOT NULL
+);
+-- Búsquedas por día y consulta normalizada: sobrevive a la poda de busquedas
+CREATE TABLE IF NOT EXISTS busquedas_resumen (
+    dia TEXT NOT NULL,
+    query TEXT NOT NULL,
+    cuenta INTEGER NOT NULL,
+    primera TEXT NOT NULL,
+    ultima TEXT NOT NULL,
+    PRIMARY KEY (dia, query)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS estadisticas (
+    clave TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS secuencias (
+    nombre TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_etiquetas_nombre_min ON etiquetas(nombre_min);
+CREATE INDEX IF NOT EXISTS idx_articulos_fecha ON articulos(fecha_guardado);
+CREATE INDEX IF NOT EXISTS idx_articulo_etiquetas_etiqueta ON articulo_etiquetas(etiqueta_id, articulo_id);
+INSERT OR IGNORE INTO estadisticas (clave, valor) VALUES ('total_busquedas', 0);
+INSERT OR IGNORE INTO estadisticas (clave, valor) VALUES ('total_articulos_guardados', 0);
+INSERT OR IGNORE INTO secuencias (nombre, valor) VALUES ('articulos', 0);
+"""
+
+
+class MemoriaSQLite:
+    """Memoria persistente en SQLite con la misma interfaz que MemoriaPersistente.
+
+    Varios procesos pueden abrir la misma base: cada escritura es una
+    transacción IMMEDIATE (SQLite la serializa y espera hasta `timeout`), y
+    `refrescar` detecta con `PRAGMA data_version` lo que confirmaron los demás.
+    """
+
+    def __init__(self, archivo=None):
+        self.archivo = archivo or config.ARCHIVO_SQLITE
+        self.bloqueo = threading.RLock()
+        self.suscriptores = []
+        self.version = 0
+        self._detener_vigilancia = threading.Event()
+        # IMMEDIATE: la transacción toma el bloqueo de escritura al empezar, no al primer cambio
+        self.conexion = sqlite3.connect(self.archivo, check_same_thread=False, timeout=30,
+                                        isolation_level="IMMEDIATE")
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute("PRAGMA foreign_keys=ON")
+        with self.conexion:
+            self.conexion.executescript(ESQUEMA)
+        with self.conexion:
+            # Bases anteriores al resumen: se calcula una vez con las búsquedas que tengan
+            if not self.conexion.execute("SELECT EXISTS (SELECT 1 FROM busquedas_resumen)").fetchone()[0]:
+                self._insertar_resumen(resumen_historial.construir(
+                    dict(fila) for fila in self.conexion.execute("SELECT fecha, query FROM busquedas ORDER BY id")))
+        self.etiquetas = RegistroEtiquetas()
+        self.etiquetas.construir(self._articulos())
+        self._ids = {fila[0] for fila in self.conexion.execute("SELECT id FROM articulos")}
+        self._version_datos = self._data_version()
+
+    def guardar_memoria(self):
+        """Cada mutación ya se confirma en su propia transacción"""
+        return True
+
+    def vaciar(self):
+        return True
+
+    def suscribir(self, funcion):
+        """Registra una función que recibe cada operación confirmada (índices, cachés)"""
+        self.suscriptores.append(funcion)
+
+    def _notificar(self, operacion):
+        self.version += 1
+        for funcion in self.suscriptores:
+            funcion(operacion)
+
+    def cerrar(self):
+        """Cierra la conexión a la base de datos"""
+        self._detener_vigilancia.set()
+        with self.bloqueo:
+            self.conexion.close()
+
+    @contextmanager
+    def _transaccion(self):
+        """Transacción de escritura, medida en la etapa "persistencia" (incluye el commit)"""
+        with metricas.ETAPAS.cronometro(etapa="persistencia"), self.conexion:
+            yield
+
+    # ==================== VARIOS PROCESOS ====================
+    def _data_version(self):
+        return self.conexion.execute("PRAGMA data_version").fetchone()[0]
+
+    def refrescar(self):
+        """Incorpora lo que hayan confirmado otros procesos; retorna True si había algo"""
+        with self.bloqueo:
+            version_datos = self._data_version()
+            if version_datos == self._version_datos:
+                return False
+            self._version_datos = version_datos
+            # Lo normal es que solo haya altas (ids por encima del último conocido);
+            # el recorrido completo de ids solo hace falta si además hubo bajas
+            maximo = max(self._ids, default=0)
+            nuevos = [fila[0] for fila in self.conexion.execute(
+                "SELECT id FROM articulos WHERE id > ? ORDER BY id", (maximo,))]
+            actuales = self._ids.union(nuevos)
+            if self.conexion.execute("SELECT COUNT(*) FROM articulos").fetchone()[0] != len(actuales):
+                actuales = {fila[0] for fila in self.conexion.execute("SELECT id FROM articulos")}
+                nuevos = sorted(actuales - self._ids)
+            operaciones = [{"op": "eliminar_articulo", "id": i} for i in sorted(self._ids - actuales)]
+            for inicio in range(0, len(nuevos), 900):
+                tramo = nuevos[inicio:inicio + 900]
+                operaciones += [{"op": "articulo", "articulo": articulo} for articulo in
+                                self._articulos(f"WHERE a.id IN ({','.join('?' * len(tramo))})", tramo)]
+            for operacion in operaciones:
+                if operacion["op"] == "articulo":
+                    self.etiquetas.agregar(operacion["articulo"])
+                else:
+                    self.etiquetas.eliminar(operacion["id"])
+            self._ids = actuales
+            # También cambia si solo hubo búsquedas: las respuestas cacheadas se invalidan igual
+            self.version += 1
+            for operacion in operaciones:
+                for funcion in self.suscriptores:
+                    funcion(operacion)
+            return True
+
+    def vigilar(self, intervalo=None):
+        """Refresca en segundo plano cada `intervalo` segundos (varios workers de uvicorn)"""
+        intervalo = intervalo or config.MEMORIA_INTERVALO_REFRESCO
+
+        def bucle():
+            while not self._detener_vigilancia.wait(intervalo):
+                try:
+                    self.refrescar()
+                except Exception as e:
+                    print(f"Error al refrescar memoria: {e}")
+
+        threading.Thread(target=bucle, name="vigilancia-memoria", daemon=True).start()
+
+    # ==================== ESCRITURA ====================
+    def _id_etiqueta(self, etiqueta):
+        self.conexion.execute(
+            "INSERT OR IGNORE INTO etiquetas (nombre, nombre_min) VALUES (?, ?)",
+            (etiqueta, etiqueta.lower())
+        )
+        return self.conexion.execute(
+            "SELECT id FROM etiquetas WHERE nombre = ?", (etiqueta,)
+        ).fetchone()[0]
+
+    def _incrementar(self, clave, cantidad=1):
+        self.conexion.execute(
+            "UPDATE estadisticas SET valor = valor + ? WHERE clave = ?", (cantidad, clave)
+        )
+
+    def _fijar(self, clave, tabla):
+        self.conexion.execute(
+            f"UPDATE estadisticas SET valor = (SELECT COUNT(*) FROM {tabla}) WHERE clave = ?",
+            (clave,)
+        )
+
+    def _asignar_id(self, cantidad=1):
+        """Primer id de un bloque de `cantidad` artículos; monótono aunque se borre el último (requiere transacción)"""
+        return self.conexion.execute(
+            """UPDATE secuencias SET valor = max(valor, (SELECT COALESCE(MAX(id), 0) FROM articulos)) + ?
+               WHERE nombre = 'articulos' RETURNING valor""", (cantidad,)
+        ).fetchone()[0] - cantidad + 1
+
+    def _insertar_articulo(self, articulo):
+        cursor = self.conexion.execute(
+            "INSERT INTO articulos (id, fecha_guardado, titulo, resumen, url) VALUES (?, ?, ?, ?, ?)",
+            (articulo.get("id"), articulo["fecha_guardado"], articulo["titulo"],
+             articulo["resumen"], articulo.get("url"))
+        )
+        self._ids.add(cursor.lastrowid)
+        self.conexion.executemany(
+            "INSERT INTO articulo_etiquetas (articulo_id, posicion, etiqueta_id) VALUES (?, ?, ?)",
+            [(cursor.lastrowid, posicion, self._id_etiqueta(etiqueta))
+             for posicion, etiqueta in enumerate(articulo["etiquetas"])]
+        )
+        return cursor.lastrowid
+
+    def _insertar_articulos(self, articulos):
+        """Inserta artículos con id ya asignado: las etiquetas se dan de alta y se resuelven una vez por lote"""
+        nombres = list(dict.fromkeys(e for articulo in articulos for e in articulo["etiquetas"]))
+        self.conexion.executemany(
+            "INSERT OR IGNORE INTO etiquetas (nombre, nombre_min) VALUES (?, ?)",
+            [(nombre, nombre.lower()) for nombre in nombres]
+        )
+        ids_etiquetas = {}
+        for inicio in range(0, len(nombres), 900):
+            tramo = nombres[inicio:inicio + 900]
+            ids_etiquetas.update((fila[1], fila[0]) for fila in self.conexion.execute(
+                f"SELECT id, nombre FROM etiquetas WHERE nombre IN ({','.join('?' * len(tramo))})", tramo))
+        self.conexion.executemany(
+            "INSERT INTO articulos (id, fecha_guardado, titulo, resumen, url) VALUES (?, ?, ?, ?, ?)",
+            [(a["id"], a["fecha_guardado"], a["titulo"], a["resumen"], a.get("url")) for a in articulos]
+        )
+        self.conexion.executemany(
+            "INSERT INTO articulo_etiquetas (articulo_id, posicion, etiqueta_id) VALUES (?, ?, ?)",
+            [(articulo["id"], posicion, ids_etiquetas[etiqueta])
+             for articulo in articulos for posicion, etiqueta in enumerate(articulo["etiquetas"])]
+        )
+        self._ids.update(articulo["id"] for articulo in articulos)
+
+    def _insertar_resumen(self, resumen):
+        """Vuelca un resumen de resumen_historial (horas por día) con las fechas completas"""
+        self.conexion.executemany(
+            "INSERT OR REPLACE INTO busquedas_resumen (dia, query, cuenta, primera, ultima) VALUES (?, ?, ?, ?, ?)",
+            [(dia, clave, cuenta, f"{dia} {primera}", f"{dia} {ultima}")
+             for dia, consultas in resumen.items() for clave, (cuenta, primera, ultima) in consultas.items()]
+        )
+
+    def _acumular(self, busqueda, cantidad=1):
+        """Suma (o resta) una búsqueda en busquedas_resumen, como resumen_historial.acumular"""
+        clave = resumen_historial.clave_consulta(busqueda["query"])
+        if not clave:
+            return
+        dia = busqueda["fecha"][:10]
+        if cantidad > 0:
+            self.conexion.execute(
+                """INSERT INTO busquedas_resumen (dia, query, cuenta, primera, ultima) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (dia, query) DO UPDATE SET cuenta = cuenta + excluded.cuenta,
+                   primera = MIN(primera, excluded.primera), ultima = MAX(ultima, excluded.ultima)""",
+                (dia, clave, cantidad, busqueda["fecha"], busqueda["fecha"])
+            )
+        else:
+            self.conexion.execute(
+                "UPDATE busquedas_resumen SET cuenta = cuenta + ? WHERE dia = ? AND query = ?", (cantidad, dia, clave)
+            )
+            self.conexion.execute(
+                "DELETE FROM busquedas_resumen WHERE dia = ? AND query = ? AND cuenta <= 0", (dia, clave)
+            )
+
+    def _podar(self):
+        """Borra las búsquedas sueltas que sobran por número o antigüedad (requiere transacción)"""
+        total = self.conexion.execute("SELECT COUNT(*) FROM busquedas").fetchone()[0]
+        podadas = 0
+        cantidad = resumen_historial.cuantas_podar(total)
+        if cantidad:
+            podadas += self.conexion.execute(
+                "DELETE FROM busquedas WHERE id IN (SELECT id FROM busquedas ORDER BY id LIMIT ?)", (cantidad,)
+            ).rowcount
+        limite = resumen_historial.limite_antiguedad()
+        if limite is not None:
+            podadas += self.conexion.execute("DELETE FROM busquedas WHERE fecha < ?", (limite,)).rowcount
+        hasta = resumen_historial.limite_resumen()
+        if hasta is not None:
+            # Recorre la clave primaria (dia, query): sin días viejos no cuesta nada
+            self.conexion.execute("DELETE FROM busquedas_resumen WHERE dia < ?", (hasta,))
+        return podadas
+
+    def agregar_busqueda(self, query, resultados):
+        """Registra una búsqueda en el historial (las vacías no); retorna si se registró"""
+        if not query or not query.strip():
+            return False
+        busqueda = {
+            "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "query": query,
+            "num_resultados": resultados
+        }
+        with self.bloqueo:
+            with self._transaccion():
+                self.conexion.execute(
+                    "INSERT INTO busquedas (fecha, query, num_resultados) VALUES (?, ?, ?)",
+                    (busqueda["fecha"], query, resultados)
+                )
+                self._incrementar("total_busquedas")
+                self._acumular(busqueda)
+                podadas = self._podar()
+            self._notificar({"op": "busqueda", "busqueda": busqueda})
+            if podadas:
+                self._notificar({"op": "podar_historial", "cantidad": podadas})
+        return True
+
+    def podar_historial(self):
+        """Quita las búsquedas sueltas que pasan de HISTORIAL_MAX_ENTRADAS o HISTORIAL_MAX_DIAS y los días viejos del resumen"""
+        with self.bloqueo:
+            with self._transaccion():
+                podadas = self._podar()
+            if podadas:
+                self._notificar({"op": "podar_historial", "cantidad": podadas})
+        return podadas
+
+    def guardar_articulo(self, titulo, resumen, etiquetas, url=None):
+        """Guarda un artículo en la colección"""
+        articulo = {
+            "id": None,
+            "fecha_guardado": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "titulo": titulo,
+            "resumen": resumen,
+            "etiquetas": etiquetas,
+            "url": url
+        }
+        with self.bloqueo:
+            self.refrescar()
+            with self._transaccion():
+                articulo["id"] = self._asignar_id()
+                self._insertar_articulo(articulo)
+                self._incrementar("total_articulos_guardados")
+            self.etiquetas.agregar(articulo)
+            self._notificar({"op": "articulo", "articulo": articulo})
+        return articulo["id"]
+
+    def guardar_articulos(self, articulos):
+        """Guarda un lote de artículos en una sola transacción, con los ids asignados en bloque"""
+        if not articulos:
+            return []
+        fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        lote = [{
+            "id": None,
+            "fecha_guardado": fecha,
+            "titulo": articulo["titulo"],
+            "resumen": articulo["resumen"],
+            "etiquetas": articulo["etiquetas"],
+            "url": articulo.get("url")
+        } for articulo in articulos]
+        with self.bloqueo:
+            self.refrescar()
+            with self._transaccion():
+                primero = self._asignar_id(len(lote))
+                for posicion, articulo in enumerate(lote):
+                    articulo["id"] = primero + posicion
+                self._insertar_articulos(lote)
+                self._incrementar("total_articulos_guardados", len(lote))
+            self.etiquetas.agregar_varios(lote)
+            for articulo in lote:
+                self._notificar({"op": "articulo", "articulo": articulo})
+        return [articulo["id"] for articulo in lote]
+
+    def eliminar_articulo(self, id_articulo):
+        """Elimina un artículo por ID"""
+        with self.bloqueo:
+            with self._transaccion():
+                ids_etiquetas = [fila[0] for fila in self.conexion.execute(
+                    "SELECT etiqueta_id FROM articulo_etiquetas WHERE articulo_id = ?", (id_articulo,)
+                )]
+                self.conexion.execute("DELETE FROM articulos WHERE id = ?", (id_articulo,))
+                self._ids.discard(id_articulo)
+                # Etiquetas que se quedaron sin artículos
+                self.conexion.executemany(
+                    """DELETE FROM etiquetas WHERE id = ? AND NOT EXISTS
+                       (SELECT 1 FROM articulo_etiquetas WHERE etiqueta_id = ?)""",
+                    [(i, i) for i in ids_etiquetas]
+                )
+                self._fijar("total_articulos_guardados", "articulos")
+            self.etiquetas.eliminar(id_articulo)
+            self._notificar({"op": "eliminar_articulo", "id": id_articulo})
+        return True
+
+    def eliminar_busqueda(self, index):
+        """Elimina una búsqueda por índice"""
+        if index < 0:
+            return False
+        with self.bloqueo:
+            with self._transaccion():
+                # La transacción IMMEDIATE ya tiene el bloqueo: otro proceso no puede desplazar el índice entre medias
+                fila = self.conexion.execute(
+                    "SELECT id, fecha, query FROM busquedas ORDER BY id LIMIT 1 OFFSET ?", (index,)
+                ).fetchone()
+                if fila is None:
+                    return False
+                self.conexion.execute("DELETE FROM busquedas WHERE id = ?", (fila["id"],))
+                self._acumular(dict(fila), -1)
+                # Cuenta también las podadas: no puede bajarse al número de filas
+                self._incrementar("total_busquedas", -1)
+            self._notificar({"op": "eliminar_busqueda", "indice": index})
+        return True
+
+    def limpiar_historial(self):
+        """Limpia todo el historial"""
+        with self.bloqueo:
+            with self._transaccion():
+                self.conexion.execute("DELETE FROM busquedas")
+                self.conexion.execute("DELETE FROM busquedas_resumen")
+                self.conexion.execute("UPDATE estadisticas SET valor = 0 WHERE clave = 'total_busquedas'")
+            self._notificar({"op": "limpiar_historial"})
+        return True
+
+    # ==================== LECTURA ====================
+    def _articulos(self, where="", parametros=(), orden="a.id", limite=-1):
+        with self.bloqueo:
+            filas = self.conexion.execute(
+                f"""SELECT id, fecha_guardado, titulo, resumen, url FROM articulos a {where}
+                    ORDER BY {orden} LIMIT ?""",
+                (*parametros, limite)
+            ).fetchall()
+            if not filas:
+                return []
+            ids = [fila["id"] for fila in filas]
+            etiquetas = {id_articulo: [] for id_articulo in ids}
+            # Por tramos para no superar el límite de parámetros de SQLite
+            for inicio in range(0, len(ids), 900):
+                tramo = ids[inicio:inicio + 900]
+                for fila in self.conexion.execute(
+                    f"""SELECT ae.articulo_id, e.nombre FROM articulo_etiquetas ae
+                        JOIN etiquetas e ON e.id = ae.etiqueta_id
+                        WHERE ae.articulo_id IN ({','.join('?' * len(tramo))})
+                        ORDER BY ae.articulo_id, ae.posicion""",
+                    tramo
+                ):
+                    etiquetas[fila[0]].append(fila[1])
+        return [
+            {
+                "id": fila["id"],
+                "fecha_guardado": fila["fecha_guardado"],
+                "titulo": fila["titulo"],
+                "resumen": fila["resumen"],
+                "etiquetas": etiquetas[fila["id"]],
+                "url": fila["url"]
+            }
+            for fila in filas
+        ]
+
+    def obtener_estadisticas(self):
+        """Retorna estadísticas de uso"""
+        with self.bloqueo:
+            return {clave: valor for clave, valor in
+                    self.conexion.execute("SELECT clave, valor FROM estadisticas")}
+
+    def buscar_por_etiqueta(self, etiqueta):
+        """Busca artículos por etiqueta"""
+        return self._articulos(
+            """WHERE a.id IN (SELECT ae.articulo_id FROM articulo_etiquetas ae
+                             JOIN etiquetas e ON e.id = ae.etiqueta_id
+                             WHERE e.nombre_min = ?)""",
+            (etiqueta.lower(),)
+        )
+
+    def obtener_articulos(self):
+        return self._articulos()
+
+    def obtener_articulo(self, id_articulo):
+        """Artículo por id o None"""
+        articulos = self._articulos("WHERE a.id = ?", (id_articulo,))
+        return articulos[0] if articulos else None
+
+    def pagina_articulos(self, limite=20, cursor=None, descendente=False,
+                         etiqueta=None, desde=None, hasta=None):
+        """Página de artículos por id con filtros resueltos por los índices de SQLite"""
+        condiciones, parametros = [], []
+        if cursor is not None:
+            condiciones.append("a.id < ?" if descendente else "a.id > ?")
+            parametros.append(cursor)
+        fecha_inicio, fecha_fin = limites_fecha(desde, hasta)
+        if fecha_inicio is not None:
+            condiciones.append("a.fecha_guardado >= ?")
+            parametros.append(fecha_inicio)
+        if fecha_fin is not None:
+            condiciones.append("a.fecha_guardado < ?")
+            parametros.append(fecha_fin)
+        if etiqueta:
+            condiciones.append("""a.id IN (SELECT ae.articulo_id FROM articulo_etiquetas ae
+                                  JOIN etiquetas e ON e.id = ae.etiqueta_id
+                                  WHERE e.nombre_min = ?)""")
+            parametros.append(etiqueta.lower())
+        where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+        # Se pide uno más para saber si hay página siguiente
+        articulos = self._articulos(where, parametros, "a.id DESC" if descendente else "a.id", limite + 1)
+        if len(articulos) > limite:
+            return articulos[:limite], articulos[limite - 1]["id"]
+        return articulos, None
+
+    def obtener_historial(self, limite=10):
+        with self.bloqueo:
+            if limite > 0:
+                filas = self.conexion.execute(
+                    """SELECT fecha, query, num_resultados FROM
+                       (SELECT * FROM busquedas ORDER BY id DESC LIMIT ?) ORDER BY id""",
+                    (limite,)
+                ).fetchall()
+            else:
+                filas = self.conexion.execute(
+                    "SELECT fecha, query, num_resultados FROM busquedas ORDER BY id"
+                ).fetchall()
+        return [dict(fila) for fila in filas]
+
+    def pagina_historial(self, limite=10, desplazamiento=0):
+        """Búsquedas de la más reciente a la más antigua; cada una lleva su índice para borrarla"""
+        with self.bloqueo:
+            # total_busquedas cuenta también las podadas; el historial suelto está acotado
+            total = self.conexion.execute("SELECT COUNT(*) FROM busquedas").fetchone()[0]
+            filas = self.conexion.execute(
+                "SELECT fecha, query, num_resultados FROM busquedas ORDER BY id DESC LIMIT ? OFFSET ?",
+                (limite, desplazamiento)
+            ).fetchall()
+        return [{**dict(fila), "indice": total - 1 - desplazamiento - i} for i, fila in enumerate(filas)], total
+
+    def tendencias_historial(self, dias=7, limite=10):
+        """Consultas más buscadas en los últimos `dias` días, leídas de busquedas_resumen"""
+        ventana = resumen_historial.ventana(dias)
+        with self.bloqueo:
+            filas = self.conexion.execute(
+                """SELECT query, SUM(cuenta) AS busquedas, COUNT(*) AS dias,
+                          MIN(primera) AS primera, MAX(ultima) AS ultima
+                   FROM busquedas_resumen WHERE dia BETWEEN ? AND ?
+                   GROUP BY query ORDER BY busquedas DESC, ultima DESC LIMIT ?""",
+                (ventana[-1], ventana[0], limite)
+            ).fetchall()
+        return [dict(fila) for fila in filas]
+
+    def obtener_etiquetas(self):
+        return self.etiquetas.lista()
+
+    # ==================== MIGRACIÓN ====================
+    def importar(self, datos):
+        """Importa una memoria con la estructura JSON en una base de datos vacía"""
+        with self.bloqueo, self.conexion:
+            if self.conexion.execute("SELECT EXISTS (SELECT 1 FROM articulos UNION ALL SELECT 1 FROM busquedas)").fetchone()[0]:
+                raise ValueError(f"La base de datos '{self.archivo}' ya contiene datos")
+            for etiqueta in datos.get("etiquetas", []):
+                self._id_etiqueta(etiqueta)
+            for articulo in datos.get("articulos_guardados", []):
+                self._insertar_articulo(articulo)
+            self.conexion.executemany(
+                "INSERT INTO busquedas (fecha, query, num_resultados) VALUES (?, ?, ?)",
+                [(b["fecha"], b["query"], b["num_resultados"]) for b in datos.get("historial_busquedas", [])]
+            )
+            self.conexion.execute("DELETE FROM busquedas_resumen")
+            self._insertar_resumen(datos.get("resumen_historial")
+                                   or resumen_historial.construir(datos.get("historial_busquedas", [])))
+            for clave, valor in datos.get("estadisticas", {}).items():
+                self.conexion.execute(
+                    "INSERT OR REPLACE INTO estadisticas (clave, valor) VALUES (?, ?)", (clave, valor)
+                )
+        self.etiquetas.construir(self._articulos())
+
+
+def migrar_desde_json(archivo_json=None, archivo_sqlite=None, motor=None):
+    """Importa de una sola vez la memoria JSON existente en SQLite"""
+    from almacenamiento import crear_almacenamiento
+    from memoria import MemoriaPersistente
+
+    archivo_json = archivo_json or config.ARCHIVO_MEMORIA
+    origen = MemoriaPersistente(archivo_json, crear_almacenamiento(archivo_json, motor or "json"))
+    destino = MemoriaSQLite(archivo_sqlite)
+    try:
+        destino.importar(origen.datos)
+        return len(origen.datos["articulos_guardados"]), len(origen.datos["historial_busquedas"])
+    finally:
+        origen.cerrar()
+        destino.cerrar()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migra curator_memory.json a SQLite")
+    parser.add_argument("origen", nargs="?", default=config.ARCHIVO_MEMORIA)
+    parser.add_argument("destino", nargs="?", default=config.ARCHIVO_SQLITE)
+    parser.add_argument("--motor", choices=["json", "diario"], default="json",
+                        help="Motor con el que se lee la memoria de origen")
+    args = parser.parse_args()
+
+    articulos, busquedas = migrar_desde_json(args.origen, args.destino, args.motor)
+    print(f"Migrados {articulos} artículos y {busquedas} búsquedas a {args.destino}")
@@ -0,0 +1,309 @@
+# metricas.py - Histogramas, contadores y medidores en formato de texto de Prometheus, y perfilador por muestreo
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import config
+
+# Segundos: de 1 ms (formatear un prompt, escribir un registro) a 2 min (plazo del LLM)
+CUBETAS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+CUBETAS_TOKENS = (16, 64, 256, 1024, 4096, 16384, 65536)
+CUBETAS_BYTES = (1 << 10, 1 << 14, 1 << 17, 1 << 20, 1 << 23, 1 << 26, 1 << 29)
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _etiquetas(nombres, valores, extra=""):
+    pares = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    """Base: nombre, ayuda, etiquetas y valores por combinación de etiquetas.
+
+    Con `funcion` el valor no se acumula en el camino caliente: se lee al
+    exportar (un número, o un dict {tupla de etiquetas: número}).
+    """
+
+    tipo = "untyped"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), funcion=None, registro=None):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.funcion = funcion
+        self.bloqueo = threading.Lock()
+        self.valores = {}
+        (registro or REGISTRO).registrar(self)
+
+    def _clave(self, etiquetas):
+        return tuple(str(etiquetas[nombre]) for nombre in self.etiquetas)
+
+    def _muestras(self):
+        if self.funcion is None:
+            with self.bloqueo:
+                return list(self.valores.items())
+        try:
+            valor = self.funcion()
+        except Exception:
+            return []
+        if valor is None:
+            return []
+        return list(valor.items()) if isinstance(valor, dict) else [((), valor)]
+
+    def exportar(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        for clave, valor in self._muestras():
+            lineas.append(f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}")
+        return lineas
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, cantidad=1, **etiquetas):
+        if not REGISTRO.activo:
+            return
+        clave = self._clave(etiquetas)
+        with self.bloqueo:
+            self.valores[clave] = self.valores.get(clave, 0) + cantidad
+
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def fijar(self, valor, **etiquetas):
+        with self.bloqueo:
+            self.valores[self._clave(etiquetas)] = valor
+
+    def sumar(self, cantidad=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self.bloqueo:
+            self.valores[clave] = self.valores.get(clave, 0) + cantidad
+
+    @contextmanager
+    def en_curso(self, **etiquetas):
+        """Suma 1 mientras dura el bloque"""
+        self.sumar(1, **etiquetas)
+        try:
+            yield
+        finally:
+            self.sumar(-1, **etiquetas)
+
+
+class Histograma(_Metrica):
+    """Cuenta observaciones por cubeta; al exportar se acumulan como pide Prometheus"""
+
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), cubetas=CUBETAS_SEGUNDOS, registro=None):
+        super().__init__(nombre, ayuda, etiquetas, registro=registro)
+        self.cubetas = tuple(cubetas)
+
+    def observar(self, valor, **etiquetas):
+        if not REGISTRO.activo:
+            return
+        clave = self._clave(etiquetas)
+        posicion = bisect.bisect_left(self.cubetas, valor)
+        with self.bloqueo:
+            serie = self.valores.get(clave)
+            if serie is None:
+                # [cuenta por cubeta (+Inf al final), suma, total]
+                serie = self.valores[clave] = [[0] * (len(self.cubetas) + 1), 0.0, 0]
+            serie[0][posicion] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    @contextmanager
+    def cronometro(self, **etiquetas):
+        """Observa los segundos que tarda el bloque (también si lanza una excepción)"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **etiquetas)
+
+    def exportar(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        with self.bloqueo:
+            series = [(clave, list(cuentas), suma, total) for clave, (cuentas, suma, total) in self.valores.items()]
+        for clave, cuentas, suma, total in series:
+            acumulado = 0
+            for limite, cuenta in zip(self.cubetas + (float("inf"),), cuentas):
+                acumulado += cuenta
+                le = f'le="{_numero(limite)}"'
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, le)} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {total}")
+        return lineas
+
+
+class Registro:
+    """Conjunto de métricas que se exportan juntas en /metrics"""
+
+    def __init__(self, activo=True):
+        self.activo = activo
+        self.metricas = {}
+        self.bloqueo = threading.Lock()
+
+    def registrar(self, metrica):
+        with self.bloqueo:
+            # Reimportar un módulo no duplica la métrica: se queda la última definición
+            self.metricas[metrica.nombre] = metrica
+
+    def exportar(self):
+        """Texto en el formato de exposición 0.0.4 de Prometheus"""
+        with self.bloqueo:
+            metricas = list(self.metricas.values())
+        lineas = []
+        for metrica in metricas:
+            lineas.extend(metrica.exportar())
+        return "\n".join(lineas) + "\n"
+
+
+REGISTRO = Registro(activo=config.METRICAS_ACTIVAS)
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+
+# ==================== MÉTRICAS DEL CAMINO CALIENTE ====================
+ETAPAS = Histograma("curador_etapa_segundos",
+                    "Duración de cada etapa de una petición: prompt, llm, persistencia, serializacion",
+                    etiquetas=("etapa",))
+TOKENS_LLM = Histograma("curador_llm_tokens", "Tokens por llamada al LLM (prompt o completion)",
+                        etiquetas=("tipo",), cubetas=CUBETAS_TOKENS)
+LLM_EN_CURSO = Medidor("curador_llm_en_curso", "Llamadas al LLM en curso")
+HTTP_SEGUNDOS = Histograma("curador_http_segundos", "Duración de las peticiones HTTP hasta el último byte",
+                           etiquetas=("metodo", "ruta", "estado"))
+HTTP_EN_CURSO = Medidor("curador_http_en_curso", "Peticiones HTTP en curso")
+VOLCADO_SEGUNDOS = Histograma("curador_almacenamiento_volcado_segundos",
+                              "Duración de cada reescritura atómica de un archivo de la memoria")
+VOLCADO_BYTES = Histograma("curador_almacenamiento_volcado_bytes",
+                           "Tamaño de cada reescritura atómica de un archivo de la memoria",
+                           cubetas=CUBETAS_BYTES)
+
+
+# ==================== PERFILADOR POR MUESTREO ====================
+class Perfilador:
+    """Muestrea las pilas de todos los hilos cada `intervalo` segundos.
+
+    Apagado no cuesta nada; encendido, un hilo recorre sys._current_frames()
+    y cuenta pilas colapsadas ("hilo;archivo:función;..."), el formato que
+    leen flamegraph.pl y speedscope.
+    """
+
+    def __init__(self, intervalo=None, max_profundidad=64):
+        self.intervalo = intervalo or config.PERFILADOR_INTERVALO
+        self.max_profundidad = max_profundidad
+        self.bloqueo = threading.Lock()
+        self.pilas = Counter()
+        self.muestras = 0
+        self._detener = None
+        self._hilo = None
+
+    @property
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def activar(self, intervalo=None):
+        with self.bloqueo:
+            if intervalo:
+                self.intervalo = intervalo
+            if self.activo:
+                return
+            self._detener = threading.Event()
+            self._hilo = threading.Thread(target=self._bucle, args=(self._detener,),
+                                          name="perfilador", daemon=True)
+            self._hilo.start()
+
+    def desactivar(self):
+        with self.bloqueo:
+            if self._detener is not None:
+                self._detener.set()
+            self._hilo = None
+
+    def reiniciar(self):
+        with self.bloqueo:
+            self.pilas.clear()
+            self.muestras = 0
+
+    def _bucle(self, detener):
+        propio = threading.get_ident()
+        while not detener.wait(self.intervalo):
+            nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+            pilas = []
+            for ident, marco in sys._current_frames().items():
+                if ident == propio:
+                    continue
+                partes = []
+                while marco is not None and len(partes) < self.max_profundidad:
+                    codigo = marco.f_code
+                    partes.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                    marco = marco.f_back
+                partes.append(nombres.get(ident, str(ident)))
+                pilas.append(";".join(reversed(partes)))
+            with self.bloqueo:
+                self.pilas.update(pilas)
+                self.muestras += 1
+
+    def estado(self):
+        with self.bloqueo:
+            return {"activo": self.activo, "intervalo": self.intervalo,
+                    "muestras": self.muestras, "pilas": len(self.pilas)}
+
+    def exportar(self, limite=None):
+        """Pilas colapsadas "pila cuenta", de la más frecuente a la menos"""
+        with self.bloqueo:
+            pilas = self.pilas.most_common(limite)
+        return "".join(f"{pila} {cuenta}\n" for pila, cuenta in pilas)
+
+
+PERFILADOR = Perfilador()
+Medidor("curador_perfilador_activo", "1 si el perfilador por muestreo está encendido",
+        funcion=lambda: int(PERFILADOR.activo))
+Contador("curador_perfilador_muestras_total", "Muestras tomadas por el perfilador",
+         funcion=lambda: PERFILADOR.muestras)
+
+
+# ==================== MIDDLEWARE ASGI ====================
+class MiddlewareMetricas:
+    """Peticiones en curso y duración por ruta, hasta el último byte (incluye streaming).
+
+    La ruta es la plantilla (/articulos/{articulo_id}), no la URL, para no
+    crear una serie por id; lo que no coincide con ninguna ruta va como "otra".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not REGISTRO.activo:
+            return await self.app(scope, receive, send)
+        estado = 500
+        inicio = time.perf_counter()
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        HTTP_EN_CURSO.sumar(1)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            HTTP_EN_CURSO.sumar(-1)
+            ruta = getattr(scope.get("route"), "path", "otra")
+            HTTP_SEGUNDOS.observar(time.perf_counter() - inicio, metodo=scope["method"], ruta=ruta, estado=estado)
@@ -0,0 +1,171 @@
+# precalentador.py - Precalentamiento de la caché de búsquedas a partir del historial
+#
+# Cada PRECALENTADOR_INTERVALO segundos se puntúan las consultas del resumen
+# del historial: cuántas veces se buscaron en PRECALENTADOR_VENTANA_DIAS, con
+# el peso reducido a la mitad cada PRECALENTADOR_VIDA_MEDIA horas desde la
+# última vez. De las PRECALENTADOR_TEMAS mejores, las que no están en la caché
+# o expiran antes de PRECALENTADOR_ANTELACION se piden al LLM por adelantado,
+# solo con el servidor ocioso y sin pasar de PRECALENTADOR_LLAMADAS_HORA.
+# Con varios workers cada proceso tiene su propio presupuesto. Lo ocioso se
+# lee de las métricas: con CURADOR_METRICAS=0 el precalentador no arranca.
+# Iniciado dentro de la API, cada llamada corre en su bucle de eventos para
+# coalescerse con las búsquedas async de los usuarios.
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import config
+import metricas
+from resumen_historial import FORMATO_FECHA
+
+bitacora = logging.getLogger(__name__)
+
+
+def _en_curso(medidor):
+    with medidor.bloqueo:
+        return sum(medidor.valores.values())
+
+
+def servidor_ocioso():
+    """Sin peticiones HTTP ni llamadas al LLM en curso (según las métricas, que deben estar activas)"""
+    return not _en_curso(metricas.HTTP_EN_CURSO) and not _en_curso(metricas.LLM_EN_CURSO)
+
+
+class Precalentador:
+    """Mantiene en la caché las búsquedas que más probablemente se van a repetir"""
+
+    def __init__(self, buscador, memoria, temas=None, llamadas_hora=None, intervalo=None,
+                 antelacion=None, ocioso=servidor_ocioso):
+        self.buscador = buscador
+        self.memoria = memoria
+        self.temas = temas or config.PRECALENTADOR_TEMAS
+        self.llamadas_hora = config.PRECALENTADOR_LLAMADAS_HORA if llamadas_hora is None else llamadas_hora
+        self.intervalo = intervalo or config.PRECALENTADOR_INTERVALO
+        self.antelacion = config.PRECALENTADOR_ANTELACION if antelacion is None else antelacion
+        self.ocioso = ocioso
+        self.bloqueo = threading.Lock()
+        # Instantes (time.monotonic) de las llamadas de la última hora
+        self._llamadas = deque()
+        self.contadores = {"pasadas": 0, "llamadas": 0, "errores": 0,
+                           "omitidas_presupuesto": 0, "omitidas_ocupado": 0}
+        self.ultimo_error = None
+        self._detener = threading.Event()
+        self._hilo = None
+        # Bucle de eventos de la API (si se inició dentro de él)
+        self._bucle = None
+
+    # ---------- selección ----------
+    def candidatos(self, ahora=None):
+        """Los temas más probables, [(tema, puntuación)] de mayor a menor"""
+        ahora = ahora or datetime.now()
+        puntuados = []
+        # Se piden más de los necesarios: la recencia puede reordenar los más buscados
+        for consulta in self.memoria.tendencias_historial(config.PRECALENTADOR_VENTANA_DIAS, self.temas * 4):
+            horas = max((ahora - datetime.strptime(consulta["ultima"], FORMATO_FECHA)).total_seconds() / 3600, 0)
+            peso = 0.5 ** (horas / config.PRECALENTADOR_VIDA_MEDIA)
+            puntuados.append((consulta["query"], consulta["busquedas"] * peso))
+        puntuados.sort(key=lambda par: par[1], reverse=True)
+        return puntuados[:self.temas]
+
+    def pendientes(self, ahora=None):
+        """Candidatos sin entrada en la caché o a punto de expirar, del más probable al menos"""
+        pendientes = []
+        for tema, _ in self.candidatos(ahora):
+            restante = self.buscador.cache.restante("busqueda", tema)
+            if restante is None or restante < self.antelacion:
+                pendientes.append(tema)
+        return pendientes
+
+    def disponibles(self):
+        """Llamadas que quedan del presupuesto en la última hora"""
+        with self.bloqueo:
+            limite = time.monotonic() - 3600
+            while self._llamadas and self._llamadas[0] <= limite:
+                self._llamadas.popleft()
+            return max(self.llamadas_hora - len(self._llamadas), 0)
+
+    def _contar(self, contador, cantidad=1):
+        with self.bloqueo:
+            self.contadores[contador] += cantidad
+
+    # ---------- pasadas ----------
+    def pasada(self):
+        """Precalienta los temas pendientes mientras quede presupuesto y el servidor siga ocioso; retorna cuántos"""
+        self._contar("pasadas")
+        pendientes = self.pendientes()
+        for posicion, tema in enumerate(pendientes):
+            if not self.disponibles():
+                self._contar("omitidas_presupuesto", len(pendientes) - posicion)
+                return posicion
+            if not self.ocioso():
+                self._contar("omitidas_ocupado", len(pendientes) - posicion)
+                return posicion
+            with self.bloqueo:
+                self._llamadas.append(time.monotonic())
+                self.contadores["llamadas"] += 1
+            try:
+                self._precalentar(tema)
+            except Exception as e:
+                self._error(f"Error al precalentar '{tema}': {e}")
+                # Con el proveedor fallando no se insiste en esta pasada
+                return posicion
+        return len(pendientes)
+
+    def _precalentar(self, tema):
+        if self._bucle is None:
+            return self.buscador.precalentar_busqueda(tema)
+        # El vuelo async solo se toca desde su bucle: ahí están las búsquedas de los usuarios
+        return asyncio.run_coroutine_threadsafe(self.buscador.aprecalentar_busqueda(tema), self._bucle).result()
+
+    def _error(self, mensaje):
+        with self.bloqueo:
+            self.contadores["errores"] += 1
+            self.ultimo_error = mensaje
+        bitacora.warning(mensaje)
+
+    def iniciar(self):
+        """Lanza las pasadas en segundo plano cada `intervalo` segundos; retorna False si no puede"""
+        if self.ocioso is servidor_ocioso and not metricas.REGISTRO.activo:
+            # Sin métricas no hay peticiones en curso que mirar: parecería ocioso siempre
+            bitacora.warning("Precalentador no iniciado: necesita las métricas (CURADOR_METRICAS=1) "
+                             "para saber si el servidor está ocioso")
+            return False
+        try:
+            self._bucle = asyncio.get_running_loop()
+        except RuntimeError:
+            self._bucle = None
+
+        def bucle():
+            while not self._detener.wait(self.intervalo):
+                try:
+                    self.pasada()
+                except Exception as e:
+                    self._error(f"Error en el precalentador: {e}")
+
+        self._hilo = threading.Thread(target=bucle, name="precalentador", daemon=True)
+        self._hilo.start()
+        return True
+
+    def detener(self):
+        self._detener.set()
+
+    # ---------- métricas ----------
+    def estadisticas(self):
+        """Contadores propios y qué parte de las búsquedas de los usuarios se sirvió precalentada"""
+        consultas = self.buscador.cache.estadisticas_espacio("busqueda")
+        total = sum(consultas.values())
+        with self.bloqueo:
+            contadores = dict(self.contadores)
+            ultimo_error = self.ultimo_error
+        return {
+            "activo": self._hilo is not None and not self._detener.is_set(),
+            **contadores,
+            "ultimo_error": ultimo_error,
+            "presupuesto_restante": self.disponibles(),
+            "busquedas": total,
+            "busquedas_precalentadas": consultas["precalentada"],
+            "tasa_precalentadas": round(consultas["precalentada"] / total, 4) if total else 0.0
+        }
@@ -0,0 +1,139 @@
+# registro_etiquetas.py - Registro incremental de etiquetas: artículos, conteos y coocurrencias
+import heapq
+import threading
+
+
+def clave_etiqueta(etiqueta):
+    """Forma plegada con la que se agrupan "Python", "python" y "PYTHON" """
+    return etiqueta.strip().casefold()
+
+
+class RegistroEtiquetas:
+    """Mapa de etiqueta (sin distinguir mayúsculas) a ids de artículo.
+
+    Se reconstruye al arrancar con `construir` y después se mantiene con
+    cada alta y baja, de modo que comprobar, contar o listar relacionadas
+    no recorre la colección. Una etiqueta sin artículos desaparece.
+    """
+
+    def __init__(self):
+        self.bloqueo = threading.Lock()
+        # clave -> nombre mostrado (el primero con que se guardó)
+        self.nombres = {}
+        self.ids = {}
+        # clave -> {clave relacionada: artículos que comparten ambas}
+        self.coocurrencias = {}
+        self._claves_articulo = {}
+        self._version = 0
+        self._top = (None, 0, [])
+
+    # ==================== MANTENIMIENTO ====================
+    def construir(self, articulos):
+        """Reconstruye el registro desde los artículos guardados"""
+        with self.bloqueo:
+            self.nombres, self.ids, self.coocurrencias, self._claves_articulo = {}, {}, {}, {}
+            for articulo in articulos:
+                self._agregar(articulo)
+            self._version += 1
+
+    def agregar(self, articulo):
+        """Registra un artículo; retorna los nombres de etiqueta nuevos"""
+        with self.bloqueo:
+            self._version += 1
+            return self._agregar(articulo)
+
+    def agregar_varios(self, articulos):
+        """Registra un lote de artículos bajo un solo bloqueo; retorna los nombres de etiqueta nuevos"""
+        with self.bloqueo:
+            self._version += 1
+            return [nombre for articulo in articulos for nombre in self._agregar(articulo)]
+
+    def eliminar(self, id_articulo):
+        """Quita un artículo; retorna los nombres de etiqueta que quedaron sin artículos"""
+        with self.bloqueo:
+            self._version += 1
+            return self._eliminar(id_articulo)
+
+    def _agregar(self, articulo):
+        id_articulo = articulo["id"]
+        if id_articulo in self._claves_articulo:
+            self._eliminar(id_articulo)
+        claves, nuevas = [], []
+        for etiqueta in articulo["etiquetas"]:
+            clave = clave_etiqueta(etiqueta)
+            if not clave or clave in claves:
+                continue
+            claves.append(clave)
+            if clave not in self.ids:
+                self.nombres[clave] = etiqueta
+                self.ids[clave] = set()
+                self.coocurrencias[clave] = {}
+                nuevas.append(etiqueta)
+            self.ids[clave].add(id_articulo)
+        for clave in claves:
+            relacionadas = self.coocurrencias[clave]
+            for otra in claves:
+                if otra != clave:
+                    relacionadas[otra] = relacionadas.get(otra, 0) + 1
+        self._claves_articulo[id_articulo] = tuple(claves)
+        return nuevas
+
+    def _eliminar(self, id_articulo):
+        claves = self._claves_articulo.pop(id_articulo, ())
+        huerfanas = []
+        for clave in claves:
+            relacionadas = self.coocurrencias[clave]
+            for otra in claves:
+                if otra != clave:
+                    relacionadas[otra] -= 1
+                    if not relacionadas[otra]:
+                        del relacionadas[otra]
+            self.ids[clave].discard(id_articulo)
+        for clave in claves:
+            if not self.ids[clave]:
+                huerfanas.append(self.nombres.pop(clave))
+                del self.ids[clave]
+                del self.coocurrencias[clave]
+        return huerfanas
+
+    # ==================== CONSULTA ====================
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, etiqueta):
+        return clave_etiqueta(etiqueta) in self.ids
+
+    def lista(self):
+        """Nombres de las etiquetas vigentes, en orden de aparición"""
+        with self.bloqueo:
+            return list(self.nombres.values())
+
+    def ids_de(self, etiqueta):
+        """Ids de los artículos con la etiqueta (copia)"""
+        with self.bloqueo:
+            return set(self.ids.get(clave_etiqueta(etiqueta), ()))
+
+    def conteo(self, etiqueta):
+        return len(self.ids.get(clave_etiqueta(etiqueta), ()))
+
+    def conteos(self):
+        """[(nombre, artículos)] en orden de aparición"""
+        with self.bloqueo:
+            return [(self.nombres[clave], len(ids)) for clave, ids in self.ids.items()]
+
+    def top(self, n=10):
+        """Las n etiquetas con más artículos; se recalcula solo si el registro cambió"""
+        with self.bloqueo:
+            version, calculadas, resultado = self._top
+            if version != self._version or calculadas < n:
+                resultado = heapq.nlargest(n, ((self.nombres[c], len(ids)) for c, ids in self.ids.items()),
+                                           key=lambda par: par[1])
+                self._top = (self._version, n, resultado)
+            return resultado[:n]
+
+    def relacionadas(self, etiqueta, n=10):
+        """Etiquetas que más aparecen junto a `etiqueta`: [(nombre, artículos en común)]"""
+        with self.bloqueo:
+            relacionadas = self.coocurrencias.get(clave_etiqueta(etiqueta), {})
+            return [(self.nombres[c], cuenta) for c, cuenta in
+                    heapq.nlargest(n, relacionadas.items(), key=lambda par: par[1])]
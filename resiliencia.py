@@ -0,0 +1,205 @@
+# resiliencia.py - Plazos, reintentos con jitter y cortocircuito para las llamadas al LLM
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as TimeoutFuturo
+
+import config
+
+# Códigos HTTP que suelen resolverse solos: límite de cuota, sobrecarga, cortes del proveedor
+CODIGOS_REINTENTABLES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Excepciones de google.api_core / httpx que no traen código numérico a mano
+NOMBRES_REINTENTABLES = frozenset({
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+    "InternalServerError", "BadGateway", "GatewayTimeout", "RetryError",
+    "ConnectError", "ReadTimeout", "WriteTimeout", "PoolTimeout", "RemoteProtocolError",
+})
+
+
+class PlazoAgotado(TimeoutError):
+    """La llamada no terminó dentro de su plazo"""
+
+
+class CircuitoAbierto(Exception):
+    """El circuito está abierto: se falla de inmediato sin llamar al proveedor"""
+
+
+def es_reintentable(error):
+    """Si vale la pena repetir la llamada que lanzó `error`"""
+    if isinstance(error, CircuitoAbierto):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    for atributo in ("status_code", "code"):
+        codigo = getattr(error, atributo, None)
+        if isinstance(codigo, int) and codigo in CODIGOS_REINTENTABLES:
+            return True
+    return type(error).__name__ in NOMBRES_REINTENTABLES
+
+
+def debe_respaldar(error):
+    """Si el fallo es del proveedor y justifica recurrir a un respaldo"""
+    return isinstance(error, (CircuitoAbierto, PlazoAgotado)) or es_reintentable(error)
+
+
+class Circuito:
+    """Cortocircuito por tasa de errores en una ventana deslizante de llamadas.
+
+    Cerrado: deja pasar todo. Si en las últimas `ventana` llamadas (con al
+    menos `minimo`) la tasa de fallos llega a `umbral`, se abre y rechaza
+    durante `espera` segundos. Luego pasa a semiabierto: una sola llamada
+    de prueba decide si vuelve a cerrarse o a abrirse.
+    """
+
+    CERRADO, ABIERTO, SEMIABIERTO = "cerrado", "abierto", "semiabierto"
+
+    def __init__(self, ventana=None, minimo=None, umbral=None, espera=None):
+        self.ventana = ventana or config.LLM_CIRCUITO_VENTANA
+        self.minimo = minimo or config.LLM_CIRCUITO_MINIMO
+        self.umbral = umbral or config.LLM_CIRCUITO_UMBRAL
+        self.espera = espera if espera is not None else config.LLM_CIRCUITO_ESPERA
+        self.bloqueo = threading.Lock()
+        self.estado = self.CERRADO
+        self.resultados = deque(maxlen=self.ventana)
+        self._abierto_desde = 0.0
+        self._sondeando = False
+        self.aperturas = 0
+        self.rechazadas = 0
+
+    def permitir(self):
+        """Lanza CircuitoAbierto si la llamada no debe intentarse; retorna si es la llamada de prueba"""
+        with self.bloqueo:
+            if self.estado == self.ABIERTO and time.monotonic() - self._abierto_desde >= self.espera:
+                self.estado = self.SEMIABIERTO
+            if self.estado == self.CERRADO or (self.estado == self.SEMIABIERTO and not self._sondeando):
+                self._sondeando = self.estado == self.SEMIABIERTO
+                return self._sondeando
+            self.rechazadas += 1
+            raise CircuitoAbierto(f"Circuito abierto tras {self.aperturas} apertura(s); "
+                                  f"se reintenta en {self.espera:.0f}s")
+
+    def registrar(self, exito):
+        with self.bloqueo:
+            if self.estado == self.SEMIABIERTO:
+                self._sondeando = False
+                if exito:
+                    self.estado = self.CERRADO
+                    self.resultados.clear()
+                else:
+                    self._abrir()
+                return
+            self.resultados.append(exito)
+            fallos = self.resultados.count(False)
+            if (self.estado == self.CERRADO and len(self.resultados) >= self.minimo
+                    and fallos / len(self.resultados) >= self.umbral):
+                self._abrir()
+
+    def liberar(self):
+        """Deja libre la prueba de una llamada cancelada sin contarla como éxito ni fallo"""
+        with self.bloqueo:
+            if self.estado == self.SEMIABIERTO:
+                self._sondeando = False
+
+    def _abrir(self):
+        self.estado = self.ABIERTO
+        self._abierto_desde = time.monotonic()
+        self.aperturas += 1
+
+
+class Resiliencia:
+    """Plazo por llamada, reintentos con backoff exponencial y jitter, y cortocircuito.
+
+    El plazo cubre la llamada completa con sus reintentos: cada intento
+    recibe lo que queda y ninguna espera se pasa de él. En la versión
+    síncrona el intento corre en un hilo del pool y se abandona al vencer
+    (el cliente del LLM lleva su propio timeout para liberarlo); en la
+    async se cancela.
+    """
+
+    def __init__(self, plazo=None, intentos=None, espera_base=None, espera_maxima=None, circuito=None):
+        self.plazo = plazo or config.LLM_PLAZO
+        self.intentos = intentos or config.LLM_INTENTOS
+        self.espera_base = espera_base if espera_base is not None else config.LLM_ESPERA_BASE
+        self.espera_maxima = espera_maxima if espera_maxima is not None else config.LLM_ESPERA_MAXIMA
+        self.circuito = circuito or Circuito()
+        self._ejecutor = ThreadPoolExecutor(max_workers=config.LLM_CONCURRENCIA_MAX,
+                                            thread_name_prefix="llm")
+        self.bloqueo = threading.Lock()
+        self.contadores = {"llamadas": 0, "reintentos": 0, "plazos_agotados": 0, "fallos": 0,
+                           "respaldos_modelo": 0, "respaldos_cache": 0}
+
+    def contar(self, clave):
+        with self.bloqueo:
+            self.contadores[clave] += 1
+
+    def _espera(self, intento, restante):
+        """Full jitter: aleatoria entre 0 y el backoff exponencial, sin pasarse del plazo"""
+        return min(random.uniform(0, min(self.espera_maxima, self.espera_base * 2 ** intento)), restante)
+
+    def _fallo(self, error, intento, fin):
+        """Registra un intento fallido; retorna la espera antes del siguiente o relanza"""
+        self.circuito.registrar(False)
+        restante = fin - time.monotonic()
+        if intento + 1 >= self.intentos or restante <= 0 or not es_reintentable(error):
+            self.contar("fallos")
+            raise error
+        self.contar("reintentos")
+        return self._espera(intento, restante)
+
+    def ejecutar(self, funcion, plazo=None):
+        """Llama a `funcion()` con plazo, reintentos y cortocircuito"""
+        self.contar("llamadas")
+        fin = time.monotonic() + (plazo or self.plazo)
+        for intento in range(self.intentos):
+            sonda = self.circuito.permitir()
+            futuro = self._ejecutor.submit(contextvars.copy_context().run, funcion)
+            try:
+                resultado = futuro.result(timeout=max(fin - time.monotonic(), 0))
+            except TimeoutFuturo:
+                futuro.cancel()
+                self.contar("plazos_agotados")
+                time.sleep(self._fallo(PlazoAgotado(f"Sin respuesta del LLM en {plazo or self.plazo:g}s"),
+                                       intento, fin))
+            except Exception as e:
+                time.sleep(self._fallo(e, intento, fin))
+            except BaseException:
+                if sonda:
+                    self.circuito.liberar()
+                raise
+            else:
+                self.circuito.registrar(True)
+                return resultado
+
+    async def aejecutar(self, funcion, plazo=None):
+        """Versión async: `funcion()` retorna la corrutina de cada intento"""
+        self.contar("llamadas")
+        fin = time.monotonic() + (plazo or self.plazo)
+        for intento in range(self.intentos):
+            sonda = self.circuito.permitir()
+            try:
+                resultado = await asyncio.wait_for(funcion(), max(fin - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                self.contar("plazos_agotados")
+                await asyncio.sleep(self._fallo(PlazoAgotado(f"Sin respuesta del LLM en {plazo or self.plazo:g}s"),
+                                                intento, fin))
+            except Exception as e:
+                await asyncio.sleep(self._fallo(e, intento, fin))
+            except BaseException:
+                # Cancelada (p. ej. el cliente se desconectó): no dice nada del proveedor
+                if sonda:
+                    self.circuito.liberar()
+                raise
+            else:
+                self.circuito.registrar(True)
+                return resultado
+
+    def estadisticas(self):
+        with self.bloqueo:
+            contadores = dict(self.contadores)
+        return {**contadores, "circuito": self.circuito.estado,
+                "aperturas": self.circuito.aperturas, "rechazadas": self.circuito.rechazadas}
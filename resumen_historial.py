@@ -0,0 +1,118 @@
+# resumen_historial.py - Resumen del historial de búsquedas por día y consulta, y tendencias sobre él
+#
+# Cada búsqueda se suma al resumen al registrarse: {día: {consulta: [cuenta,
+# primera hora, última hora]}}. El historial suelto se poda (HISTORIAL_MAX_ENTRADAS,
+# HISTORIAL_MAX_DIAS) sin perder nada de lo que cuentan las tendencias, que
+# leen solo los días de la ventana y no recorren el historial. Del resumen se
+# quitan los días más antiguos que HISTORIAL_RESUMEN_DIAS.
+import heapq
+from datetime import date, datetime, timedelta
+
+import config
+
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+
+def clave_consulta(query):
+    """Forma con la que se agrupan "Naruto", "naruto " y "NARUTO" """
+    return " ".join(query.split()).casefold()
+
+
+# ==================== MANTENIMIENTO ====================
+def acumular(resumen, busqueda, cantidad=1):
+    """Suma (o con cantidad=-1, resta al borrarla) una búsqueda al resumen; las consultas vacías no cuentan"""
+    clave = clave_consulta(busqueda["query"])
+    if not clave:
+        return
+    # El día ya es la clave: de la fecha solo se guarda la hora
+    dia, hora = busqueda["fecha"][:10], busqueda["fecha"][11:]
+    consultas = resumen.setdefault(dia, {})
+    entrada = consultas.get(clave)
+    if entrada is None:
+        if cantidad > 0:
+            consultas[clave] = [cantidad, hora, hora]
+        elif not consultas:
+            del resumen[dia]
+        return
+    entrada[0] += cantidad
+    if entrada[0] <= 0:
+        del consultas[clave]
+        if not consultas:
+            del resumen[dia]
+    elif cantidad > 0:
+        entrada[1] = min(entrada[1], hora)
+        entrada[2] = max(entrada[2], hora)
+
+
+def construir(historial):
+    """Resumen de un historial guardado antes de que existiera el resumen"""
+    resumen = {}
+    for busqueda in historial:
+        acumular(resumen, busqueda)
+    return resumen
+
+
+def limite_antiguedad(ahora=None):
+    """Fecha (texto) antes de la cual una búsqueda suelta se poda, o None sin límite de días"""
+    if not config.HISTORIAL_MAX_DIAS:
+        return None
+    return ((ahora or datetime.now()) - timedelta(days=config.HISTORIAL_MAX_DIAS)).strftime(FORMATO_FECHA)
+
+
+def limite_resumen(hoy=None):
+    """Primer día (YYYY-MM-DD) que conserva el resumen, o None sin límite"""
+    if not config.HISTORIAL_RESUMEN_DIAS:
+        return None
+    return ((hoy or date.today()) - timedelta(days=config.HISTORIAL_RESUMEN_DIAS - 1)).isoformat()
+
+
+def podar_resumen(resumen, hasta):
+    """Quita del resumen los días anteriores a `hasta`; retorna cuántos"""
+    viejos = [dia for dia in resumen if dia < hasta]
+    for dia in viejos:
+        del resumen[dia]
+    return len(viejos)
+
+
+def cuantas_podar(total, maximo=None):
+    """Búsquedas más antiguas que sobran por número: al pasar del máximo se baja hasta dejar holgura"""
+    maximo = config.HISTORIAL_MAX_ENTRADAS if maximo is None else maximo
+    if not maximo or total <= maximo:
+        return 0
+    return min(total, total - maximo + int(maximo * config.HISTORIAL_HOLGURA))
+
+
+def a_podar(historial, ahora=None):
+    """Cuántas búsquedas del principio del historial (las más antiguas) hay que podar"""
+    podar = cuantas_podar(len(historial))
+    limite = limite_antiguedad(ahora)
+    if limite is not None:
+        while podar < len(historial) and historial[podar]["fecha"] < limite:
+            podar += 1
+    return podar
+
+
+# ==================== CONSULTA ====================
+def ventana(dias, hoy=None):
+    """Días (YYYY-MM-DD) de la ventana que termina hoy, del más reciente al más antiguo"""
+    hoy = hoy or date.today()
+    return [(hoy - timedelta(days=d)).isoformat() for d in range(dias)]
+
+
+def tendencias(resumen, dias=7, limite=10, hoy=None):
+    """Consultas más buscadas en los últimos `dias` días: [{"query", "busquedas", "dias", "primera", "ultima"}]"""
+    totales = {}
+    # Del día más reciente al más antiguo: la última vez es la del primer día en que aparece
+    for dia in ventana(dias, hoy):
+        for clave, (cuenta, primera, ultima) in resumen.get(dia, {}).items():
+            total = totales.get(clave)
+            if total is None:
+                totales[clave] = [cuenta, 1, f"{dia} {primera}", f"{dia} {ultima}"]
+            else:
+                total[0] += cuenta
+                total[1] += 1
+                total[2] = f"{dia} {primera}"
+    # A igual número de búsquedas, la más reciente primero
+    mejores = heapq.nlargest(limite, totales.items(), key=lambda par: (par[1][0], par[1][3]))
+    return [{"query": clave, "busquedas": cuenta, "dias": numero_dias, "primera": primera, "ultima": ultima}
+            for clave, (cuenta, numero_dias, primera, ultima) in mejores]